@@ -0,0 +1,286 @@
+"""
+ToyotaScan — asyncio command queue for the ELM327 link
+One worker task owns the adapter and serves commands by priority
+(console > DTC > live poll) with per-command timeouts and cancellation
+by tag, plus a thread-safe bridge for Kivy and the polling thread.
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import socket
+import threading
+from collections import deque
+
+PROMPT = b">"
+
+PRIO_CONSOLE = 0
+PRIO_DTC     = 1
+PRIO_LIVE    = 2
+TAGS = {PRIO_CONSOLE: "console", PRIO_DTC: "dtc", PRIO_LIVE: "live"}
+
+DRAIN_TIMEOUT = 0.5     # wait for the '>' after an interrupted command
+SYNC_MARGIN   = 2.0     # request_sync: queue wait beyond the command timeout
+
+
+class LatencyStats:
+    """Recent samples (seconds) with percentile summaries."""
+
+    def __init__(self, keep=4096):
+        self.samples = deque(maxlen=keep)
+        self.count   = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self, qs=(0.5, 0.9, 0.99)):
+        s = sorted(self.samples)
+        if not s:
+            return {}
+        return {f"p{int(q * 100)}": s[min(len(s) - 1, int(q * len(s)))] for q in qs}
+
+
+class _Command:
+    __slots__ = ("priority", "seq", "cmd", "timeout", "tag", "future", "enqueued")
+
+    def __init__(self, priority, seq, cmd, timeout, tag, future, enqueued):
+        self.priority = priority
+        self.seq      = seq
+        self.cmd      = cmd
+        self.timeout  = timeout
+        self.tag      = tag
+        self.future   = future
+        self.enqueued = enqueued
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+# 
+#  ASYNC LINK
+# 
+class AsyncLink:
+    """Serialises commands over asyncio streams to an ELM327."""
+
+    def __init__(self, reader, writer):
+        self._reader  = reader
+        self._writer  = writer
+        self._queue   = asyncio.PriorityQueue()
+        self._seq     = itertools.count()
+        self._task    = None
+        self._current = None
+        self.closed   = False
+        self.queue_latency = {p: LatencyStats() for p in TAGS}
+        self.service_time  = {p: LatencyStats() for p in TAGS}
+
+    @classmethod
+    async def open_tcp(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(reader, writer)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def request(self, cmd, priority=PRIO_LIVE, timeout=4.0, tag=None):
+        """Queue cmd and wait for its reply bytes (b"" on timeout)."""
+        if self.closed:
+            raise ConnectionError("link closed")
+        loop = asyncio.get_running_loop()
+        fut  = loop.create_future()
+        self._queue.put_nowait(_Command(priority, next(self._seq), cmd, timeout,
+                                        tag or TAGS.get(priority), fut, loop.time()))
+        return await fut
+
+    def cancel_tag(self, tag):
+        """Cancel queued and in-flight commands carrying tag."""
+        for item in self._queue._queue:
+            if item.tag == tag:
+                item.future.cancel()
+        if self._current and self._current.tag == tag:
+            self._current.future.cancel()
+
+    def pending(self):
+        return sum(1 for i in self._queue._queue if not i.future.done())
+
+    async def close(self):
+        self.closed = True
+        for item in self._queue._queue:
+            item.future.cancel()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._close_stream()
+
+    def _close_stream(self):
+        self._writer.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # Checked as well as cancelling the task: before Python 3.12
+        # wait_for() can swallow a cancel that lands as it completes
+        while not self.closed:
+            item = await self._queue.get()
+            if item.future.done():
+                continue                    # cancelled while queued
+            start = loop.time()
+            self.queue_latency[item.priority].add(start - item.enqueued)
+            self._current = item
+            try:
+                reply = await self._exchange(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Stream closed, or the transport failed (OSError, or a
+                # JavaException from the Bluetooth socket): the link is
+                # gone, so fail every waiter instead of leaving it hanging
+                self.closed = True
+                error = ConnectionError(str(e) or type(e).__name__)
+                if not item.future.done():
+                    item.future.set_exception(error)
+                for other in self._queue._queue:
+                    if not other.future.done():
+                        other.future.set_exception(error)
+                return
+            finally:
+                self._current = None
+            self.service_time[item.priority].add(loop.time() - start)
+            if not item.future.done():
+                item.future.set_result(reply)
+
+    async def _exchange(self, item):
+        self._writer.write((item.cmd + "\r").encode("ascii"))
+        read = asyncio.ensure_future(self._reader.readuntil(PROMPT))
+        done, _ = await asyncio.wait({read, item.future}, timeout=item.timeout,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if read in done:
+            return read.result()
+        # Timed out or cancelled: any byte interrupts the ELM327, which
+        # then prints STOPPED and a fresh prompt that we must consume.
+        self._writer.write(b"\r")
+        try:
+            await asyncio.wait_for(read, DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        return b""
+
+
+class TransportLink(AsyncLink):
+    """AsyncLink over a blocking transport.Transport (e.g. Bluetooth),
+    whose exchange() runs in the loop's default executor. A command
+    already on the wire cannot be interrupted; it runs to its timeout."""
+
+    def __init__(self, transport):
+        super().__init__(None, None)
+        self.transport = transport
+
+    async def _exchange(self, item):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.transport.exchange,
+                                          item.cmd, item.timeout)
+
+    def _close_stream(self):
+        self.transport.close()
+
+
+# 
+#  THREAD BRIDGE
+# 
+class LinkBridge:
+    """Runs an AsyncLink on its own event-loop thread.
+
+    opener is a coroutine function returning an AsyncLink. Callbacks
+    passed to submit() are delivered through dispatch(fn, *args) — with
+    Kivy, a Clock.schedule_once wrapper so they run on the UI thread.
+    """
+
+    def __init__(self, opener, dispatch=None):
+        self.dispatch = dispatch or (lambda fn, *args: fn(*args))
+        self.loop     = asyncio.new_event_loop()
+        self._thread  = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self.link = asyncio.run_coroutine_threadsafe(opener(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.link.start)
+
+    def submit(self, cmd, callback=None, priority=PRIO_LIVE, timeout=4.0, tag=None):
+        """Queue cmd from any thread; returns a concurrent Future."""
+        fut = asyncio.run_coroutine_threadsafe(
+            self.link.request(cmd, priority, timeout, tag), self.loop)
+        if callback:
+            def done(f):
+                failed = f.cancelled() or f.exception() is not None
+                self.dispatch(callback, b"" if failed else f.result())
+            fut.add_done_callback(done)
+        return fut
+
+    def request_sync(self, cmd, priority=PRIO_LIVE, timeout=4.0, tag=None):
+        """Blocking request for worker threads (never the loop thread).
+
+        Raises ConnectionError once the link is closed; gives b"" if the
+        reply has not come within timeout plus SYNC_MARGIN of queueing.
+        """
+        fut = self.submit(cmd, None, priority, timeout, tag)
+        try:
+            return fut.result(timeout + SYNC_MARGIN)
+        except concurrent.futures.TimeoutError:
+            fut.cancel()
+            return b""
+        except concurrent.futures.CancelledError:
+            return b""
+
+    def cancel_tag(self, tag):
+        self.loop.call_soon_threadsafe(self.link.cancel_tag, tag)
+
+    def latency_report(self):
+        """{tag: {"queue": percentiles, "service": percentiles, "count": n}}"""
+        return {TAGS[p]: {"queue":   self.link.queue_latency[p].percentiles(),
+                          "service": self.link.service_time[p].percentiles(),
+                          "count":   self.link.queue_latency[p].count}
+                for p in TAGS}
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self.link.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+# 
+#  FAKE ELM327 (asyncio)
+# 
+async def serve_fake_elm(responder, host="127.0.0.1", port=0, latency=0.0):
+    """Start an asyncio fake adapter; returns the asyncio Server.
+
+    A byte arriving while a command is being answered interrupts it
+    with STOPPED, as on a real ELM327.
+    """
+    async def handle(reader, writer):
+        pending = bytearray()
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+            pending += data
+            while b"\r" in pending:
+                line, _, rest = pending.partition(b"\r")
+                pending[:] = rest
+                cmd = line.decode("ascii", "ignore").strip()
+                if not cmd:
+                    continue
+                if latency:
+                    try:
+                        data = await asyncio.wait_for(reader.read(4096), latency)
+                    except asyncio.TimeoutError:
+                        data = None
+                    if data:
+                        pending += data
+                        if b"\r" in pending:
+                            writer.write(b"STOPPED\r\r>")
+                            pending[:] = pending.partition(b"\r")[2]
+                            continue
+                writer.write(responder(cmd).encode("ascii"))
+        writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,187 @@
+"""
+ToyotaScan — HV battery module analytics
+Per-module voltage statistics over a rolling window, cell delta,
+outlier modules and per-module internal resistance, updated from each
+28-module voltage frame (Mode 21 PID CE on the battery ECU) and the
+pack current read in the same sweep.
+
+Every update is one pass over the modules: windowed mean/variance by
+replacing the oldest sample (no re-summing), and resistance by
+recursive least squares of dV against dI between consecutive frames,
+so OCV drift with SOC cancels out and only load steps carry weight.
+Memory is fixed at construction.
+"""
+
+import math
+import threading
+from array import array
+
+MODULES     = 28                # Gen 2/3 pack: 28 x 7.2 V modules
+MODULE_CMD  = "21CE"
+MODULE_UNIT = 0.001             # V per count, u16 big-endian per module
+
+
+def decode_modules(data, modules=MODULES):
+    """Module voltages from a 21CE reply byte list (61 CE v1 v2 ...),
+    or None for a missing or short frame."""
+    if data is None or len(data) < 2 + 2 * modules:
+        return None
+    return [((data[i] << 8) | data[i + 1]) * MODULE_UNIT
+            for i in range(2, 2 + 2 * modules, 2)]
+
+
+def encode_modules(volts):
+    """Inverse of decode_modules, without the 61 CE header."""
+    out = bytearray()
+    for v in volts:
+        out += min(0xFFFF, max(0, int(round(v / MODULE_UNIT)))).to_bytes(2, "big")
+    return bytes(out)
+
+
+def robust_z(values):
+    """Median/MAD z-scores, so one bad module cannot hide itself by
+    inflating the spread it is measured against."""
+    s = sorted(values)
+    n = len(s)
+    med = (s[n // 2] + s[(n - 1) // 2]) / 2
+    dev = sorted(abs(v - med) for v in values)
+    mad = (dev[n // 2] + dev[(n - 1) // 2]) / 2
+    if mad == 0:
+        return [0.0] * n
+    return [0.6745 * (v - med) / mad for v in values]
+
+
+class ModuleAnalytics:
+    """Rolling statistics for one pack.
+
+    window frames of history are kept per module (600 = 1 min at 10 Hz).
+    Resistance pairs two frames at most max_gap s apart whose current
+    differs by at least min_step A; forget weights older pairs down so
+    the estimate follows temperature. Modules whose rolling mean or
+    resistance has a robust z-score beyond z_limit are outliers.
+    """
+
+    def __init__(self, modules=MODULES, window=600, min_step=2.0, max_gap=1.0,
+                 forget=0.995, min_transients=20, z_limit=3.5):
+        self.modules  = modules
+        self.window   = window
+        self.min_step = min_step
+        self.max_gap  = max_gap
+        self.forget   = forget
+        self.min_transients = min_transients
+        self.z_limit  = z_limit
+        self._lock    = threading.Lock()
+        self._ring    = array("d", bytes(8 * modules * window))
+        self._mean    = array("d", bytes(8 * modules))
+        self._m2      = array("d", bytes(8 * modules))
+        self._last    = array("d", bytes(8 * modules))
+        self._sxy     = array("d", bytes(8 * modules))  # sum dI * dV per module
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for a in (self._mean, self._m2, self._last, self._sxy):
+                for i in range(self.modules):
+                    a[i] = 0.0
+            self._head       = 0
+            self._count      = 0
+            self._sxx        = 0.0      # sum dI^2, common to all modules
+            self._last_t     = None
+            self._last_i     = 0.0
+            self.frames      = 0
+            self.transients  = 0
+            self.delta       = 0.0
+            self.delta_max   = 0.0
+            self.current     = 0.0
+            self.t           = None
+
+    def update(self, t, volts, current):
+        """Add one frame; returns False (and ignores it) if volts is not
+        one voltage per module."""
+        n = self.modules
+        if volts is None or len(volts) != n:
+            return False
+        with self._lock:
+            ring, mean, m2 = self._ring, self._mean, self._m2
+            base = self._head * n
+            if self._count < self.window:
+                self._count += 1
+                k = self._count
+                for i in range(n):
+                    x = volts[i]
+                    d = x - mean[i]
+                    mean[i] += d / k
+                    m2[i]   += d * (x - mean[i])
+                    ring[base + i] = x
+            else:
+                k = self._count
+                for i in range(n):
+                    x, y = volts[i], ring[base + i]
+                    old = mean[i]
+                    mean[i] = old + (x - y) / k
+                    m2[i]  += (x - y) * (x - mean[i] + y - old)
+                    ring[base + i] = x
+            self._head = self._head + 1 if self._head + 1 < self.window else 0
+
+            last = self._last
+            if self._last_t is not None and 0 < t - self._last_t <= self.max_gap:
+                di = current - self._last_i
+                if abs(di) >= self.min_step:
+                    f = self.forget
+                    self._sxx = self._sxx * f + di * di
+                    sxy = self._sxy
+                    for i in range(n):
+                        sxy[i] = sxy[i] * f + di * (volts[i] - last[i])
+                    self.transients += 1
+            for i in range(n):
+                last[i] = volts[i]
+            self._last_t, self._last_i = t, current
+
+            self.delta     = max(volts) - min(volts)
+            self.delta_max = max(self.delta_max, self.delta)
+            self.current   = current
+            self.t         = t
+            self.frames   += 1
+        return True
+
+    def resistance(self):
+        """Per-module internal resistance in ohm, or None until
+        min_transients load steps have been seen."""
+        with self._lock:
+            if self.transients < self.min_transients or not self._sxx:
+                return None
+            return [-s / self._sxx for s in self._sxy]
+
+    def snapshot(self):
+        """Everything the battery screen shows, as plain lists."""
+        ohm = self.resistance()
+        with self._lock:
+            k = self._count
+            if not k:
+                return None
+            n    = self.modules
+            last = list(self._last)
+            mean = list(self._mean)
+            std  = [math.sqrt(max(self._m2[i], 0.0) / (k - 1)) if k > 1 else 0.0
+                    for i in range(n)]
+            out = {"t": self.t, "frames": self.frames, "window": k,
+                   "current": self.current, "volts": last, "mean": mean,
+                   "std": std, "delta": self.delta, "delta_max": self.delta_max,
+                   "lowest": last.index(min(last)) + 1,
+                   "highest": last.index(max(last)) + 1,
+                   "transients": self.transients}
+        z = robust_z(mean)
+        out["z"] = z
+        out["resistance"] = ohm
+        out["resistance_z"] = robust_z(ohm) if ohm else None
+        # Outlier modules (1-based): low under load or high resistance
+        flagged = {i + 1 for i, v in enumerate(z) if abs(v) > self.z_limit}
+        if ohm:
+            flagged.update(i + 1 for i, v in enumerate(out["resistance_z"])
+                           if v > self.z_limit)
+        out["outliers"] = sorted(flagged)
+        return out
+
+    def nbytes(self):
+        """Bytes held by the sample and statistic arrays."""
+        return 8 * self.modules * (self.window + 4)
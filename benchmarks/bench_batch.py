@@ -0,0 +1,42 @@
+"""
+Full-sweep throughput: single-PID queries vs batched Mode 01 requests.
+
+Runs VeepeakManager in demo mode with a simulated adapter round-trip,
+so the gain from fewer round-trips is visible without a car.
+
+    python benchmarks/bench_batch.py [latency_ms]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import VeepeakManager, STANDARD_PIDS, PRIUS_PIDS
+
+
+def sweep_single(mgr, keys):
+    return {k: mgr.query(*k) for k in keys}
+
+
+def sweep_batched(mgr, keys):
+    return mgr.query_batch(keys)
+
+
+def run(latency, sweeps=5):
+    keys = [(p[1], p[2]) for p in STANDARD_PIDS + PRIUS_PIDS]
+    for label, fn in (("single", sweep_single), ("batched", sweep_batched)):
+        mgr = VeepeakManager()
+        mgr.demo_mode    = True
+        mgr.demo_latency = latency
+        start = time.perf_counter()
+        for _ in range(sweeps):
+            fn(mgr, keys)
+        elapsed = (time.perf_counter() - start) / sweeps
+        print(f"{label:8s} {elapsed * 1000:8.1f} ms/sweep  "
+              f"{1 / elapsed:6.2f} Hz  ({len(keys)} PIDs)")
+
+
+if __name__ == "__main__":
+    run(float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.05)
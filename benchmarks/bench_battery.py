@@ -0,0 +1,124 @@
+"""
+ModuleAnalytics on simulated or recorded data: update cost per 28-module
+frame, memory (flat over hours of frames), and how well the dV/dI
+estimate recovers each simulated module's resistance and how soon the
+weak module is flagged.
+
+    python benchmarks/bench_battery.py [sim_minutes] [hz]
+    python benchmarks/bench_battery.py --session drive.tss
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import elmparse
+from battery import MODULE_CMD, ModuleAnalytics, decode_modules
+from decoders import DecoderRegistry
+from simulator import PriusSimulator
+
+AMPS = DecoderRegistry([("amps", "22", "F402", "A", "pack_a", -200, 200)])
+
+
+def _frame(reply, mode):
+    return elmparse.parse(reply).data(int(mode, 16) + 0x40)
+
+
+def simulated(minutes, hz):
+    """(t, volts, amps) from the simulator at hz, plus the model."""
+    sim = PriusSimulator(time_scale=0, ready=True)
+    sim.advance(30)                                 # past the first stop
+    frames = []
+    for i in range(int(minutes * 60 * hz)):
+        sim.advance(1 / hz)
+        d = _frame(sim.respond(MODULE_CMD), MODULE_CMD[:2])
+        a = _frame(sim.respond("22F402"), "22")
+        frames.append((i / hz, decode_modules(list(d)),
+                       AMPS.decode("amps", list(a))))
+    return frames, sim.model
+
+
+def recorded(path):
+    """(t, volts, amps) pairs from a session's 21CE and 22F402 replies."""
+    from session import SessionReader
+    reader, frames, amps = SessionReader(path), [], None
+    for t, cmd, reply in reader.exchanges():
+        cmd = cmd.strip().upper()
+        if cmd.startswith("22F402"):
+            d = _frame(reply, "22")
+            amps = AMPS.decode("amps", list(d) if d else None)
+        elif cmd.startswith(MODULE_CMD) and amps is not None:
+            d = _frame(reply, "21")
+            volts = decode_modules(list(d) if d else None)
+            if volts:
+                frames.append((t, volts, amps))
+    reader.close()
+    return frames
+
+
+def run(frames, model=None):
+    eng = ModuleAnalytics()
+    flagged_at = None
+    start = time.perf_counter()
+    for k, (t, volts, amps) in enumerate(frames):
+        eng.update(t, volts, amps)
+        if model and flagged_at is None and k % 50 == 0:
+            snap = eng.snapshot()
+            if snap["resistance"] and snap["outliers"]:
+                flagged_at = t
+    elapsed = time.perf_counter() - start
+
+    # Heap growth while the window wraps: should be nothing per frame
+    probe = ModuleAnalytics()
+    tracemalloc.start()
+    for t, volts, amps in frames[:probe.window * 3]:
+        probe.update(t, volts, amps)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(200):
+        snap = eng.snapshot()
+    snap_us = (time.perf_counter() - start) / 200 * 1e6
+
+    span = frames[-1][0] - frames[0][0]
+    print(f"{len(frames)} frames over {span / 60:.1f} min")
+    print(f"  update     {len(frames) / elapsed:9.0f} frames/s  "
+          f"({elapsed / len(frames) * 1e6:.1f} us each)")
+    print(f"  snapshot   {snap_us:9.1f} us")
+    print(f"  memory     {eng.nbytes() / 1024:9.1f} KiB arrays, "
+          f"{peak / 1024:.1f} KiB peak traced during updates")
+    print(f"  delta      {snap['delta'] * 1000:9.1f} mV now, "
+          f"{snap['delta_max'] * 1000:.1f} mV max, "
+          f"{snap['transients']} load steps")
+    print(f"  outliers   {snap['outliers']}")
+    ohm = snap["resistance"]
+    if ohm and model:
+        err = [abs(e - r) / r for e, r in zip(ohm, model.module_r)]
+        weak = max(range(len(model.module_r)), key=model.module_r.__getitem__) + 1
+        print(f"  resistance {sum(err) / len(err):9.1%} mean error, "
+              f"{max(err):.1%} worst; weak module {weak} "
+              f"({model.module_r[weak - 1] * 1000:.1f} mOhm) flagged after "
+              f"{flagged_at if flagged_at is not None else float('nan'):.0f} s")
+    elif ohm:
+        print("  resistance " + " ".join(f"{r * 1000:.1f}" for r in ohm) + " mOhm")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark the battery module analytics.")
+    ap.add_argument("minutes", nargs="?", type=float, default=30.0)
+    ap.add_argument("hz", nargs="?", type=float, default=10.0)
+    ap.add_argument("--session", help="replay 21CE frames from a recorded session")
+    args = ap.parse_args(argv)
+    if args.session:
+        run(recorded(args.session))
+    else:
+        run(*simulated(args.minutes, args.hz))
+
+
+if __name__ == "__main__":
+    main()
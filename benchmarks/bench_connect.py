@@ -0,0 +1,84 @@
+"""
+Connect time and per-query latency against the simulated adapter with
+a Bluetooth-like round trip: the old init (ATZ, fixed 0.2 s sleeps,
+ATSP0 search on the first query, broadcast requests) against the fast
+path (cached protocol, ATWS + ATSPn, ECU headers pinned with response
+counts), plus the time to resume polling after the link drops.
+
+    python benchmarks/bench_connect.py [latency_ms]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from capabilities import CapabilityCache
+from core import PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from simulator import PriusSimulator, SimulatorTransport
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+
+#  Previous implementation
+def legacy_init(mgr):
+    for cmd in ["ATZ", "ATE0", "ATL0", "ATS0", "ATH1", "ATSP0"]:
+        mgr._send_raw(cmd)
+        time.sleep(0.2)
+    mgr.elm_version = mgr._send_raw("ATI").strip()
+
+
+def manager(latency, cache=None, legacy=False):
+    sim = PriusSimulator(latency=latency, jitter=latency / 4)
+    mgr = VeepeakManager()
+    mgr.cache = cache
+    start = time.perf_counter()
+    if legacy:
+        mgr.transport, mgr.connected = SimulatorTransport(sim), True
+        legacy_init(mgr)
+    else:
+        mgr.attach_transport(SimulatorTransport(sim), "sim-adapter",
+                             lambda: SimulatorTransport(sim))
+    mgr.query("01", "0C")                       # first data (pays any search)
+    return mgr, sim, time.perf_counter() - start
+
+
+def sweep_stats(mgr, sim, sweeps=5):
+    mgr.discover_capabilities(PIDS)
+    commands = sim.commands
+    start    = time.perf_counter()
+    for _ in range(sweeps):
+        mgr.read_values(PIDS)
+    elapsed  = time.perf_counter() - start
+    per_cmd  = elapsed / (sim.commands - commands)
+    return elapsed / sweeps, per_cmd, (sim.commands - commands) / sweeps
+
+
+def reconnect_time(mgr):
+    mgr.read_values(PIDS)
+    start = time.perf_counter()
+    mgr.transport.close()                       # link drops mid-session
+    while True:
+        values = mgr.read_values(PIDS)
+        if mgr.connected and values.get("Engine RPM") is not None:
+            return time.perf_counter() - start
+
+
+def run(latency):
+    cache = CapabilityCache(os.path.join(tempfile.mkdtemp(), "caps.json"))
+    cases = (("legacy", dict(legacy=True)),
+             ("fast, first connect", dict(cache=cache)),
+             ("fast, cached protocol", dict(cache=cache)))
+    print(f"simulated adapter round trip {latency * 1000:.0f} ms")
+    for label, kw in cases:
+        mgr, sim, connect = manager(latency, **kw)
+        sweep, per_cmd, cmds = sweep_stats(mgr, sim)
+        print(f"{label:22s} connect {connect:5.2f} s   sweep {sweep * 1000:6.0f} ms "
+              f"({cmds:4.1f} commands, {per_cmd * 1000:5.1f} ms each)")
+    print(f"reconnect after link drop: polling resumed in {reconnect_time(mgr):.2f} s")
+
+
+if __name__ == "__main__":
+    run(float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.02)
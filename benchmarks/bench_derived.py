@@ -0,0 +1,108 @@
+"""
+Derived-signal engine at high sample rates: whole-sweep updates,
+single-reply updates (one PID per call, as a scheduler delivers them),
+and a recompute-everything baseline. Also checks integrated energy and
+fuel against the simulator's own per-step totals. Samples come from
+the Prius model, quantised as the ECU sends them.
+
+    python benchmarks/bench_derived.py [sim_minutes] [hz]
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import PRIUS_PIDS, STANDARD_PIDS
+from decoders import compile_decoder, encode_value
+from derived import CLEAR, KW_PER_NM_RPM, DerivedSignals
+from simulator import DT, SIGNALS, PriusSimulator, TANK_L
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+
+def samples(minutes, hz):
+    """[(t, {name: value})] at hz, plus the model's regen energy (Wh)
+    and fuel used (L) integrated at every model step."""
+    model = PriusSimulator(time_scale=0).model
+    quant = []
+    for name, mode, pid, _unit, formula, *_ in PIDS:
+        fn = compile_decoder(formula, 0)
+        quant.append((name, SIGNALS[mode + pid][0],
+                      lambda x, f=formula, fn=fn: fn(list(encode_value(f, x)))))
+    steps = max(1, round(1 / hz / DT))
+    fuel0, regen, out = model.fuel, 0.0, []
+    for i in range(int(minutes * 60 * hz)):
+        for _ in range(steps):
+            model.step(DT)
+            kw = model.mg2_nm * model.mg2_rpm * KW_PER_NM_RPM
+            regen += max(0.0, -kw) * DT / 3.6
+        out.append((model.t, {n: q(getattr(model, a)) for n, a, q in quant}))
+    return out, regen, (fuel0 - model.fuel) * TANK_L / 100
+
+
+def _rate(fn, n, repeat=3):
+    """Best of repeat runs of fn(), as n / seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def feed(calls):
+    eng = DerivedSignals(PIDS)
+    for t, s in calls:
+        eng.update(s, t)
+    return eng
+
+
+def recompute_all(calls):
+    """Baseline: every derived signal from scratch on every call, no
+    limit checks or integration."""
+    eng = DerivedSignals(PIDS)
+    nodes = [(n.name, [eng._names[i] for i in n.inputs], n.fn)
+             for n in eng._nodes if n.fn is not None]
+    vals = {}
+    for _t, s in calls:
+        vals.update(s)
+        for name, inputs, fn in nodes:
+            args = [vals.get(i) for i in inputs]
+            vals[name] = None if None in args else fn(*args)
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    hz      = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    frames, regen_wh, fuel_l = samples(minutes, hz)
+    # One reply per call: each sweep's PIDs spread evenly over its period
+    step  = 1 / hz / len(PIDS)
+    calls = [(t + k * step, {name: v}) for t, s in frames
+             for k, (name, v) in enumerate(s.items())]
+    same  = [(t, frames[-1][1]) for t, _ in frames]
+    print(f"{len(frames)} sweeps of {len(PIDS)} PIDs over {minutes:.0f} sim min "
+          f"at {hz:.0f} Hz")
+    for label, data in (("sweep", frames), ("reply", calls), ("unchanged", same)):
+        rate = _rate(lambda: feed(data), len(data))
+        base = _rate(lambda: recompute_all(data), len(data))
+        print(f"  {label:9s} update {rate:9.0f} /s ({1e6 / rate:5.1f} us)  "
+              f"recompute all {base:9.0f} /s")
+
+    for label, data in (("sweep", frames), ("reply", calls)):
+        v = feed(data).values
+        print(f"  {label:5s} regen {v['Regen Energy']:7.1f} Wh (model {regen_wh:.1f})  "
+              f"fuel {v['Fuel Used']:6.3f} L (model {fuel_l:.3f})")
+    eng, modes = DerivedSignals(PIDS), Counter()
+    for t, s in frames:
+        modes[eng.update(s, t).get("Drive Mode") or eng.values["Drive Mode"]] += 1
+    print("  drive mode " + "  ".join(f"{k} {c / len(frames):.0%}"
+                                      for k, c in modes.most_common()))
+    alerts = Counter(name for _t, name, state, _v in eng.alerts if state != CLEAR)
+    print(f"  alerts     {dict(alerts) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
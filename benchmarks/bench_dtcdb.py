@@ -0,0 +1,104 @@
+"""
+DTC database at catalog scale: open cost, exact lookups and console
+prefix searches over the memory-mapped file, against the old approach
+of a dict of every description built at import time.
+
+A synthetic catalog of n codes (default 50000, far beyond the shipped
+one) is written to a temp directory; the shipped dtc.bin is measured
+too.
+
+    python benchmarks/bench_dtcdb.py [n_codes]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import dtcdb
+from dtcdb import CATEGORIES, DtcDatabase
+
+ECUS = ["", "HV ECU", "Battery ECU", "Inverter ECU", "Brake ECU"]
+
+
+def synthetic(n, rng):
+    codes = set()
+    while len(codes) < n:
+        codes.add(f"{rng.choice(CATEGORIES)}{rng.randrange(0x4000):04X}")
+    for code in sorted(codes):
+        yield (code, f"Synthetic {code} Circuit Range/Performance Problem",
+               rng.choice(ECUS), rng.randrange(5),
+               "Check the wiring and connector." if rng.random() < 0.3 else "")
+
+
+def _best(fn, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def run(path, rows, label):
+    codes    = [r[0] for r in rows]
+    rng      = random.Random(2)
+    probes   = [rng.choice(codes) for _ in range(5000)]
+    probes  += [f"P{rng.randrange(0x10000):04X}" for _ in range(1000)]   # mostly misses
+    prefixes = [c[:rng.choice((2, 3, 4))] for c in probes[:2000]]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    db = DtcDatabase(path)
+    construct = time.perf_counter() - start
+    start = time.perf_counter()
+    db.lookup(probes[0])
+    first = time.perf_counter() - start
+    db_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    table = {r[0]: r[1:] for r in rows}
+    load = time.perf_counter() - start
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    hits = sum(db.lookup(c) is not None for c in probes)
+    assert hits == sum(c in table for c in probes)
+    lookup = _best(lambda i: db.lookup(probes[i % len(probes)]), 60000)
+    search = _best(lambda i: db.search(prefixes[i % len(prefixes)], 50), 6000)
+    dict_lookup = _best(lambda i: table.get(probes[i % len(probes)]), 60000)
+
+    print(f"{label}: {len(rows)} codes, {os.path.getsize(path) / 1024:.0f} KiB file")
+    print(f"  construct    {construct * 1e6:9.1f} us  (no I/O)")
+    print(f"  first lookup {first * 1e3:9.2f} ms  (open + map)   "
+          f"dict build {load * 1e3:8.2f} ms")
+    print(f"  heap         {db_bytes / 1024:9.1f} KiB              "
+          f"dict       {dict_bytes / 1024:8.1f} KiB")
+    print(f"  lookup       {lookup:9.0f} /s                "
+          f"dict get   {dict_lookup:8.0f} /s")
+    print(f"  prefix       {search:9.0f} /s  (up to 50 hits each)")
+    db.close()
+
+
+def main():
+    n   = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(1)
+    rows = list(synthetic(n, rng))
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.bin")
+    dtcdb.build(rows, path)
+    run(path, rows, "synthetic")
+    os.remove(path)
+
+    import dtc_catalog
+    run(dtcdb.DEFAULT_PATH, dtc_catalog.entries(), "shipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Export throughput: rows/s for CSV and columnar output, raw and
+resampled, from a synthetic recorded session. Needs no Kivy.
+
+    python benchmarks/bench_export.py [minutes] [hz]
+"""
+
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from export import export_columnar, export_csv, read_columnar
+from session import SessionReader, SessionRecorder
+
+PIDS = [(f"PID {i:02d}", "01", f"{i:02X}", "u", "pct", 0, 100) for i in range(26)]
+
+
+def make_session(path, minutes, hz):
+    rec = SessionRecorder(path, PIDS)
+    n = int(minutes * 60 * hz)
+    for k in range(n):
+        t = 1.7e9 + k / hz
+        rec.record_values(t, {p[0]: 50 + 40 * math.sin(t * 0.01 * (i + 1))
+                              for i, p in enumerate(PIDS)})
+    rec.record_dtcs(1.7e9 + 1, ["P0A80"])
+    rec.close()
+    return n * len(PIDS)
+
+
+def timed(label, fn):
+    reader = SessionReader(SESSION)
+    start  = time.perf_counter()
+    rows   = fn(reader)
+    elapsed = time.perf_counter() - start
+    reader.close()
+    print(f"{label:22s} {rows:>9,} rows  {rows / elapsed:>11,.0f} rows/s")
+
+
+def run(minutes, hz):
+    global SESSION
+    tmp = tempfile.mkdtemp()
+    SESSION = os.path.join(tmp, "bench.tss")
+    samples = make_session(SESSION, minutes, hz)
+    print(f"session: {samples:,} samples, {os.path.getsize(SESSION) / 1e6:.2f} MB")
+    out = os.path.join(tmp, "out.tsc")
+    timed("csv long", lambda r: export_csv(r, io.StringIO()))
+    timed("csv resampled 0.1 s", lambda r: export_csv(r, io.StringIO(), 0.1))
+    timed("columnar long", lambda r: export_columnar(r, out))
+    footer, groups = read_columnar(out)
+    assert sum(len(g["time"]) for g in groups) == footer["rows"]
+    timed("columnar resampled 0.1", lambda r: export_columnar(r, out, 0.1))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(float(args[0]) if args else 10, float(args[1]) if len(args) > 1 else 20)
@@ -0,0 +1,82 @@
+"""
+Fleet logger under load: N simulated ELM327 adapters served by a
+separate simulator process (TCP ports or ptys), logged by one Fleet in
+this process for some seconds. Reports throughput, this process's CPU
+per vehicle, and checks every session log reads back.
+
+    python benchmarks/bench_fleet.py [vehicles] [seconds] [--pty]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from fleet import Fleet, opener
+from session import KIND_VALUE, SessionReader
+
+
+def serve(count, pty, latency=0.03, jitter=0.01):
+    """Start the simulator process; returns (process, [adapter spec])."""
+    cmd = [sys.executable, os.path.join(ROOT, "simulator.py"), "--count", str(count),
+           "--latency", str(latency), "--jitter", str(jitter)]
+    cmd += ["--pty"] if pty else ["--tcp", "0"]
+    proc  = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    specs = []
+    for _ in range(count):
+        where = proc.stdout.readline().split(" on ")[-1].strip()
+        specs.append(where if pty else "tcp:" + where)
+    return proc, specs
+
+
+def main():
+    args    = [a for a in sys.argv[1:] if not a.startswith("--")]
+    pty     = "--pty" in sys.argv
+    count   = int(args[0]) if args else 16
+    seconds = float(args[1]) if len(args) > 1 else 20.0
+    proc, specs = serve(count, pty)
+    logs  = tempfile.mkdtemp()
+    fleet = Fleet(logs)
+    for i, spec in enumerate(specs):
+        fleet.add(f"car{i + 1:02d}", opener(spec))
+    try:
+        fleet.start()
+        start = time.monotonic()
+        while time.monotonic() - start < seconds:
+            time.sleep(min(5.0, seconds))
+            print(fleet.report().splitlines()[0], flush=True)
+        fleet.stop()
+        s = fleet.stats()
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    polling = [v for v in s["vehicles"].values() if v["sweeps"]]
+    connect = sorted(v["connect_s"] for v in polling if v["connect_s"])
+    print(f"\n{count} adapters over {'ptys' if pty else 'TCP'}, {s['seconds']:.0f} s")
+    print(f"  polling      {len(polling)}/{count}, connect "
+          f"{connect[0] if connect else 0:.1f}-{connect[-1] if connect else 0:.1f} s")
+    print(f"  throughput   {s['values_per_s']:.0f} values/s "
+          f"({s['values_per_s'] / count:.1f} per vehicle), {s['commands']} commands, "
+          f"{s['timeouts']} timeouts, {s['errors']} errors")
+    print(f"  cpu          {s['cpu_percent']:.1f} % of a core, "
+          f"{s['cpu_ms_per_vehicle_s']:.2f} ms per vehicle-second")
+
+    values = size = 0
+    for v in s["vehicles"].values():
+        if not v["log"]:
+            continue
+        size += os.path.getsize(v["log"])
+        reader = SessionReader(v["log"])
+        values += sum(1 for r in reader.records() if r[0] == KIND_VALUE)
+        reader.close()
+    print(f"  logs         {size / 1024:.0f} KiB, {values} values read back "
+          f"({values / max(1, s['values']):.0%} of logged)")
+
+
+if __name__ == "__main__":
+    main()
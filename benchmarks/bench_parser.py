@@ -0,0 +1,120 @@
+"""
+ELM327 reply parsing: throughput of elmparse against the previous
+string-splitting parser on a corpus of recorded replies, plus a fuzz
+pass that mutates the corpus and checks the parser never raises.
+
+    python benchmarks/bench_parser.py [iterations] [fuzz_cases]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import elmparse
+
+# Replies as read from the adapter (ATH1, spaces on and off, ATL0/ATL1)
+CORPUS = [
+    b"41 0C 1A F8 \r\r>",
+    b"7E8 04 41 0C 1A F8 AA AA AA\r\r>",
+    b"7E804410C1AF8AAAAAA\r\r>",
+    b"7E8 03 41 0D 32 AA AA AA AA\r7E9 03 41 0D 32 AA AA AA AA\r\r>",
+    b"7E8 10 0E 41 0C 1A F8 0D 32\r7E8 21 05 7E 11 33 04 4D 0F\r7E8 22 41 AA AA AA AA AA AA\r\r>",
+    b"7EA 05 62 F4 01 07 9E AA AA\r\r>",
+    b"18DAF11004410C1AF8AAAAAA\r\r>",
+    b"7E8 10 14 49 02 01 4A 54 44\r7E8 21 4B 4E 33 44 55 35 41\r7E8 22 30 30 30 30 30 30 31\r\r>",
+    b"014\r0:4902014A5444\r1:4B4E3344553541\r2:30303030303031\r\r>",
+    b"7E8 10 08 43 03 01 03 0A 7F\r7E8 21 00 00 AA AA AA AA AA\r\r>",
+    b"43 01 03 00 01 0A 7F 00 00\r\n>",
+    b"SEARCHING...\r7E8 06 41 00 BE 3F B8 13\r\r>",
+    b"NO DATA\r\r>",
+    b"7E8 03 7F 22 31 AA AA AA AA\r\r>",
+    b"CAN ERROR\r\r>",
+]
+
+# The 2101 HV battery frame: 28 module voltages in one multi-frame reply
+_payload = bytes([0x61, 0x01]) + b"".join(
+    (7800 + 13 * i).to_bytes(2, "big") for i in range(28))
+_frames  = [b"7E8 10 %02X " % len(_payload) + _payload[:6].hex(" ").upper().encode()]
+for seq, i in enumerate(range(6, len(_payload), 7), start=1):
+    _frames.append(b"7E8 2%X " % (seq & 0x0F) + _payload[i:i + 7].hex(" ").upper().encode())
+CORPUS.append(b"\r".join(_frames) + b"\r\r>")
+
+
+#  Previous parser
+def legacy_parse(raw):
+    for line in raw.split("\n"):
+        line = line.replace(">", "").strip()
+        if not line or line.upper() in ("NO DATA", "ERROR", "?",
+                                         "SEARCHING...", "STOPPED"):
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            try:
+                return [int(b, 16) for b in parts]
+            except ValueError:
+                continue
+    return None
+
+
+def legacy_path(raw):
+    return legacy_parse(raw.decode("ascii", errors="ignore").replace("\r", "\n"))
+
+
+def new_path(raw):
+    data = elmparse.parse(raw).data()
+    return list(data) if data else None
+
+
+def throughput(fn, corpus, n):
+    start = time.perf_counter()
+    for i in range(n):
+        fn(corpus[i % len(corpus)])
+    return n / (time.perf_counter() - start)
+
+
+def is_multi_frame(raw):
+    return b"\r1:" in raw or b" 21 " in raw
+
+
+def fuzz(cases, seed=1):
+    rng = random.Random(seed)
+    alphabet = b"0123456789ABCDEF :\r\n>NODATA"
+    for _ in range(cases):
+        buf = bytearray(rng.choice(CORPUS))
+        for _ in range(rng.randint(1, 6)):
+            op = rng.random()
+            i  = rng.randrange(len(buf) + 1)
+            if op < 0.4 and buf:
+                del buf[min(i, len(buf) - 1)]
+            elif op < 0.8:
+                buf.insert(i, rng.choice(alphabet))
+            else:
+                buf[i:i] = rng.choice(CORPUS)
+        reply = elmparse.parse(bytes(buf))
+        elmparse.decode_dtcs(reply)
+
+
+def run(n, cases):
+    batt = elmparse.parse(CORPUS[-1]).data()
+    print(f"2101 frame reassembled: {len(batt)} bytes "
+          f"({(len(batt) - 2) // 2} modules)")
+    single = [r for r in CORPUS if not is_multi_frame(r)]
+    multi  = [r for r in CORPUS if is_multi_frame(r)]
+    # legacy stops at the first frame of a multi-frame reply, so its
+    # multi-frame figure is for a truncated (wrong) result
+    for kind, corpus in (("single-frame", single), ("multi-frame", multi)):
+        for label, fn in (("legacy", legacy_path), ("elmparse", new_path)):
+            rate = throughput(fn, corpus, n) / 1000
+            print(f"{kind:13s} {label:9s} {rate:8.1f} k replies/s")
+    start = time.perf_counter()
+    fuzz(cases)
+    print(f"fuzz: {cases} mutated replies parsed without error "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(int(args[0]) if args else 100000, int(args[1]) if len(args) > 1 else 20000)
@@ -0,0 +1,67 @@
+"""
+Command-queue latency: live polling floods the asyncio link while
+console and DTC commands are injected; reports queue-wait and service
+percentiles per priority against an asyncio fake ELM327.
+
+    python benchmarks/bench_queue.py [seconds] [adapter_latency_ms]
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from asynclink import (PRIO_CONSOLE, PRIO_DTC, PRIO_LIVE, AsyncLink,
+                       LinkBridge, serve_fake_elm)
+from core import VeepeakManager
+
+LIVE = ["010C", "010D", "22F402", "22E3", "22E4", "2110"]
+
+
+def run(seconds, latency):
+    responder = VeepeakManager()._demo_response
+    server_loop = asyncio.new_event_loop()
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+    server = asyncio.run_coroutine_threadsafe(
+        serve_fake_elm(responder, latency=latency), server_loop).result()
+    host, port = server.sockets[0].getsockname()[:2]
+
+    bridge = LinkBridge(lambda: AsyncLink.open_tcp(host, port))
+    stop   = threading.Event()
+
+    def live_poller():
+        i = 0
+        while not stop.is_set():
+            bridge.request_sync(LIVE[i % len(LIVE)], PRIO_LIVE, 1.0)
+            i += 1
+
+    pollers = [threading.Thread(target=live_poller, daemon=True) for _ in range(3)]
+    for t in pollers:
+        t.start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        bridge.request_sync("03", PRIO_DTC, 2.0)
+        bridge.request_sync("ATI", PRIO_CONSOLE, 2.0)
+        time.sleep(0.2)
+    # leaving the Live screen: queued polls are dropped immediately
+    t0 = time.perf_counter()
+    bridge.cancel_tag("live")
+    stop.set()
+    for t in pollers:
+        t.join()
+    print(f"cancel live + drain pollers: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    for tag, r in bridge.latency_report().items():
+        q = " ".join(f"{k} {v * 1000:6.2f}" for k, v in r["queue"].items())
+        s = " ".join(f"{k} {v * 1000:6.2f}" for k, v in r["service"].items())
+        print(f"{tag:8s} n={r['count']:5d}  queue ms: {q}  service ms: {s}")
+    bridge.close()
+    server.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(float(args[0]) if args else 3.0, float(args[1]) / 1000 if len(args) > 1 else 0.02)
@@ -0,0 +1,124 @@
+"""
+Live grid rendering: graphics instructions allocated and update cost
+per frame for the retained-mode widgets fed through UpdateCoalescer,
+against the old clear-and-redraw widgets updated on every sample.
+
+No window is opened and the Kivy event loop never runs: each frame
+moves every card (as a ScrollView does) and feeds it the sweeps that
+arrived since the previous frame. Kivy must be importable; on a
+machine without a display run it under xvfb-run.
+
+    python benchmarks/bench_render.py [frames] [sweeps_per_frame]
+"""
+
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main as app
+from coalesce import UpdateCoalescer
+from main import C, PIDCard, PRIUS_PIDS, STANDARD_PIDS, dp
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+ALLOCATED = {"Color": 0, "RoundedRectangle": 0}
+
+
+def _counting(cls):
+    name = cls.__name__
+
+    def make(*args, **kw):
+        ALLOCATED[name] += 1
+        return cls(*args, **kw)
+    return make
+
+
+#  Previous implementation (canvas cleared and rebuilt on every event)
+class LegacyPIDCard(PIDCard):
+    def _draw_bg(self, *_):
+        self.canvas.before.clear()
+        with self.canvas.before:
+            app.Color(*C["border"])
+            app.RoundedRectangle(pos=self.pos, size=self.size, radius=[dp(14)])
+            app.Color(*C["panel"])
+            app.RoundedRectangle(pos=(self.x+1, self.y+1),
+                                  size=(self.width-2, self.height-2),
+                                  radius=[dp(13)])
+
+    def _draw_bar(self, *_):
+        span = (self._mx - self._mn) or 1
+        frac = min(1.0, max(0.0, (self._val - self._mn) / span))
+        self._bar.canvas.clear()
+        with self._bar.canvas:
+            app.Color(*C["surface"])
+            app.RoundedRectangle(pos=self._bar.pos, size=self._bar.size,
+                                  radius=[dp(2)])
+            app.Color(*self._accent)
+            app.RoundedRectangle(pos=self._bar.pos,
+                                  size=(self._bar.width * frac, self._bar.height),
+                                  radius=[dp(2)])
+
+    def set_value(self, value):
+        self._val = value
+        self._val_lbl.text = f"{value:.1f}"
+        self._draw_bar()
+        return True
+
+
+def _sweep(rng):
+    return {p[0]: round(rng.uniform(p[5], p[6]), 1) for p in PIDS}
+
+
+def run(frames, per_frame, retained):
+    rng   = random.Random(1)
+    cls   = PIDCard if retained else LegacyPIDCard
+    cards = {p[0]: cls(p[0], p[3], p[5], p[6], C["mint"]) for p in PIDS}
+    for card in cards.values():
+        card.size = (dp(160), dp(90))
+        card._bar.size = (dp(140), dp(5))
+    coalescer = UpdateCoalescer(lambda name, v: cards[name].set_value(v))
+
+    for k in ALLOCATED:
+        ALLOCATED[k] = 0
+    updates = 0
+    start   = time.perf_counter()
+    for f in range(frames):
+        for i, card in enumerate(cards.values()):
+            card.pos = (0, i * dp(96) - f)        # scrolled by one pixel
+            card._draw_bg()
+            card._bar.pos = (card.x + dp(10), card.y + dp(8))
+            card._draw_bar()
+        for _ in range(per_frame):
+            sweep = _sweep(rng)
+            if retained:
+                coalescer.push_many(sweep)
+            else:
+                for name, v in sweep.items():
+                    updates += cards[name].set_value(v)
+        if retained:
+            updates += coalescer.flush()
+    elapsed = time.perf_counter() - start
+    return {"instructions_per_frame": sum(ALLOCATED.values()) / frames,
+            "us_per_frame": elapsed / frames * 1e6,
+            "label_updates_per_frame": updates / frames}
+
+
+def main():
+    frames    = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    per_frame = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    app.Color            = _counting(app.Color)
+    app.RoundedRectangle = _counting(app.RoundedRectangle)
+    print(f"{len(PIDS)} cards, {frames} frames, {per_frame} sweeps per frame")
+    for label, retained in (("legacy", False), ("retained", True)):
+        r = run(frames, per_frame, retained)
+        print(f"  {label:9s} {r['instructions_per_frame']:8.1f} instructions/frame"
+              f"  {r['us_per_frame']:9.1f} us/frame"
+              f"  {r['label_updates_per_frame']:6.1f} label updates/frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+PriusSimulator: simulated seconds per wall second, command throughput
+with multi-PID and multi-frame replies, and a check that the signals
+read back through the real decoders agree with each other (MG2 speed
+follows vehicle speed, braking charges the pack).
+
+    python benchmarks/bench_simulator.py [sim_hours]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import elmparse
+from decoders import DecoderRegistry
+from simulator import FINAL, MG2_RATIO, WHEEL_R, PriusSimulator
+
+PIDS = [("speed", "01", "0D", "", "speed"), ("mg2", "22", "E4", "", "mg_speed"),
+        ("amps", "22", "F402", "", "pack_a"), ("rpm", "01", "0C", "", "rpm")]
+RPM_PER_KMH = FINAL * MG2_RATIO / (3.6 * WHEEL_R) * 60 / (2 * 3.141592653589793)
+
+
+def run(hours):
+    sim = PriusSimulator(time_scale=0, ready=True)
+    start = time.perf_counter()
+    sim.advance(hours * 3600)
+    elapsed = time.perf_counter() - start
+    print(f"model    {hours * 3600 / elapsed:10.0f} x real time  "
+          f"({hours:g} h in {elapsed:.2f} s)")
+
+    cmds = ["010C0D0511", "0902", "22F401", "22F402", "2110", "03"]
+    n = 20000
+    start = time.perf_counter()
+    for i in range(n):
+        sim.respond(cmds[i % len(cmds)])
+    elapsed = time.perf_counter() - start
+    print(f"replies  {n / elapsed:10.0f} commands/s")
+
+    registry = DecoderRegistry(PIDS)
+    worst, regen, braking = 0.0, 0, 0
+    last_speed = None
+    for _ in range(3000):
+        sim.advance(0.5)
+        frames = {}
+        for _name, mode, pid, *_ in PIDS:
+            d = elmparse.parse(sim.respond(mode + pid)).data(int(mode, 16) + 0x40)
+            frames[(mode, pid)] = list(d) if d else None
+        v = registry.decode_sweep(frames)
+        worst = max(worst, abs(v["mg2"] - v["speed"] * RPM_PER_KMH) / RPM_PER_KMH)
+        if last_speed is not None and v["speed"] < last_speed - 2:
+            braking += 1
+            regen   += v["amps"] < 0
+        last_speed = v["speed"]
+    print(f"check    MG2 vs speed within {worst:.2f} km/h, "
+          f"pack charging in {regen}/{braking} braking samples")
+
+
+if __name__ == "__main__":
+    run(float(sys.argv[1]) if len(sys.argv) > 1 else 1.0)
@@ -0,0 +1,72 @@
+"""
+Cold-start cost: importing the OBD core and the Kivy app shell (main)
+in a fresh interpreter each time, from python -X importtime, with the
+slowest modules each pulls in. core must not import any GUI module.
+main is skipped where Kivy is not installed.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+GUI  = ("kivy", "jnius", "android")
+
+
+def _importtime(module):
+    """{module: (self_us, cumulative_us)} for one cold import of module."""
+    env = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1",
+               PYTHONDONTWRITEBYTECODE="")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cum_us, name = (f.strip() for f in line[12:].split("|"))
+        if self_us.isdigit():
+            out[name.strip()] = (int(self_us), int(cum_us))
+    return out
+
+
+def import_ms(module, runs=5):
+    """(median ms to import module cold, the last run's importtime map)."""
+    times, last = [], {}
+    for _ in range(runs):
+        last = _importtime(module)
+        times.append(last[module][1] / 1000)
+    return statistics.median(times), last
+
+
+def report(module, runs):
+    ms, table = import_ms(module, runs)
+    gui = sorted(n for n in table if n.split(".")[0] in GUI)
+    top = sorted(((cum, n) for n, (_, cum) in table.items()
+                  if "." not in n and n != module), reverse=True)[:6]
+    print(f"{module:5s} {ms:8.1f} ms  ({len(table)} modules, "
+          f"{len(gui)} GUI modules)")
+    for cum, name in top:
+        print(f"        {cum / 1000:8.1f} ms  {name}")
+    return ms, gui
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    _, gui = report("core", runs)
+    if gui:
+        print(f"core imports GUI modules: {', '.join(gui[:5])}")
+        sys.exit(1)
+    if importlib.util.find_spec("kivy") is None:
+        print("main  skipped (Kivy not installed)")
+    else:
+        report("main", runs)
+
+
+if __name__ == "__main__":
+    main()
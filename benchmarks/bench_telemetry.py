@@ -0,0 +1,66 @@
+"""
+Telemetry overhead and output: cost of one record(), CPU-only sweep
+rate with telemetry on and off, then the console report after a few
+real-time sweeps against the simulated adapter with bus errors.
+
+    python benchmarks/bench_telemetry.py [sweeps]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from simulator import PriusSimulator, SimulatorTransport
+from telemetry import Telemetry
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+
+def _connected(realtime, **sim_kw):
+    sim = PriusSimulator(time_scale=1.0, **sim_kw)
+    mgr = VeepeakManager()
+    mgr.attach_transport(SimulatorTransport(sim, realtime))
+    mgr.discover_capabilities(PIDS)
+    return mgr
+
+
+def _best(fn, n, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main():
+    sweeps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    tel   = Telemetry()
+    reply = b"7EB03410C1AF8\r\r>"
+    rate  = _best(lambda i: tel.record("010C1", 0.021, 6, reply, 0.02, 0.0001), 200000)
+    print(f"record()      {1e9 / rate:7.0f} ns")
+
+    mgr = _connected(False)
+    for enabled in (False, True):
+        mgr.telemetry.enabled = enabled
+        hz = _best(lambda i: mgr.read_values(PIDS), sweeps * 20)
+        print(f"sweep cpu     {hz:7.0f} Hz  telemetry {'on' if enabled else 'off'}")
+
+    mgr = _connected(True, latency=0.02, jitter=0.01, error_rate=0.02)
+    mgr.telemetry.reset()
+    for _ in range(sweeps):
+        mgr.read_values(PIDS)
+    print()
+    print(mgr.telemetry.report())
+    path = os.path.join(tempfile.mkdtemp(), "telemetry.json")
+    mgr.telemetry.dump(path)
+    print(f"\nsnapshot: {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+TimeSeriesStore: memory for an hour of 20 Hz data on all 26 PIDs,
+append rate from the polling side and snapshot cost on the UI side.
+
+    python benchmarks/bench_timeseries.py [hours] [hz]
+"""
+
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from timeseries import MINUTE, RAW, SECOND, TimeSeriesStore
+
+NAMES = [f"PID {i:02d}" for i in range(26)]
+
+
+def run(hours, hz):
+    tracemalloc.start()
+    store = TimeSeriesStore(NAMES)
+    held  = tracemalloc.get_traced_memory()[0]
+    n     = int(hours * 3600 * hz)
+    sweep = {name: 0.0 for name in NAMES}
+
+    start = time.perf_counter()
+    for i in range(n):
+        t = i / hz
+        v = math.sin(t * 0.1)
+        for name in NAMES:
+            sweep[name] = v
+        store.append_many(t, sweep)
+    elapsed = time.perf_counter() - start
+    store.flush()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    samples = n * len(NAMES)
+    print(f"{hours} h @ {hz} Hz x {len(NAMES)} PIDs = {samples:,} samples")
+    print(f"store arrays    {store.nbytes() / 1e6:6.2f} MB "
+          f"(traced {held / 1e6:.2f} MB, peak {peak / 1e6:.2f} MB)")
+    print(f"append          {samples / elapsed / 1e6:6.2f} M samples/s "
+          f"({elapsed / n * 1e6:.1f} us per 26-PID sweep)")
+    for res in (RAW, SECOND, MINUTE):
+        reps  = 200
+        start = time.perf_counter()
+        for _ in range(reps):
+            cols = store.snapshot(NAMES[0], res)
+        per = (time.perf_counter() - start) / reps
+        print(f"snapshot {res:4s}   {per * 1e6:8.1f} us  ({len(cols[0])} points)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(float(args[0]) if args else 1.0, float(args[1]) if len(args) > 1 else 20.0)
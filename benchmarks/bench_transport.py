@@ -0,0 +1,76 @@
+"""
+Per-command latency through the transport layer against a fake ELM327.
+
+Compares the buffered Transport.exchange() path with the old
+byte-at-a-time, 10 ms sleep-polling read loop, over TCP and a pty.
+
+    python benchmarks/bench_transport.py [commands] [adapter_latency_ms]
+"""
+
+import os
+import select
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core import VeepeakManager
+from transport import FakeElm327, FdTransport, SocketTransport
+
+COMMANDS = ["010C", "010D", "0105", "22F401", "22F402", "2110"]
+
+
+def legacy_exchange(fd, cmd, timeout=4.0):
+    """The pre-transport loop: one write per byte, sleep-poll reads."""
+    for b in (cmd + "\r").encode("ascii"):
+        os.write(fd, bytes([b]))
+    resp  = bytearray()
+    start = time.time()
+    while time.time() - start < timeout:
+        if select.select([fd], [], [], 0)[0]:
+            byte = os.read(fd, 1)[0]
+            resp.append(byte)
+            if byte == ord(">"):
+                break
+        else:
+            time.sleep(0.01)
+    return bytes(resp)
+
+
+def percentiles(samples):
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))] * 1000
+    return f"p50 {pick(0.5):6.2f}  p90 {pick(0.9):6.2f}  p99 {pick(0.99):6.2f} ms"
+
+
+def measure(fn, n):
+    samples = []
+    for i in range(n):
+        cmd = COMMANDS[i % len(COMMANDS)]
+        t0  = time.perf_counter()
+        fn(cmd)
+        samples.append(time.perf_counter() - t0)
+    return percentiles(samples)
+
+
+def run(n, latency):
+    responder = VeepeakManager()._demo_response
+    fake = FakeElm327(responder, latency)
+
+    host, port = fake.serve_tcp()
+    tcp = SocketTransport.connect(host, port)
+    print("tcp  buffered ", measure(tcp.exchange, n))
+    tcp.close()
+
+    path = fake.serve_pty()
+    pty  = FdTransport.open(path)
+    print("pty  buffered ", measure(pty.exchange, n))
+    print("pty  legacy   ", measure(lambda c: legacy_exchange(pty.fd, c), n))
+    pty.close()
+    fake.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(int(args[0]) if args else 300,
+        float(args[1]) / 1000 if len(args) > 1 else 0.0)
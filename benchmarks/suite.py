@@ -0,0 +1,250 @@
+"""
+End-to-end benchmark suite for the OBD pipeline, emitting JSON so
+builds can be compared. Drives VeepeakManager against the simulated
+Prius (no car, Bluetooth or display needed) and reports:
+
+    sweep.*    full STANDARD_PIDS + PRIUS_PIDS sweep rate, with the
+               simulated adapter's delays and CPU-only
+    command.*  per-command round-trip percentiles
+    parse.*    _parse / _parse_dtcs throughput on canned replies
+    decode.*   decoder registry throughput
+    derived.*  derived-signal updates per sweep and per single reply
+    memory.*   bytes for an hour of history and of session log
+    startup.*  cold import of the OBD core
+
+    python benchmarks/suite.py [-o results.json] [--quick]
+    python benchmarks/suite.py -o new.json --compare old.json
+
+Metrics ending in _hz or _per_s are better higher, all others lower.
+With --compare the exit status is 1 if any metric got worse by more
+than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import core
+from bench_derived import samples
+from bench_parser import CORPUS
+from bench_startup import import_ms
+from core import DECODERS, PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from derived import DerivedSignals
+from session import SessionRecorder
+from simulator import DT, SIGNALS, PriusSimulator, SimulatorTransport
+from timeseries import TimeSeriesStore
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+
+def _percentiles(samples, prefix):
+    s = sorted(samples)
+    return {f"{prefix}.p{q}_ms": s[min(len(s) - 1, len(s) * q // 100)] * 1000
+            for q in (50, 90, 99)}
+
+
+def _rate(fn, n, repeat=3):
+    """Best of repeat runs of fn(i) for i in range(n), in calls/s;
+    the best run is the one least disturbed by the rest of the box."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(n):
+            fn(i)
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def _connected(latency, jitter, realtime):
+    sim = PriusSimulator(time_scale=1.0, latency=latency, jitter=jitter)
+    mgr = VeepeakManager()
+    mgr.attach_transport(SimulatorTransport(sim, realtime))
+    mgr.discover_capabilities(PIDS)
+    return mgr, sim
+
+
+#
+#  SECTIONS
+#
+def bench_sweep(sweeps, latency, jitter):
+    mgr, sim = _connected(latency, jitter, realtime=True)
+    times, inner = [], mgr.transport.exchange
+
+    def timed(cmd, timeout=4.0):
+        t = time.perf_counter()
+        reply = inner(cmd, timeout)
+        times.append(time.perf_counter() - t)
+        return reply
+    mgr.transport.exchange = timed
+
+    adapter = sim.adapter_time
+    start   = time.perf_counter()
+    for _ in range(sweeps):
+        mgr.read_values(PIDS)
+    elapsed = time.perf_counter() - start
+    out = {"sweep.realtime_hz": sweeps / elapsed,
+           "sweep.commands": len(times) / sweeps,
+           "sweep.modelled_adapter_ms": (sim.adapter_time - adapter) / sweeps * 1000}
+    out.update(_percentiles(times, "command"))
+
+    mgr, _ = _connected(0.0, 0.0, realtime=False)
+    out["sweep.cpu_hz"] = _rate(lambda i: mgr.read_values(PIDS), sweeps * 40)
+    return out
+
+
+def bench_parse(n):
+    mgr   = VeepeakManager()
+    dtcs  = [r for r in CORPUS if b"43" in r.split(b"\r")[0][:12]]
+    out   = {}
+    for label, fn, corpus in (("parse", mgr._parse, CORPUS),
+                              ("parse_dtcs", mgr._parse_dtcs, dtcs)):
+        out[f"parse.{label}_per_s"] = _rate(
+            lambda i: fn(corpus[i % len(corpus)]), n)
+    return out
+
+
+def bench_decode(n):
+    mgr, sim = _connected(0.0, 0.0, realtime=False)
+    sweeps = []
+    for _ in range(50):
+        sim.advance(1.0)
+        sweeps.append(mgr.query_batch([(p[1], p[2]) for p in PIDS]))
+    rate = _rate(lambda i: DECODERS.decode_sweep(sweeps[i % len(sweeps)]), n)
+    return {"decode.values_per_s": rate * len(PIDS)}
+
+
+def bench_derived(minutes, hz=20.0):
+    frames = samples(minutes, hz)[0]
+    calls  = [(t + k * 1e-4, {name: v}) for t, s in frames
+              for k, (name, v) in enumerate(s.items())]
+    out = {}
+    for label, data in (("sweep", frames), ("reply", calls)):
+        def feed(_):
+            eng = DerivedSignals(PIDS)
+            for t, s in data:
+                eng.update(s, t)
+        out[f"derived.{label}_updates_per_s"] = _rate(feed, 1) * len(data)
+    return out
+
+
+def bench_memory(minutes, hz=20.0):
+    """History store held in memory, and session log per hour
+    (recorded for minutes at hz and scaled)."""
+    sim   = PriusSimulator(time_scale=0)
+    model = sim.model
+    attrs = {p[0]: SIGNALS[p[1] + p[2]][0] for p in PIDS}
+    steps = max(1, round(1 / hz / DT))
+
+    def sweep():
+        for _ in range(steps):
+            model.step(DT)
+        return {name: float(getattr(model, a)) for name, a in attrs.items()}
+
+    # Every tier is preallocated, so once the raw ring has wrapped the
+    # footprint is what an hour (or a day) of polling holds
+    tracemalloc.start()
+    store = TimeSeriesStore(list(attrs))
+    for i in range(store._raw[PIDS[0][0]].cap + 1):
+        store.append_many(i / hz, sweep())
+    store.flush()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    path = os.path.join(tempfile.mkdtemp(), "suite.tss")
+    rec  = SessionRecorder(path, PIDS)
+    for i in range(int(minutes * 60 * hz)):
+        rec.record_values(i / hz, sweep())
+    rec.close()
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {"memory.timeseries_bytes": store.nbytes(),
+            "memory.timeseries_traced_bytes": traced,
+            "memory.session_bytes_per_hour": size * 60 / minutes}
+
+
+def bench_startup(runs):
+    return {"startup.core_import_ms": import_ms("core", runs)[0]}
+
+
+#
+#  REPORT
+#
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True,
+                                cwd=os.path.dirname(core.__file__)).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "python": platform.python_version(),
+            "machine": platform.machine(), "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def compare(new, old, threshold):
+    """Print per-metric change; returns the names that regressed."""
+    worse = []
+    for name, value in sorted(new.items()):
+        base = old.get(name)
+        if not base:
+            continue
+        change = value / base - 1
+        higher = name.endswith(("_hz", "_per_s"))
+        bad    = -change if higher else change
+        flag   = "  REGRESSION" if bad > threshold else ""
+        if flag:
+            worse.append(name)
+        print(f"{name:36s} {base:14.4g} -> {value:14.4g}  {change:+7.1%}{flag}")
+    return worse
+
+
+def run(quick=False):
+    scale = 0.2 if quick else 1.0
+    results = {}
+    sections = (("sweep",  lambda: bench_sweep(max(2, int(10 * scale)), 0.02, 0.005)),
+                ("parse",  lambda: bench_parse(int(200000 * scale))),
+                ("decode", lambda: bench_decode(int(20000 * scale))),
+                ("derived", lambda: bench_derived(max(1, int(5 * scale)))),
+                ("memory", lambda: bench_memory(max(1, int(5 * scale)))),
+                ("startup", lambda: bench_startup(max(3, int(9 * scale)))))
+    for name, fn in sections:
+        start = time.perf_counter()
+        results.update(fn())
+        print(f"{name:7s} done in {time.perf_counter() - start:5.1f} s", file=sys.stderr)
+    return {"meta": _meta(), "results": results}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run the ToyotaScan benchmark suite.")
+    ap.add_argument("-o", "--output", help="write JSON here (default: stdout)")
+    ap.add_argument("--quick", action="store_true", help="smaller runs, noisier numbers")
+    ap.add_argument("--compare", metavar="JSON", help="baseline results to compare with")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="relative change counted as a regression (default 0.10)")
+    args = ap.parse_args(argv)
+
+    report = run(args.quick)
+    text   = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)["results"]
+        if compare(report["results"], old, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
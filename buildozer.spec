@@ -4,7 +4,9 @@ package.name    = toyotascan
 package.domain  = org.prius
 
 source.dir      = .
-source.include_exts = py,png,jpg,kv,atlas
+source.include_exts = py,png,jpg,kv,atlas,bin
+source.exclude_dirs = benchmarks
+source.exclude_patterns = dtc_catalog.py, fleet.py
 
 version         = 1.0.0
 
@@ -0,0 +1,83 @@
+"""
+ToyotaScan — per-vehicle PID capability cache
+Remembers which PIDs each car answers so later sessions skip the
+unsupported ones from the first poll.
+"""
+
+import json
+import os
+import threading
+import time
+
+
+def default_data_dir():
+    """App-private storage on Android, ~/.toyotascan elsewhere."""
+    base = os.environ.get("ANDROID_PRIVATE")
+    return base or os.path.expanduser("~/.toyotascan")
+
+
+class CapabilityCache:
+    """JSON file of {vehicle_id: {"supported": ["01:0C", ...], ...}}.
+
+    vehicle_id is the VIN when the car reports one, otherwise
+    "<adapter id>/<responding ECU address>". Adapters are stored alongside under
+    "adapter:<id>" with the protocol they negotiated. Safe to share
+    between managers on different threads (the fleet logger does).
+    """
+
+    def __init__(self, path=None):
+        self.path  = path or os.path.join(default_data_dir(), "capabilities.json")
+        self._data = None
+        self._lock = threading.RLock()
+
+    def _load(self):
+        with self._lock:
+            if self._data is None:
+                try:
+                    with open(self.path) as f:
+                        self._data = json.load(f)
+                except (OSError, ValueError):
+                    self._data = {}
+            return self._data
+
+    def _save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+
+    def get(self, vehicle_id):
+        """Supported {(mode, pid)} for a vehicle, or None if never probed."""
+        entry = self._load().get(vehicle_id)
+        if not entry:
+            return None
+        return {tuple(k.split(":", 1)) for k in entry["supported"]}
+
+    def put(self, vehicle_id, supported, protocol=""):
+        with self._lock:
+            self._load()[vehicle_id] = {
+                "supported": sorted(f"{m}:{p}" for m, p in supported),
+                "protocol":  protocol,
+                "updated":   int(time.time()),
+            }
+            self._save()
+
+    def adapter_protocol(self, adapter_id):
+        """ATSPn protocol number last negotiated by an adapter, or None."""
+        entry = self._load().get("adapter:" + adapter_id)
+        return entry["protocol"] if entry else None
+
+    def put_adapter_protocol(self, adapter_id, protocol):
+        with self._lock:
+            self._load()["adapter:" + adapter_id] = {
+                "protocol": protocol,
+                "updated":  int(time.time()),
+            }
+            self._save()
+
+    def forget(self, vehicle_id):
+        with self._lock:
+            if self._load().pop(vehicle_id, None) is not None:
+                self._save()
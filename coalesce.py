@@ -0,0 +1,61 @@
+"""
+ToyotaScan — UI update coalescer
+Collects the latest value per PID from the polling thread and hands
+them to the UI in one batch per frame, so a burst of sweeps between two
+frames costs one label update per card instead of one per sample.
+"""
+
+import threading
+
+
+class UpdateCoalescer:
+    """Latest-value-wins buffer between a producer thread and the UI.
+
+    apply(key, value) runs on the UI thread from flush() and returns
+    True when it changed something on screen. With Kivy, schedule
+    flush with Clock.schedule_interval(coalescer.flush, 0) to run it
+    once per frame.
+    """
+
+    def __init__(self, apply):
+        self.apply       = apply
+        self._lock       = threading.Lock()
+        self._pending    = {}
+        self.frames      = 0        # flushes that had work to do
+        self.pushed      = 0
+        self.superseded  = 0        # values overwritten before a frame
+        self.applied     = 0        # values that changed the screen
+
+    def push(self, key, value):
+        with self._lock:
+            if key in self._pending:
+                self.superseded += 1
+            self._pending[key] = value
+            self.pushed += 1
+
+    def push_many(self, values):
+        """Queue a {key: value} sweep (None values are kept as '---')."""
+        with self._lock:
+            pending = self._pending
+            self.superseded += sum(1 for k in values if k in pending)
+            pending.update(values)
+            self.pushed += len(values)
+
+    def flush(self, *_):
+        """Apply everything queued since the last frame; returns the
+        number of keys that changed the screen."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+        changed = 0
+        for key, value in batch.items():
+            if self.apply(key, value):
+                changed += 1
+        self.frames  += 1
+        self.applied += changed
+        return changed
+
+    def stats(self):
+        return {"frames": self.frames, "pushed": self.pushed,
+                "superseded": self.superseded, "applied": self.applied}
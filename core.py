@@ -0,0 +1,690 @@
+"""
+ToyotaScan — OBD core
+PID tables, the ELM327 manager (connection, batching, header pinning,
+reconnect, demo mode), DTC reads, battery analytics, derived signals
+and live history, with no GUI imports: desktop tools, benchmarks and the fleet
+daemon use it without Kivy, and main.py adds the UI on top.
+"""
+
+import threading
+import time
+
+from transport import BluetoothTransport
+from decoders import DecoderRegistry
+from battery import MODULE_CMD, ModuleAnalytics, decode_modules
+from derived import DerivedSignals
+from dtcdb import DtcDatabase
+from telemetry import Telemetry
+from timeseries import TimeSeriesStore
+import elmparse
+
+# asynclink.LinkBridge priorities. asynclink pulls in asyncio, so it is
+# imported only by callers that attach a link, not here.
+PRIO_CONSOLE, PRIO_DTC, PRIO_LIVE = 0, 1, 2
+
+#  Bluetooth (Android only, graceful fallback) 
+SPP_UUID = "00001101-0000-1000-8000-00805F9B34FB"
+_ANDROID = None
+
+
+def android_bluetooth():
+    """(BluetoothAdapter, UUID) Java classes, or None off Android.
+
+    pyjnius class lookups are slow, so they happen on first use rather
+    than at import.
+    """
+    global _ANDROID
+    if _ANDROID is None:
+        try:
+            from jnius import autoclass
+            _ANDROID = (autoclass("android.bluetooth.BluetoothAdapter"),
+                        autoclass("java.util.UUID"))
+        except Exception:
+            _ANDROID = False
+    return _ANDROID or None
+
+
+#  PID definitions 
+# (name, mode, pid, unit, formula, min, max) — formula keys decoders.FORMULAS
+STANDARD_PIDS = [
+    ("Engine RPM",         "01", "0C", "rpm",  "rpm",       0,    8000),
+    ("Vehicle Speed",      "01", "0D", "km/h", "speed",     0,    250),
+    ("Coolant Temp",       "01", "05", "°C",   "temp",     -40,   130),
+    ("Intake Air Temp",    "01", "0F", "°C",   "temp",     -40,   100),
+    ("Throttle Position",  "01", "11", "%",    "pct",       0,    100),
+    ("Engine Load",        "01", "04", "%",    "pct",       0,    100),
+    ("Short Fuel Trim B1", "01", "06", "%",    "fuel_trim",-30,    30),
+    ("Long Fuel Trim B1",  "01", "07", "%",    "fuel_trim",-30,    30),
+    ("O2 Sensor B1S1",     "01", "14", "V",    "o2",        0,    1.275),
+    ("MAF Air Flow",       "01", "10", "g/s",  "maf",       0,    200),
+    ("Ignition Timing",    "01", "0E", "°",    "timing",   -10,    60),
+    ("Fuel Level",         "01", "2F", "%",    "pct",       0,    100),
+]
+
+# Prius Toyota-enhanced PIDs — formulas are keys of decoders.FORMULAS
+PRIUS_PIDS = [
+    # (name, mode, pid_hex, unit, formula, min, max)
+    ("HV Battery SOC",     "21", "10",   "%",   "soc",      0,   100),
+    ("HV Battery Voltage", "22", "F401", "V",   "pack_v",   0,   300),
+    ("HV Battery Current", "22", "F402", "A",   "pack_a", -200,  200),
+    ("HV Battery Temp",    "22", "F403", "°C",  "temp",   -40,    80),
+    ("MG1 Speed",          "22", "E3",   "rpm", "mg_speed",-10000,10000),
+    ("MG2 Speed",          "22", "E4",   "rpm", "mg_speed",-10000,10000),
+    ("MG1 Torque",         "22", "E5",   "Nm",  "torque", -300,  300),
+    ("MG2 Torque",         "22", "E6",   "Nm",  "torque", -300,  300),
+    ("Inverter Temp",      "22", "F405", "°C",  "inv_temp",-40,  200),
+    ("DC-DC Output",       "22", "F406", "V",   "dcdc",     0,    20),
+    ("VVT Advance B1",     "21", "25",   "°CA", "vvt",    -50,    50),
+    ("Oil Temp",           "21", "61",   "°C",  "temp",   -40,   200),
+    ("Battery Fan Speed",  "22", "F407", "rpm", "fan",      0,   5000),
+    ("HV SOH",             "22", "F408", "%",   "soh",      0,   100),
+]
+
+# Compiled once at startup; decode a whole sweep with DECODERS.decode_sweep
+DECODERS = DecoderRegistry(STANDARD_PIDS + PRIUS_PIDS)
+
+# Mode 01 data byte counts, needed to split multi-PID replies
+# (SAE J1979 lengths; only PIDs we actually request are listed)
+PID_LENGTHS = {
+    "00": 4, "04": 1, "05": 1, "06": 1, "07": 1, "0C": 2, "0D": 1,
+    "0E": 1, "0F": 1, "10": 2, "11": 1, "14": 2, "20": 4, "2F": 1,
+    "40": 4,
+}
+
+# ELM327 accepts up to 6 PIDs in one Mode 01 request on CAN
+MAX_BATCH_PIDS = 6
+BATCH_MODES    = ("01",)
+
+# Reply deadlines (s): unknown commands, known-supported PIDs, probes
+CMD_TIMEOUT   = 4.0
+PID_TIMEOUT   = 0.5
+PROBE_TIMEOUT = 1.0
+
+# Sent after every adapter reset: echo, linefeeds and spaces off,
+# headers on, adaptive timing and a 100 ms reply timeout (Prius ECUs
+# answer within ~30 ms)
+ELM_SETUP = ("ATE0", "ATL0", "ATS0", "ATH1", "ATAT1", "ATST19")
+
+# Physical request headers (CAN 11-bit) of the ECUs serving each PID.
+# Pinned requests carry a response count, so the adapter returns on
+# the first reply instead of waiting out ATST for other ECUs.
+ECU_ENGINE, ECU_HV, ECU_BATTERY = "7E0", "7E2", "7E3"
+MODE_HEADERS = {"01": ECU_ENGINE}
+PID_HEADERS  = {
+    ("21", "10"):   ECU_HV,      ("21", "25"):   ECU_ENGINE,
+    ("21", "61"):   ECU_ENGINE,  ("22", "E3"):   ECU_HV,
+    ("22", "E4"):   ECU_HV,      ("22", "E5"):   ECU_HV,
+    ("22", "E6"):   ECU_HV,      ("22", "F401"): ECU_BATTERY,
+    ("22", "F402"): ECU_BATTERY, ("22", "F403"): ECU_BATTERY,
+    ("22", "F405"): ECU_HV,      ("22", "F406"): ECU_HV,
+    ("22", "F407"): ECU_BATTERY, ("22", "F408"): ECU_BATTERY,
+    ("21", "CE"):   ECU_BATTERY,
+}
+PROTOCOLS = "123456789ABC"              # ATSPn / ATDPN protocol numbers
+CAN_PROTOCOLS       = ("6", "7", "8", "9", "A", "B", "C")
+CAN_11BIT_PROTOCOLS = ("6", "8")
+
+# Auto-reconnect delay: first retry, doubling up to the cap (s)
+RECONNECT_BACKOFF = (0.5, 30.0)
+
+# Trouble code descriptions (generic SAE + Toyota hybrid), mapped from
+# dtc.bin on the first lookup rather than at startup
+DTCS = DtcDatabase()
+
+
+# 
+#  VEEPEAK BLUETOOTH MANAGER
+# 
+class VeepeakManager:
+    def __init__(self):
+        self.socket      = None
+        self.transport   = None
+        self.connected   = False
+        self.demo_mode   = False
+        self._lock       = threading.Lock()
+        self.elm_version = ""
+        self.demo_latency = 0.0          # simulated adapter round-trip (s)
+        self.demo_profile = "gen3"
+        self._batch_modes = set(BATCH_MODES)
+        self.vehicle_id   = None
+        self.ecu_address  = None
+        self.supported    = None         # {(mode, pid)} once discovered
+        self.discovery    = []           # (cmd, reply) of the last discovery
+        self._probe_log   = None         # collects them while discovering
+        self.can_bus      = True         # ISO 15765 CAN replies
+        self.recorder     = None         # SessionRecorder while logging
+        self.link         = None         # asynclink.LinkBridge, if used
+        self.simulator    = None         # simulator.PriusSimulator in demo mode
+        self.cache        = None         # CapabilityCache for adapter protocols
+        self.adapter_id   = None         # Bluetooth address or host:port
+        self.protocol     = ""           # ATDPN protocol number
+        self.pin_headers  = False        # ATSH per ECU (CAN 11-bit only)
+        self.connect_time = None         # seconds the last _init_elm took
+        self.reconnects   = 0
+        self._header      = None         # current ATSH, None = 7DF
+        self._header_lock = threading.RLock()
+        self._broadcast_only = set()     # pinned request got no answer
+        self._count_digit = True         # adapter takes "2110 1"
+        self._reopen      = None         # () -> fresh transport
+        self._online      = threading.Event()
+        self._state_lock  = threading.Lock()
+        self._reconnector = None
+        self.battery      = ModuleAnalytics()  # fed by read_battery_modules
+        self.telemetry    = Telemetry()        # command-path latency and errors
+        self.derived      = DerivedSignals(STANDARD_PIDS + PRIUS_PIDS)  # fed by read_values
+        self.history      = TimeSeriesStore([p[0] for p in STANDARD_PIDS + PRIUS_PIDS])
+
+    def scan_paired_devices(self):
+        bt = android_bluetooth()
+        if not bt:
+            return [("VEEPEAK (demo)", "00:11:22:33:44:55")]
+        try:
+            adapter = bt[0].getDefaultAdapter()
+            if not adapter: return []
+            return [(d.getName(), d.getAddress())
+                    for d in adapter.getBondedDevices().toArray()]
+        except Exception as e:
+            return []
+
+    def connect(self, address, callback):
+        threading.Thread(target=self._connect_thread,
+                         args=(address, callback), daemon=True).start()
+
+    def _connect_thread(self, address, callback):
+        if self.demo_mode:
+            time.sleep(1.0)
+            self.connected = True
+            callback(True, "Demo mode active")
+            return
+        if not android_bluetooth():
+            # No Bluetooth off Android: dev builds talk to the simulator
+            self.demo_mode = True
+            self.connected = True
+            callback(True, "Connected (dev build, simulated car)")
+            return
+        try:
+            transport = self._open_bluetooth(address)
+            self.attach_transport(transport, address,
+                                  lambda: self._open_bluetooth(address))
+            name = android_bluetooth()[0].getDefaultAdapter().getRemoteDevice(address).getName()
+            callback(True, f"Connected to {name}")
+        except Exception as e:
+            self.connected = False
+            callback(False, str(e))
+
+    def _open_bluetooth(self, address):
+        adapter_cls, uuid_cls = android_bluetooth()
+        adapter = adapter_cls.getDefaultAdapter()
+        device  = adapter.getRemoteDevice(address)
+        uuid    = uuid_cls.fromString(SPP_UUID)
+        # Try insecure socket first (works without PIN re-prompt)
+        try:
+            sock = device.createInsecureRfcommSocketToServiceRecord(uuid)
+        except Exception:
+            sock = device.createRfcommSocketToServiceRecord(uuid)
+        adapter.cancelDiscovery()
+        sock.connect()
+        self.socket = sock
+        return BluetoothTransport(sock)
+
+    def attach_transport(self, transport, adapter_id=None, reopen=None):
+        """Use an already-open transport (Bluetooth, socket, pty).
+
+        adapter_id keys the remembered protocol in self.cache; with
+        reopen (returning a fresh transport) a dropped link is
+        reconnected in the background.
+        """
+        self.transport    = transport
+        self.adapter_id   = adapter_id
+        self._reopen      = reopen
+        self.connected    = True
+        self._online.set()
+        self._batch_modes = set(BATCH_MODES)
+        self.supported    = None
+        self._broadcast_only = set()
+        self._count_digit = True
+        self._init_elm()
+
+    def attach_link(self, bridge):
+        """Route commands through an asynclink.LinkBridge command queue,
+        which orders console > DTC > live traffic instead of _lock."""
+        self.link         = bridge
+        self.connected    = True
+        self._batch_modes = set(BATCH_MODES)
+        self.supported    = None
+        self._init_elm()
+
+    def cancel(self, tag):
+        """Drop queued commands of one kind ("live", "dtc", "console"),
+        e.g. when the screen that asked for them is left."""
+        if self.link:
+            self.link.cancel_tag(tag)
+
+    def disconnect(self):
+        self._reopen   = None
+        self.connected = False
+        if self.transport:
+            self.transport.close()
+        if self.link:
+            self.link.close()
+        self.socket = self.transport = self.link = None
+
+    def _init_elm(self):
+        """Initialise the adapter.
+
+        With the protocol remembered for this adapter a warm start
+        (ATWS) and ATSPn skip the full reset and the protocol search;
+        otherwise ATZ and ATSP0, and the protocol the search settles on
+        is remembered. Every command waits for the prompt, so no fixed
+        sleeps are needed. Headers stay on for CAN only: the parser
+        needs the CAN ID there, but cannot split the ISO 9141/KWP
+        header and checksum bytes from the payload.
+        """
+        start = time.monotonic()
+        known = (self.cache.adapter_protocol(self.adapter_id)
+                 if self.cache and self.adapter_id else None)
+        if not known or "ELM" not in self._send_raw("ATWS"):
+            known = None
+            self._send_raw("ATZ")
+        for cmd in ELM_SETUP:
+            self._send_raw(cmd)
+        self.can_bus = True                 # ELM_SETUP turns headers on
+        if known:
+            self._send_raw("ATSP" + known)
+            self._use_protocol(known)
+            if not self._parse(self._send_bytes("0100"), "01", "00"):
+                known = None                # adapter moved to another car?
+        if not known:
+            self._use_protocol("")
+            self._send_raw("ATSP0")
+            self._send_bytes("0100")        # runs the protocol search
+            words = self._send_raw("ATDPN").replace(">", " ").split()
+            dpn   = words[0].upper() if words else ""
+            if len(dpn) == 2 and dpn[0] == "A":
+                dpn = dpn[1]                # "A6": found by the search
+            known = dpn if len(dpn) == 1 and dpn in PROTOCOLS else ""
+            if known and self.cache and self.adapter_id:
+                self.cache.put_adapter_protocol(self.adapter_id, known)
+            self._use_protocol(known)
+        self.protocol    = known
+        self.pin_headers = known in CAN_11BIT_PROTOCOLS
+        self.elm_version = self._send_raw("ATI").replace(">", "").strip()
+        self.connect_time = time.monotonic() - start
+
+    def _use_protocol(self, protocol):
+        """Headers on and CAN parsing for CAN protocols (or while the
+        protocol is unknown), headers off otherwise."""
+        can = not protocol or protocol in CAN_PROTOCOLS
+        if can != self.can_bus:
+            self._send_raw("ATH1" if can else "ATH0")
+            self.can_bus = can
+
+    def _send_raw(self, cmd, timeout=CMD_TIMEOUT, priority=PRIO_LIVE):
+        """Send command, return raw string response."""
+        resp = self._send_bytes(cmd, timeout, priority)
+        return resp.decode("ascii", errors="ignore").replace("\r", "\n")
+
+    def _send_bytes(self, cmd, timeout=CMD_TIMEOUT, priority=PRIO_LIVE):
+        """Send command, return the reply bytes as read from the adapter."""
+        tel   = self.telemetry if self.telemetry.enabled else None
+        start = time.perf_counter() if tel else 0.0
+        ttfb = waited = error = complete = None
+        if self.link is not None:
+            try:
+                resp = self.link.request_sync(cmd, priority, timeout)
+            except Exception as e:
+                resp, error = b"", e
+            if isinstance(error, ConnectionError):
+                self._link_lost()
+        elif self.transport is None and self.demo_mode:
+            if self.demo_latency:
+                time.sleep(self.demo_latency)
+            resp = self._demo_response(cmd).encode("ascii")
+        else:
+            if (self._reopen and not self.connected
+                    and threading.current_thread() is not self._reconnector):
+                # Link down: hold the poller until the reconnect lands
+                if not self._online.wait(timeout):
+                    return b""
+            transport = self.transport
+            if transport is None:
+                return b""
+            with self._lock:
+                if tel:
+                    waited = time.perf_counter() - start
+                    start += waited
+                try:
+                    resp = transport.exchange(cmd, timeout)
+                    ttfb = transport.first_byte
+                    complete = transport.complete
+                except Exception as e:
+                    resp, error = b"", e
+            if error is not None:
+                self._link_lost()
+        if tel:
+            tel.record(cmd, time.perf_counter() - start, len(cmd) + 1, resp,
+                       ttfb, waited, error, complete)
+        c = cmd[:4].upper()
+        if c == "ATSH":
+            self._header = cmd[4:].strip().upper()
+        elif c in ("ATZ", "ATWS", "ATD"):
+            self._header = None
+        if self.recorder:
+            self.recorder.record_exchange(time.time(), cmd, resp)
+        if self._probe_log is not None:
+            self._probe_log.append((cmd, resp))
+        return resp
+
+    #  Reconnect 
+    def _link_lost(self):
+        """The transport failed: mark the link down and, if it can be
+        reopened, reconnect in the background with backoff."""
+        with self._state_lock:
+            if not self.connected:
+                return
+            self.connected = False
+            self._online.clear()
+            if self._reopen is None:
+                return
+            self._reconnector = threading.Thread(target=self._reconnect_loop,
+                                                 daemon=True)
+            self._reconnector.start()
+
+    def _reconnect_loop(self):
+        # The dead transport stays in place until a new one opens, so
+        # pollers keep waiting on _online instead of seeing no link
+        delay, cap = RECONNECT_BACKOFF
+        while self._reopen is not None:
+            old = self.transport
+            if old is not None:
+                old.close()
+            try:
+                transport = self._reopen()
+            except Exception as e:
+                self.telemetry.error("reopen", e)
+                transport = None
+            if transport is not None:
+                if self._reopen is None:        # disconnected meanwhile
+                    transport.close()
+                    return
+                self.transport = transport
+                # Capabilities and scheduler state are kept, so polling
+                # resumes where it stopped once the adapter is back
+                self._init_elm()
+                if self.elm_version:
+                    self.reconnects += 1
+                    self.connected = True
+                    self._online.set()
+                    return
+            time.sleep(delay)
+            delay = min(delay * 2, cap)
+
+    #  Queries 
+    def _header_for(self, mode, pid):
+        """ECU header to pin for (mode, pid), or None to broadcast."""
+        if not self.pin_headers or (mode, pid) in self._broadcast_only:
+            return None
+        return PID_HEADERS.get((mode, pid)) or MODE_HEADERS.get(mode)
+
+    def _send_to(self, header, cmd, timeout=CMD_TIMEOUT, priority=PRIO_LIVE):
+        """Send cmd to one ECU (header pinned with ATSH, one reply
+        expected) or, with header None, broadcast it on 7DF."""
+        with self._header_lock:
+            if (self._header or "7DF") != (header or "7DF"):
+                self._send_bytes("ATSH" + (header or "7DF"), timeout, priority)
+            if header and self._count_digit:
+                resp = self._send_bytes(cmd + "1", timeout, priority)
+                if not resp.lstrip().startswith(b"?"):
+                    return resp
+                self._count_digit = False   # adapter lacks response counts
+            return self._send_bytes(cmd, timeout, priority)
+
+    def query(self, mode, pid, timeout=None):
+        """Send OBD query, return parsed byte list or None."""
+        if self.supported is not None:
+            if (mode, pid) not in self.supported:
+                return None
+            timeout = timeout or PID_TIMEOUT
+        timeout = timeout or CMD_TIMEOUT
+        header  = self._header_for(mode, pid)
+        data    = self._parse(self._send_to(header, mode + pid, timeout), mode, pid)
+        if data is None and header and self.supported is None:
+            # Unknown car: the PID may live on another ECU, ask them all
+            data = self._parse(self._send_to(None, mode + pid, timeout), mode, pid)
+            if data is not None:
+                self._broadcast_only.add((mode, pid))
+        return data
+
+    def read_values(self, pids):
+        """Query and decode pids in one sweep; returns {name: value}."""
+        start  = time.perf_counter()
+        frames = self.query_batch([(p[1], p[2]) for p in pids])
+        values = DECODERS.decode_sweep(frames)
+        if self.telemetry.enabled:
+            self.telemetry.sweep(time.perf_counter() - start)
+        self.feed_values(values)
+        return values
+
+    def feed_values(self, values):
+        """Pass a decoded {name: value} sweep to self.derived,
+        self.history and the recorder. read_values does this; pollers
+        that decode replies themselves (a PollScheduler) call it
+        directly."""
+        now = time.time()
+        self.derived.update(values, time.monotonic())
+        self.history.append_many(now, values)
+        if self.recorder:
+            self.recorder.record_values(now, values)
+
+    def read_battery_modules(self, current=None):
+        """Read the HV battery module voltages and feed self.battery.
+
+        current is the pack current (A, + discharging) from the same
+        sweep; without it the current is read here. Returns the voltages,
+        or None if the battery ECU did not send the frame.
+        """
+        mode, pid = MODULE_CMD[:2], MODULE_CMD[2:]
+        volts = decode_modules(self._parse(
+            self._send_to(self._header_for(mode, pid), MODULE_CMD, PID_TIMEOUT),
+            mode, pid))
+        if volts is None:
+            return None
+        if current is None:
+            current = DECODERS.decode("HV Battery Current", self.query("22", "F402"))
+        if current is not None:
+            self.battery.update(time.time(), volts, current)
+        return volts
+
+    #  Session recording 
+    def start_recording(self, path, compress=True):
+        """Log every exchange, decoded sweep and DTC read to path."""
+        self.stop_recording()
+        from session import SessionRecorder
+        self.recorder = SessionRecorder(
+            path, STANDARD_PIDS + PRIUS_PIDS, compress=compress,
+            meta={"vehicle": self.vehicle_id, "elm": self.elm_version,
+                  "demo": self.demo_mode, "protocol": self.protocol,
+                  "pin_headers": self.pin_headers, "header": self._header,
+                  # lets a replay answer the discovery run before it
+                  "discovery": [[cmd, reply.decode("latin-1")]
+                                for cmd, reply in self.discovery]})
+
+    def stop_recording(self):
+        if self.recorder:
+            rec, self.recorder = self.recorder, None
+            rec.close()
+
+    #  Capability discovery 
+    def discover_capabilities(self, pids, cache=None):
+        """Work out which of pids this vehicle answers.
+
+        Uses the Mode 01 supported-PID bitmaps and one probe per Toyota
+        Mode 21/22 PID, keyed by VIN in cache so later sessions skip the
+        probing. A car without a VIN is keyed by adapter and ECU address
+        (7E8 alone would be shared by most cars), or not cached at all
+        when the adapter is unnamed. Returns the supported {(mode, pid)}.
+        The exchanges are kept in self.discovery for session recordings.
+        """
+        self.supported  = None
+        self._probe_log = []
+        try:
+            vin = self.read_vin()
+            if vin:
+                self.vehicle_id = vin
+            elif self.adapter_id and self.ecu_address:
+                self.vehicle_id = f"{self.adapter_id}/{self.ecu_address}"
+            else:
+                self.vehicle_id, cache = self.ecu_address or "unknown", None
+            known = cache.get(self.vehicle_id) if cache else None
+            if known is None:
+                keys  = [(p[1], p[2]) for p in pids]
+                mode1 = self._supported_mode01()
+                known = set()
+                for mode, pid in keys:
+                    if mode == "01":
+                        if mode1 is None or pid.upper() in mode1:
+                            known.add((mode, pid))
+                    elif self.query(mode, pid, PROBE_TIMEOUT):
+                        known.add((mode, pid))
+                if cache:
+                    cache.put(self.vehicle_id, known, self.protocol)
+        finally:
+            self.discovery, self._probe_log = self._probe_log, None
+        self.supported = known
+        return known
+
+    def _supported_mode01(self):
+        """Walk the 0100/0120/0140... bitmaps; None if the car ignores them."""
+        supported, base = set(), 0
+        while base <= 0xC0:
+            d = self._parse(self._send_to(self._header_for("01", f"{base:02X}"),
+                                          f"01{base:02X}", PROBE_TIMEOUT),
+                            "01", f"{base:02X}")
+            if not d or len(d) < 6:
+                return supported if base else None
+            bits = (d[2] << 24) | (d[3] << 16) | (d[4] << 8) | d[5]
+            for i in range(32):
+                if bits & (1 << (31 - i)):
+                    supported.add(f"{base + i + 1:02X}")
+            if not bits & 1:
+                break
+            base += 0x20
+        return supported
+
+    def read_vin(self):
+        """VIN from Mode 09 PID 02, or "" if the car does not report it."""
+        d = self._parse(self._send_to(None, "0902", PROBE_TIMEOUT), "09", "02")
+        if not d or len(d) < 4:
+            return ""
+        vin = bytes(b for b in d[3:] if 0x20 < b < 0x7F).decode("ascii")
+        return vin if len(vin) == 17 else ""
+
+    def query_batch(self, requests):
+        """Query many (mode, pid) pairs, batching Mode 01 PIDs.
+
+        Returns {(mode, pid): byte list or None}. Each byte list has the
+        same shape as a single query() reply (mode byte, pid, data...).
+        """
+        results = {}
+        by_mode = {}
+        singles = []
+        for key in dict.fromkeys(requests):
+            mode, pid = key
+            if self.supported is not None and key not in self.supported:
+                results[key] = None
+            elif mode in self._batch_modes and pid.upper() in PID_LENGTHS:
+                by_mode.setdefault(mode, []).append(key)
+            else:
+                singles.append(key)
+        # Grouped by ECU so one ATSH serves a run of PIDs, the engine
+        # ECU last, next to the Mode 01 batches that follow
+        singles.sort(key=lambda k: self._header_for(*k) or "", reverse=True)
+        for key in singles:
+            results[key] = self.query(*key)
+        for mode, items in by_mode.items():
+            for i in range(0, len(items), MAX_BATCH_PIDS):
+                chunk = items[i:i + MAX_BATCH_PIDS]
+                if mode not in self._batch_modes:
+                    for key in chunk:
+                        results[key] = self.query(*key)
+                    continue
+                if len(chunk) == 1:
+                    results[chunk[0]] = self.query(*chunk[0])
+                    continue
+                timeout = CMD_TIMEOUT if self.supported is None else PID_TIMEOUT
+                data  = self._parse(self._send_to(
+                    self._header_for(*chunk[0]),
+                    mode + "".join(pid for _, pid in chunk), timeout), mode)
+                split = self._split_multi(data, mode)
+                if split and not split.keys() <= {k[1].upper() for k in chunk}:
+                    # A late reply to another request, not this batch
+                    for key in chunk:
+                        results[key] = None
+                    continue
+                if not split:
+                    # ECU rejected the batch — stop batching this mode
+                    self._batch_modes.discard(mode)
+                    for key in chunk:
+                        results[key] = self.query(*key)
+                    continue
+                for key in chunk:
+                    results[key] = split.get(key[1].upper())
+        return results
+
+    def _split_multi(self, data, mode):
+        """Split a multi-PID reply into {pid: [resp_mode, pid, data...]}."""
+        if not data or data[0] != int(mode, 16) + 0x40:
+            return {}
+        out, i = {}, 1
+        while i < len(data):
+            pid = f"{data[i]:02X}"
+            n   = PID_LENGTHS.get(pid)
+            if n is None or i + 1 + n > len(data):
+                break
+            out[pid] = [data[0], data[i]] + data[i + 1:i + 1 + n]
+            i += 1 + n
+        return out
+
+    def _parse(self, raw, mode=None, pid=""):
+        """Reply payload as a byte list, or None.
+
+        With mode given, only a positive response to that service counts
+        (negative 7F replies and other ECUs' chatter are skipped); with
+        pid as well, it must also echo that PID, so a late reply to an
+        earlier request is not taken for this one.
+        """
+        reply  = elmparse.parse(raw, self.can_bus)
+        expect = int(mode[:2], 16) + 0x40 if mode else None
+        echo   = bytes.fromhex(pid)
+        data   = reply.data(expect, echo)
+        if not data or len(data) < 2:
+            return None
+        ecu = reply.ecu(expect, echo)
+        if ecu:
+            self.ecu_address = ecu
+        return list(data)
+
+    def read_dtcs(self):
+        dtcs = self._parse_dtcs(self._send_to(None, "03", CMD_TIMEOUT, PRIO_DTC))
+        if self.recorder:
+            self.recorder.record_dtcs(time.time(), dtcs)
+        return dtcs
+
+    def clear_dtcs(self):
+        r = self._send_to(None, "04", CMD_TIMEOUT, PRIO_DTC).decode("ascii", "ignore")
+        return "44" in r.upper() or "OK" in r.upper()
+
+    def _parse_dtcs(self, raw):
+        return elmparse.decode_dtcs(elmparse.parse(raw, self.can_bus))
+
+    def send_custom(self, mode, pid, data=""):
+        return self._send_raw(mode + pid + data, CMD_TIMEOUT, PRIO_CONSOLE)
+
+    #  Demo mode 
+    def _demo_response(self, cmd):
+        """Answer cmd from the simulated car of the current demo profile."""
+        sim = self.simulator
+        if sim is None or sim.profile != self.demo_profile:
+            from simulator import PriusSimulator
+            sim = self.simulator = PriusSimulator(self.demo_profile, ready=True)
+        return sim.respond(cmd)
@@ -0,0 +1,108 @@
+"""
+ToyotaScan — PID decoder registry
+Each formula is a declarative (offset, width, signed, scale, bias)
+spec, compiled once into a small closure per PID.
+"""
+
+# formula: (offset, width, signed, scale, bias)
+# value = raw * scale + bias, raw read big-endian from the data bytes
+# that follow the reply header (mode byte + echoed PID bytes)
+FORMULAS = {
+    # SAE J1979 Mode 01
+    "rpm":       (0, 2, False, 0.25,       0),
+    "speed":     (0, 1, False, 1,          0),
+    "temp":      (0, 1, False, 1,        -40),
+    "pct":       (0, 1, False, 100 / 255,  0),
+    "fuel_trim": (0, 1, False, 100 / 128, -100),
+    "o2":        (0, 1, False, 0.005,      0),
+    "maf":       (0, 2, False, 0.01,       0),
+    "timing":    (0, 1, False, 0.5,      -64),
+    # Toyota Mode 21/22
+    "soc":       (0, 1, False, 0.5,        0),
+    "soh":       (0, 1, False, 0.5,        0),
+    "pack_v":    (0, 2, False, 0.1,        0),
+    "pack_a":    (0, 2, True,  0.1,        0),
+    "mg_speed":  (0, 2, True,  1,          0),
+    "torque":    (0, 2, True,  0.5,        0),
+    "inv_temp":  (0, 2, False, 0.1,      -40),
+    "dcdc":      (0, 2, False, 0.01,       0),
+    "vvt":       (0, 1, False, 0.5,      -64),
+    "fan":       (0, 1, False, 100,        0),
+}
+
+
+def header_len(pid):
+    """Reply bytes before the data: mode byte plus the echoed PID."""
+    return 1 + len(pid) // 2
+
+
+def compile_decoder(formula, header):
+    """Build fn(byte_list) -> float or None (short/missing frame)."""
+    offset, width, signed, scale, bias = FORMULAS[formula]
+    i    = header + offset
+    need = i + width
+    if width == 1:
+        def decode(d):
+            if d is None or len(d) < need:
+                return None
+            return d[i] * scale + bias
+    elif width == 2 and not signed:
+        def decode(d):
+            if d is None or len(d) < need:
+                return None
+            return ((d[i] << 8) | d[i + 1]) * scale + bias
+    elif width == 2:
+        def decode(d):
+            if d is None or len(d) < need:
+                return None
+            raw = (d[i] << 8) | d[i + 1]
+            if raw > 32767:
+                raw -= 65536
+            return raw * scale + bias
+    else:
+        def decode(d):
+            if d is None or len(d) < need:
+                return None
+            return int.from_bytes(bytes(d[i:need]), "big", signed=signed) * scale + bias
+    return decode
+
+
+class DecoderRegistry:
+    """Compiled decoders for a set of PID definitions.
+
+    pids are (name, mode, pid, unit, formula, min, max) tuples.
+    """
+
+    def __init__(self, pids):
+        self._by_name = {}
+        self._by_key  = {}
+        self._sweep   = []
+        for name, mode, pid, _unit, formula, *_ in pids:
+            fn = compile_decoder(formula, header_len(pid))
+            self._by_name[name]        = fn
+            self._by_key[(mode, pid)]  = fn
+            self._sweep.append((name, (mode, pid), fn))
+
+    def decode(self, name, data):
+        return self._by_name[name](data)
+
+    def decoder_for(self, mode, pid):
+        return self._by_key[(mode, pid)]
+
+    def decode_sweep(self, frames):
+        """{(mode, pid): byte list} -> {name: value} for every known PID
+        present in frames."""
+        get = frames.get
+        return {name: fn(get(key)) for name, key, fn in self._sweep
+                if key in frames}
+
+
+def encode_value(formula, value):
+    """Inverse of compile_decoder: the data bytes that decode to value,
+    clamped to what the field can hold (used by the simulator)."""
+    offset, width, signed, scale, bias = FORMULAS[formula]
+    bits = 8 * width
+    lo, hi = ((-(1 << bits - 1), (1 << bits - 1) - 1) if signed
+              else (0, (1 << bits) - 1))
+    raw = min(hi, max(lo, int(round((value - bias) / scale))))
+    return bytes(offset) + raw.to_bytes(width, "big", signed=signed)
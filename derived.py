@@ -0,0 +1,235 @@
+"""
+ToyotaScan — derived signals
+Values the Hybrid tab computes from decoded PIDs: HV and MG power,
+regen power and energy, fuel rate and economy, and the drive mode.
+Each is declared as (name, unit, inputs, fn, min, max) over PID names,
+like the PID tables. The dependency graph is ordered once. update() then
+recomputes only the signals whose inputs changed. It integrates
+energies between the timestamps the samples carry and checks every
+signal against its min/max in the same pass.
+"""
+
+import math
+import threading
+from collections import deque, namedtuple
+
+# fn for signals that integrate their single input over time:
+# value += input x seconds x scale (trapezoidal between updates)
+Integral = namedtuple("Integral", "scale")
+
+KW_PER_NM_RPM = 2 * math.pi / 60 / 1000
+STOICH        = 14.7            # air : petrol by mass
+PETROL_G_L    = 745.0
+MIN_ECON_KMH  = 5.0             # below this L/100km is meaningless
+WS_TO_WH      = 1000 / 3600     # kW x s -> Wh
+
+EV, HYBRID, REGEN, CHARGING = "EV", "HYBRID", "REGEN", "CHARGING"
+
+
+def _economy(lph, kmh):
+    return lph / kmh * 100 if kmh >= MIN_ECON_KMH else None
+
+
+def _drive_mode(rpm, hv_kw, regen_kw):
+    if regen_kw > 0.5:
+        return REGEN
+    if rpm < 300:
+        return EV
+    return CHARGING if hv_kw < -0.5 else HYBRID
+
+
+# (name, unit, inputs, fn, min, max) — fn(*inputs) is only called with
+# every input known; min/max are the gauge range and the alert limits
+# (None: no limit). HV power is + discharging, MG power + motoring.
+DERIVED = [
+    ("HV Power",     "kW",      ("HV Battery Voltage", "HV Battery Current"),
+     lambda v, a: v * a / 1000,                            -30,  30),
+    ("MG1 Power",    "kW",      ("MG1 Torque", "MG1 Speed"),
+     lambda nm, rpm: nm * rpm * KW_PER_NM_RPM,             -50,  50),
+    ("MG2 Power",    "kW",      ("MG2 Torque", "MG2 Speed"),
+     lambda nm, rpm: nm * rpm * KW_PER_NM_RPM,             -60,  60),
+    ("Regen Power",  "kW",      ("MG2 Power",),
+     lambda kw: -kw if kw < 0 else 0.0,                      0,  27),
+    ("Fuel Rate",    "L/h",     ("MAF Air Flow",),
+     lambda maf: maf / STOICH * 3600 / PETROL_G_L,           0,  30),
+    ("Fuel Economy", "L/100km", ("Fuel Rate", "Vehicle Speed"),
+     _economy,                                               0,  50),
+    ("Drive Mode",   "",        ("Engine RPM", "HV Power", "Regen Power"),
+     _drive_mode,                                         None, None),
+    ("HV Energy",    "Wh",      ("HV Power",),    Integral(WS_TO_WH),     None, None),
+    ("Regen Energy", "Wh",      ("Regen Power",), Integral(WS_TO_WH),     None, None),
+    ("Fuel Used",    "L",       ("Fuel Rate",),   Integral(1 / 3600),     None, None),
+]
+
+# Alert transitions
+HIGH, LOW, CLEAR = "high", "low", "clear"
+HYSTERESIS = 0.02               # of the min..max span, before an alert clears
+MAX_GAP    = 5.0                # s; longer gaps (link lost) are not integrated
+INF        = float("inf")
+
+
+class _Node:
+    __slots__ = ("name", "index", "bit", "inputs", "mask", "fn", "scale",
+                 "prev", "prev_t")
+
+    def __init__(self, name, index, inputs, mask, fn):
+        self.name   = name
+        self.index  = index
+        self.bit    = 1 << index
+        self.inputs = inputs            # indices into the value table
+        self.mask   = mask              # input bits
+        self.fn     = None if isinstance(fn, Integral) else fn
+        self.scale  = fn.scale if isinstance(fn, Integral) else None
+        self.prev   = None              # integrand at prev_t
+        self.prev_t = None
+
+
+class DerivedSignals:
+    """Derived values and limit alerts over a stream of PID samples.
+
+    pids are (name, mode, pid, unit, formula, min, max) tuples (their
+    min/max become alert limits); derived are DERIVED-style rows whose
+    inputs name PIDs or other derived rows, in any order but without
+    cycles. Feed it whole sweeps or single replies, each with the time
+    it was read; values holds the latest derived values.
+    """
+
+    def __init__(self, pids, derived=DERIVED, max_gap=MAX_GAP, keep_alerts=100):
+        names = [p[0] for p in pids] + [d[0] for d in derived]
+        if len(set(names)) != len(names):
+            raise ValueError("duplicate signal names")
+        self.units   = {p[0]: p[3] for p in pids}
+        self.units.update((d[0], d[1]) for d in derived)
+        self.max_gap = max_gap
+        self._index  = {n: i for i, n in enumerate(names)}
+        self._names  = names
+        self._nodes  = self._order(derived)
+        self._formulas  = [n for n in self._nodes if n.fn is not None]
+        self._integrals = [n for n in self._nodes if n.fn is None]
+        self._limits = [None] * len(names)
+        for name, *_, lo, hi in list(pids) + [(d[0], d[4], d[5]) for d in derived]:
+            if lo is not None or hi is not None:
+                span = (hi - lo) if lo is not None and hi is not None else 0
+                self._limits[self._index[name]] = (-INF if lo is None else lo,
+                                                   INF if hi is None else hi,
+                                                   span * HYSTERESIS)
+        self._lock   = threading.Lock()
+        self.alerts  = deque(maxlen=keep_alerts)   # (t, name, HIGH/LOW/CLEAR, value)
+        self.reset()
+
+    def _order(self, derived):
+        """Nodes in dependency order (Kahn's algorithm)."""
+        index, rows, deps = self._index, {}, {}
+        own = {d[0] for d in derived}
+        for name, _unit, inputs, fn, *_ in derived:
+            for i in inputs:
+                if i not in index:
+                    raise ValueError(f"{name}: unknown input {i!r}")
+            if isinstance(fn, Integral) and len(inputs) != 1:
+                raise ValueError(f"{name}: an integral takes one input")
+            rows[name] = (inputs, fn)
+            deps[name] = {i for i in inputs if i in own}
+        order = []
+        ready = [n for n in rows if not deps[n]]
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for other, d in deps.items():
+                if name in d:
+                    d.discard(name)
+                    if not d:
+                        ready.append(other)
+        if len(order) != len(rows):
+            raise ValueError("cycle among " + ", ".join(sorted(set(rows) - set(order))))
+        nodes = []
+        for name in order:
+            inputs, fn = rows[name]
+            idx = tuple(index[i] for i in inputs)
+            nodes.append(_Node(name, index[name], idx,
+                               sum(1 << i for i in idx), fn))
+        return nodes
+
+    def reset(self):
+        """Forget values, energies and active alerts (new trip)."""
+        with self._lock:
+            self._vals   = [None] * len(self._names)
+            self._active = {}                       # index -> HIGH / LOW
+            # Per signal, the range it can move in without an alert
+            # being raised or cleared: its limits, or the far side of
+            # the hysteresis margin while alerting
+            self._stay   = [l and l[:2] for l in self._limits]
+            self._t      = None
+            for node in self._integrals:
+                node.prev = node.prev_t = None
+                self._vals[node.index] = 0.0
+
+    def update(self, samples, t):
+        """Take {name: value} read at t (s, any monotonic clock) and
+        return {name: value} of the derived signals that changed."""
+        out = {}
+        with self._lock:
+            vals, stay, changed = self._vals, self._stay, 0
+            index = self._index
+            for name, v in samples.items():
+                i = index.get(name)
+                if i is not None and vals[i] != v:
+                    vals[i] = v
+                    changed |= 1 << i
+                    band = stay[i]
+                    if band is not None and v is not None and not band[0] <= v <= band[1]:
+                        self._check(i, v, t)
+            if changed:
+                for node in self._formulas:
+                    if not node.mask & changed:
+                        continue
+                    args = [vals[i] for i in node.inputs]
+                    v = None if None in args else node.fn(*args)
+                    j = node.index
+                    if v != vals[j]:
+                        vals[j] = out[node.name] = v
+                        changed |= node.bit
+                        band = stay[j]
+                        if band is not None and v is not None and not band[0] <= v <= band[1]:
+                            self._check(j, v, t)
+            if self._t is None or t > self._t:
+                # Trapezoid from each integrand at the last update to its
+                # value now (already recomputed above)
+                self._t = t
+                for node in self._integrals:
+                    x = vals[node.inputs[0]]
+                    if (node.prev is not None and x is not None
+                            and t - node.prev_t <= self.max_gap):
+                        area = (node.prev + x) * 0.5 * (t - node.prev_t) * node.scale
+                        if area:
+                            vals[node.index] += area
+                            out[node.name] = vals[node.index]
+                    node.prev, node.prev_t = x, t
+        return out
+
+    def _check(self, i, v, t):
+        """v left stay[i]: raise or clear the alert and move the band."""
+        lo, hi, margin = self._limits[i]
+        state = self._active.get(i)
+        if state is None:
+            state = HIGH if v > hi else LOW
+            self._active[i] = state
+            self._stay[i] = (hi - margin, INF) if state == HIGH else (-INF, lo + margin)
+        else:
+            del self._active[i]
+            self._stay[i] = (lo, hi)
+            self.alerts.append((t, self._names[i], CLEAR, v))
+            if not lo <= v <= hi:           # straight past the other limit
+                self._check(i, v, t)
+            return
+        self.alerts.append((t, self._names[i], state, v))
+
+    @property
+    def values(self):
+        """{name: latest value} of every derived signal."""
+        with self._lock:
+            return {n.name: self._vals[n.index] for n in self._nodes}
+
+    def active_alerts(self):
+        """{name: HIGH or LOW} for signals outside their limits now."""
+        with self._lock:
+            return {self._names[i]: s for i, s in self._active.items()}
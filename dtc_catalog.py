@@ -0,0 +1,525 @@
+"""
+ToyotaScan — DTC catalog source
+Source data for dtc.bin: SAE J2012 generic codes, generated from the
+standard's regular families, plus Toyota hybrid, brake and body codes.
+Not shipped in the APK; rebuild the database after editing:
+
+    python dtcdb.py build
+"""
+
+# Severity levels stored per code (index into dtcdb.SEVERITIES)
+INFO, LOW, MEDIUM, HIGH, CRITICAL = range(5)
+
+#  Regular generic families
+SENSOR5 = ("Circuit Malfunction", "Circuit Range/Performance Problem",
+           "Circuit Low Input", "Circuit High Input", "Circuit Intermittent")
+
+SENSORS = [
+    (0x0070, "Ambient Air Temperature Sensor"),
+    (0x0095, "Intake Air Temperature Sensor 2"),
+    (0x0100, "Mass or Volume Air Flow"),
+    (0x0105, "Manifold Absolute Pressure/Barometric Pressure"),
+    (0x0110, "Intake Air Temperature"),
+    (0x0115, "Engine Coolant Temperature"),
+    (0x0120, "Throttle/Pedal Position Sensor/Switch A"),
+    (0x0180, "Fuel Temperature Sensor A"),
+    (0x0185, "Fuel Temperature Sensor B"),
+    (0x0190, "Fuel Rail Pressure Sensor"),
+    (0x0195, "Engine Oil Temperature Sensor"),
+    (0x0220, "Throttle/Pedal Position Sensor/Switch B"),
+    (0x0225, "Throttle/Pedal Position Sensor/Switch C"),
+    (0x0325, "Knock Sensor 1 (Bank 1 or Single Sensor)"),
+    (0x0330, "Knock Sensor 2 (Bank 2)"),
+    (0x0335, "Crankshaft Position Sensor A"),
+    (0x0340, "Camshaft Position Sensor A (Bank 1 or Single Sensor)"),
+    (0x0345, "Camshaft Position Sensor A (Bank 2)"),
+    (0x0385, "Crankshaft Position Sensor B"),
+    (0x0450, "Evaporative Emission Control System Pressure Sensor"),
+    (0x0460, "Fuel Level Sensor"),
+    (0x0550, "Power Steering Pressure Sensor"),
+    (0x0705, "Transmission Range Sensor (PRNDL Input)"),
+    (0x0710, "Transmission Fluid Temperature Sensor"),
+    (0x0715, "Input/Turbine Speed Sensor"),
+    (0x0720, "Output Speed Sensor"),
+    (0x0725, "Engine Speed Input"),
+    (0x0365, "Camshaft Position Sensor B (Bank 1)"),
+    (0x0390, "Camshaft Position Sensor B (Bank 2)"),
+    (0x0465, "EVAP Purge Flow Sensor"),
+    (0x0470, "Exhaust Pressure Sensor"),
+    (0x0535, "A/C Evaporator Temperature Sensor"),
+    (0x0555, "Brake Booster Pressure Sensor"),
+    (0x0840, "Transmission Fluid Pressure Sensor/Switch A"),
+    (0x0845, "Transmission Fluid Pressure Sensor/Switch B"),
+    (0x2065, "Fuel Level Sensor B"),
+    (0x2120, "Throttle/Pedal Position Sensor/Switch D"),
+    (0x2125, "Throttle/Pedal Position Sensor/Switch E"),
+    (0x2130, "Throttle/Pedal Position Sensor/Switch F"),
+    (0x2226, "Barometric Pressure"),
+]
+
+O2_SENSORS = [(0x0130, "Bank 1 Sensor 1"), (0x0136, "Bank 1 Sensor 2"),
+              (0x0142, "Bank 1 Sensor 3"), (0x0150, "Bank 2 Sensor 1"),
+              (0x0156, "Bank 2 Sensor 2"), (0x0162, "Bank 2 Sensor 3")]
+O2_SUFFIX  = ("Circuit Malfunction", "Circuit Low Voltage", "Circuit High Voltage",
+              "Circuit Slow Response", "Circuit No Activity Detected",
+              "Heater Circuit Malfunction")
+O2_HEATERS = [(0x0030, "Bank 1 Sensor 1"), (0x0036, "Bank 1 Sensor 2"),
+              (0x0042, "Bank 1 Sensor 3"), (0x0050, "Bank 2 Sensor 1"),
+              (0x0056, "Bank 2 Sensor 2"), (0x0062, "Bank 2 Sensor 3")]
+O2_HEATER_RES = [(0x0053, "Bank 1 Sensor 1"), (0x0054, "Bank 1 Sensor 2"),
+                 (0x0055, "Bank 1 Sensor 3"), (0x0059, "Bank 2 Sensor 1"),
+                 (0x0060, "Bank 2 Sensor 2"), (0x0061, "Bank 2 Sensor 3")]
+
+CAM_ACTUATORS = [(0x0010, '"A"', "Bank 1"), (0x0013, '"B"', "Bank 1"),
+                 (0x0020, '"A"', "Bank 2"), (0x0023, '"B"', "Bank 2")]
+
+SOLENOID5 = ("Malfunction", "Performance or Stuck Off", "Stuck On",
+             "Electrical", "Intermittent")
+SOLENOIDS = [(0x0740, "Torque Converter Clutch Circuit"),
+             (0x0745, "Pressure Control Solenoid"),
+             (0x0750, "Shift Solenoid A"), (0x0755, "Shift Solenoid B"),
+             (0x0760, "Shift Solenoid C"), (0x0765, "Shift Solenoid D"),
+             (0x0770, "Shift Solenoid E")]
+
+
+#  Other regular families: (base, description with {} for the suffix,
+#  suffixes, severity); consecutive codes from base, one per suffix
+CIRCUIT3 = ("Circuit", "Circuit Low", "Circuit High")
+OPEN3    = ("Circuit/Open", "Circuit Low", "Circuit High")
+FAMILIES = [
+    (0x0016, "Crankshaft Position - Camshaft Position Correlation ({})",
+     ("Bank 1 Sensor A", "Bank 1 Sensor B", "Bank 2 Sensor A", "Bank 2 Sensor B"), MEDIUM),
+    (0x0026, "{} Valve Control Solenoid Circuit Range/Performance",
+     ("Intake (Bank 1)", "Exhaust (Bank 1)", "Intake (Bank 2)", "Exhaust (Bank 2)"), MEDIUM),
+    (0x0075, "Intake Valve Control Solenoid {} (Bank 1)", CIRCUIT3, MEDIUM),
+    (0x0078, "Exhaust Valve Control Solenoid {} (Bank 1)", CIRCUIT3, MEDIUM),
+    (0x0081, "Intake Valve Control Solenoid {} (Bank 2)", CIRCUIT3, MEDIUM),
+    (0x0084, "Exhaust Valve Control Solenoid {} (Bank 2)", CIRCUIT3, MEDIUM),
+    (0x0087, "Fuel Rail/System Pressure {}", ("Too Low", "Too High"), HIGH),
+    (0x0090, "Fuel Pressure Regulator 1 Control {}", CIRCUIT3, HIGH),
+    (0x0093, "Fuel System Leak Detected - {}", ("Large Leak", "Small Leak"), HIGH),
+    (0x0217, "{} Over Temperature Condition", ("Engine Coolant", "Transmission Fluid"),
+     CRITICAL),
+    (0x0231, "Fuel Pump Secondary Circuit {}", ("Low", "High", "Intermittent"), HIGH),
+    (0x0320, "Ignition/Distributor Engine Speed Input {}",
+     ("Circuit Malfunction", "Circuit Range/Performance", "Circuit No Signal",
+      "Circuit Intermittent"), HIGH),
+    (0x0407, "Exhaust Gas Recirculation Sensor B Circuit {}", ("Low", "High"), MEDIUM),
+    (0x0412, 'Secondary Air Injection System Switching Valve "A" {}',
+     ("Circuit", "Circuit Open", "Circuit Shorted"), LOW),
+    (0x0415, 'Secondary Air Injection System Switching Valve "B" {}',
+     ("Circuit", "Circuit Open", "Circuit Shorted"), LOW),
+    (0x0418, 'Secondary Air Injection System Relay "{}" Circuit', ("A", "B"), LOW),
+    (0x0444, "Evaporative Emission Control System Purge Control Valve Circuit {}",
+     ("Open", "Shorted"), LOW),
+    (0x0447, "Evaporative Emission Control System Vent Control Circuit {}",
+     ("Open", "Shorted"), LOW),
+    (0x0480, "Cooling Fan {} Control Circuit", ("1", "2", "3"), MEDIUM),
+    (0x0508, "Idle Air Control System Circuit {}", ("Low", "High"), LOW),
+    (0x0521, "Engine Oil Pressure Sensor/Switch {}",
+     ("Range/Performance", "Low Voltage", "High Voltage"), MEDIUM),
+    (0x0530, 'A/C Refrigerant Pressure Sensor "A" Circuit {}',
+     ("Malfunction", "Range/Performance", "Low Input", "High Input"), LOW),
+    (0x0571, 'Cruise Control/Brake Switch "A" {}', CIRCUIT3, LOW),
+    (0x0615, "Starter Relay {}", CIRCUIT3, MEDIUM),
+    (0x0620, "Generator {}",
+     ("Control Circuit", 'Lamp "L" Control Circuit', 'Field "F" Control Circuit'), MEDIUM),
+    (0x0627, 'Fuel Pump "A" Control {}', OPEN3, HIGH),
+    (0x0641, 'Sensor Reference Voltage "A" {}', OPEN3, HIGH),
+    (0x0651, 'Sensor Reference Voltage "B" {}', OPEN3, HIGH),
+    (0x0685, "ECM/PCM Power Relay Control {}", OPEN3, HIGH),
+    (0x0697, 'Sensor Reference Voltage "C" {}', OPEN3, HIGH),
+    (0x0701, "Transmission Control System {}", ("Range/Performance", "Electrical"), MEDIUM),
+    (0x0775, "Pressure Control Solenoid B {}", SOLENOID5, MEDIUM),
+    (0x0780, "{}", ("Shift Malfunction", "1-2 Shift Malfunction", "2-3 Shift Malfunction",
+                    "3-4 Shift Malfunction", "4-5 Shift Malfunction"), MEDIUM),
+    (0x0795, "Pressure Control Solenoid C {}", SOLENOID5, MEDIUM),
+    (0x2096, "Post Catalyst Fuel Trim System Too {}",
+     ("Lean (Bank 1)", "Rich (Bank 1)", "Lean (Bank 2)", "Rich (Bank 2)"), LOW),
+    (0x2187, "System Too {}",
+     ("Lean at Idle (Bank 1)", "Rich at Idle (Bank 1)", "Lean at Idle (Bank 2)",
+      "Rich at Idle (Bank 2)", "Lean at Higher Load (Bank 1)",
+      "Rich at Higher Load (Bank 1)", "Lean at Higher Load (Bank 2)",
+      "Rich at Higher Load (Bank 2)"), MEDIUM),
+    (0x2237, "O2 Sensor Positive Current Control {} (Bank 1 Sensor 1)", OPEN3, LOW),
+    (0x2240, "O2 Sensor Positive Current Control {} (Bank 2 Sensor 1)", OPEN3, LOW),
+    (0x2243, "O2 Sensor Reference Voltage {} (Bank 1 Sensor 1)",
+     ("Circuit/Open", "Performance", "Circuit Low", "Circuit High"), LOW),
+    (0x2247, "O2 Sensor Reference Voltage {} (Bank 2 Sensor 1)",
+     ("Circuit/Open", "Performance", "Circuit Low", "Circuit High"), LOW),
+    (0x2251, "O2 Sensor Negative Current Control {} (Bank 1 Sensor 1)", OPEN3, LOW),
+    (0x2254, "O2 Sensor Negative Current Control {} (Bank 2 Sensor 1)", OPEN3, LOW),
+    (0x2270, "O2 Sensor Signal Stuck {}",
+     ("Lean (Bank 1 Sensor 2)", "Rich (Bank 1 Sensor 2)", "Lean (Bank 2 Sensor 2)",
+      "Rich (Bank 2 Sensor 2)"), LOW),
+    (0x2400, "Evaporative Emission System Leak Detection Pump {}",
+     ("Control Circuit/Open", "Control Circuit Low", "Control Circuit High",
+      "Sense Circuit/Open", "Sense Circuit Range/Performance", "Sense Circuit Low",
+      "Sense Circuit High", "Sense Circuit Intermittent/Erratic"), LOW),
+    (0x2A00, "O2 Sensor Circuit Range/Performance ({})",
+     ("Bank 1 Sensor 1", "Bank 1 Sensor 2", "Bank 1 Sensor 3", "Bank 2 Sensor 1",
+      "Bank 2 Sensor 2", "Bank 2 Sensor 3"), LOW),
+    (0x0A3F, 'Drive Motor "A" Position Sensor {}', SENSOR5, HIGH),
+    (0x0A4B, "Generator Position Sensor {}", SENSOR5, HIGH),
+    (0x0A9B, 'Hybrid Battery Temperature Sensor "A" {}', SENSOR5, MEDIUM),
+    (0x0AC0, 'Hybrid Battery Pack Current Sensor "A" {}', SENSOR5, HIGH),
+]
+
+#  CAN bus wiring: U0001 high speed, U0010 medium speed, U0019 low speed
+CAN_BUS_SUFFIX = ("", " Performance", " (+) Open", " (+) Low", " (+) High",
+                  " (-) Open", " (-) Low", " (-) High", " (-) Shorted to Bus (+)")
+CAN_BUSES = [(0x0001, "High Speed"), (0x0010, "Medium Speed"), (0x0019, "Low Speed")]
+
+
+def _dec(base, i):
+    """base + i counting in decimal digits, as SAE numbers these runs
+    (P0269 is followed by P0270)."""
+    return int(str(int(f"{base:04X}") + i), 16)
+
+
+def _step(base, i):
+    """base + i: in decimal digits for numeric codes, in hex once the
+    code has letters (P0A9B is followed by P0A9C)."""
+    return _dec(base, i) if f"{base:04X}".isdigit() else base + i
+
+
+def generic():
+    """(code, description, ecu, severity, hint) for generic codes."""
+    for base, name in SENSORS:
+        for i, suffix in enumerate(SENSOR5):
+            yield f"P{_step(base, i):04X}", f"{name} {suffix}", "", MEDIUM, ""
+    for base, text, suffixes, severity in FAMILIES:
+        for i, suffix in enumerate(suffixes):
+            yield f"P{_step(base, i):04X}", text.format(suffix), "", severity, ""
+    for base, where in O2_SENSORS:
+        for i, suffix in enumerate(O2_SUFFIX):
+            yield f"P{base + i:04X}", f"O2 Sensor {suffix} ({where})", "", LOW, ""
+    for base, where in O2_HEATERS:
+        for i, suffix in enumerate(("", " Low", " High")):
+            yield (f"P{base + i:04X}", f"HO2S Heater Control Circuit{suffix} ({where})",
+                   "", LOW, "")
+    for code, where in O2_HEATER_RES:
+        yield f"P{code:04X}", f"HO2S Heater Resistance ({where})", "", LOW, ""
+    for base, cam, bank in CAM_ACTUATORS:
+        yield f"P{base:04X}", f"{cam} Camshaft Position Actuator Circuit ({bank})", "", MEDIUM, ""
+        yield (f"P{base + 1:04X}", f"{cam} Camshaft Position - Timing Over-Advanced "
+               f"or System Performance ({bank})", "", MEDIUM,
+               "Check oil level and condition first.")
+        yield f"P{base + 2:04X}", f"{cam} Camshaft Position - Timing Over-Retarded ({bank})", "", MEDIUM, ""
+    for bank, base in ((1, 0x0170), (2, 0x0173)):
+        yield f"P{base:04X}", f"Fuel Trim Malfunction (Bank {bank})", "", MEDIUM, ""
+        yield (f"P{base + 1:04X}", f"System Too Lean (Bank {bank})", "", MEDIUM,
+               "Look for intake leaks, a dirty MAF sensor or low fuel pressure.")
+        yield (f"P{base + 2:04X}", f"System Too Rich (Bank {bank})", "", MEDIUM,
+               "Look for leaking injectors, high fuel pressure or a faulty O2 sensor.")
+    for n in range(1, 13):
+        yield f"P{_dec(0x0200, n):04X}", f"Injector Circuit Malfunction - Cylinder {n}", "", HIGH, ""
+        base = 3 * (n - 1)
+        yield f"P{_dec(0x0261, base):04X}", f"Cylinder {n} Injector Circuit Low", "", HIGH, ""
+        yield f"P{_dec(0x0261, base + 1):04X}", f"Cylinder {n} Injector Circuit High", "", HIGH, ""
+        yield (f"P{_dec(0x0261, base + 2):04X}", f"Cylinder {n} Contribution/Balance Fault",
+               "", MEDIUM, "")
+        yield (f"P{_dec(0x0300, n):04X}", f"Cylinder {n} Misfire Detected", "", HIGH,
+               "Swap the coil and plug with another cylinder to see if the misfire follows.")
+        coil = 'ABCDEFGHIJKL'[n - 1]
+        yield (f"P{_dec(0x0350, n):04X}",
+               f"Ignition Coil {coil} Primary/Secondary Circuit Malfunction", "", HIGH, "")
+        for i, what in enumerate(("Primary Control Circuit Low",
+                                  "Primary Control Circuit High", "Secondary Circuit")):
+            yield (f"P{_dec(0x2300, 3 * (n - 1) + i):04X}",
+                   f'Ignition Coil "{coil}" {what}', "", HIGH, "")
+        # Cylinder deactivation: P3400 bank 1, 8 codes per cylinder, P3497 bank 2
+        for i, (valve, what) in enumerate(
+                (v, w) for v in ("Deactivation/Intake", "Exhaust")
+                for w in ("Circuit/Open", "Performance", "Circuit Low", "Circuit High")):
+            yield (f"P{_dec(0x3401, 8 * (n - 1) + i):04X}",
+                   f"Cylinder {n} {valve} Valve Control {what}", "", MEDIUM, "")
+    yield "P3400", "Cylinder Deactivation System (Bank 1)", "", MEDIUM, ""
+    yield "P3497", "Cylinder Deactivation System (Bank 2)", "", MEDIUM, ""
+    for base, name in SOLENOIDS:
+        for i, suffix in enumerate(SOLENOID5):
+            yield f"P{base + i:04X}", f"{name} {suffix}", "", MEDIUM, ""
+    yield "P0730", "Incorrect Gear Ratio", "", MEDIUM, ""
+    for n, gear in enumerate(("1", "2", "3", "4", "5"), start=1):
+        yield f"P{0x0730 + n:04X}", f"Gear {gear} Incorrect Ratio", "", MEDIUM, ""
+    yield "P0736", "Reverse Incorrect Ratio", "", MEDIUM, ""
+    for bank, base in ((1, 0x0420), (2, 0x0430)):
+        for i, what in enumerate(("Catalyst System Efficiency Below Threshold",
+                                  "Warm Up Catalyst Efficiency Below Threshold",
+                                  "Main Catalyst Efficiency Below Threshold",
+                                  "Heated Catalyst Efficiency Below Threshold",
+                                  "Heated Catalyst Temperature Below Threshold")):
+            yield (f"P{base + i:04X}", f"{what} (Bank {bank})", "", LOW,
+                   "Rule out misfires and exhaust leaks before replacing the catalyst.")
+    for base, speed in CAN_BUSES:
+        for i, suffix in enumerate(CAN_BUS_SUFFIX):
+            yield (f"U{_dec(base, i):04X}", f"{speed} CAN Communication Bus{suffix}",
+                   "", HIGH, "")
+    yield from ((c, d, "", s, h) for c, d, s, h in GENERIC)
+    yield from ((c, d, "", s, "") for c, d, s in NETWORK)
+
+
+#  Irregular generic codes: (code, description, severity, hint)
+GENERIC = [
+    ("P0125", "Insufficient Coolant Temperature for Closed Loop Fuel Control", LOW, ""),
+    ("P0128", "Coolant Thermostat (Coolant Temperature Below Thermostat Regulating Temperature)",
+     LOW, "Usually a thermostat stuck open."),
+    ("P0148", "Fuel Delivery Error", HIGH, ""),
+    ("P0230", "Fuel Pump Primary Circuit Malfunction", HIGH, ""),
+    ("P0300", "Random/Multiple Cylinder Misfire Detected", HIGH,
+     "Severe misfires can overheat the catalyst; avoid hard driving."),
+    ("P0400", "Exhaust Gas Recirculation Flow Malfunction", MEDIUM, ""),
+    ("P0401", "Exhaust Gas Recirculation Flow Insufficient Detected", MEDIUM,
+     "Toyota hybrids commonly clog the EGR cooler and intake manifold."),
+    ("P0402", "Exhaust Gas Recirculation Flow Excessive Detected", MEDIUM, ""),
+    ("P0403", "Exhaust Gas Recirculation Circuit Malfunction", MEDIUM, ""),
+    ("P0404", "Exhaust Gas Recirculation Circuit Range/Performance", MEDIUM, ""),
+    ("P0405", "Exhaust Gas Recirculation Sensor A Circuit Low", MEDIUM, ""),
+    ("P0406", "Exhaust Gas Recirculation Sensor A Circuit High", MEDIUM, ""),
+    ("P0410", "Secondary Air Injection System Malfunction", LOW, ""),
+    ("P0411", "Secondary Air Injection System Incorrect Flow Detected", LOW, ""),
+    ("P0440", "Evaporative Emission Control System Malfunction", LOW, ""),
+    ("P0441", "Evaporative Emission Control System Incorrect Purge Flow", LOW, ""),
+    ("P0442", "Evaporative Emission Control System Leak Detected (Small Leak)", LOW,
+     "Check the fuel cap seal first."),
+    ("P0443", "Evaporative Emission Control System Purge Control Valve Circuit Malfunction",
+     LOW, ""),
+    ("P0446", "Evaporative Emission Control System Vent Control Circuit Malfunction", LOW, ""),
+    ("P0455", "Evaporative Emission Control System Leak Detected (Gross Leak)", LOW,
+     "Check the fuel cap is fitted and tightened."),
+    ("P0456", "Evaporative Emission Control System Leak Detected (Very Small Leak)", LOW, ""),
+    ("P0500", "Vehicle Speed Sensor Malfunction", MEDIUM, ""),
+    ("P0501", "Vehicle Speed Sensor Range/Performance", MEDIUM, ""),
+    ("P0502", "Vehicle Speed Sensor Circuit Low Input", MEDIUM, ""),
+    ("P0503", "Vehicle Speed Sensor Intermittent/Erratic/High", MEDIUM, ""),
+    ("P0505", "Idle Control System Malfunction", LOW, ""),
+    ("P0506", "Idle Control System RPM Lower Than Expected", LOW, ""),
+    ("P0507", "Idle Control System RPM Higher Than Expected", LOW, ""),
+    ("P0520", "Engine Oil Pressure Sensor/Switch Circuit Malfunction", MEDIUM, ""),
+    ("P0524", "Engine Oil Pressure Too Low", CRITICAL, "Stop the engine and check the oil level."),
+    ("P0560", "System Voltage Malfunction", MEDIUM, ""),
+    ("P0562", "System Voltage Low", MEDIUM, "Test the 12 V auxiliary battery."),
+    ("P0563", "System Voltage High", MEDIUM, ""),
+    ("P0600", "Serial Communication Link Malfunction", HIGH, ""),
+    ("P0601", "Internal Control Module Memory Check Sum Error", HIGH, ""),
+    ("P0602", "Control Module Programming Error", HIGH, ""),
+    ("P0603", "Internal Control Module Keep Alive Memory (KAM) Error", MEDIUM, ""),
+    ("P0604", "Internal Control Module Random Access Memory (RAM) Error", HIGH, ""),
+    ("P0605", "Internal Control Module Read Only Memory (ROM) Error", HIGH, ""),
+    ("P0606", "Control Module Processor Fault", HIGH, ""),
+    ("P0700", "Transmission Control System Malfunction", MEDIUM, ""),
+    ("P2100", "Throttle Actuator Control Motor Circuit/Open", HIGH, ""),
+    ("P2101", "Throttle Actuator Control Motor Circuit Range/Performance", HIGH, ""),
+    ("P2102", "Throttle Actuator Control Motor Circuit Low", HIGH, ""),
+    ("P2103", "Throttle Actuator Control Motor Circuit High", HIGH, ""),
+    ("P2111", "Throttle Actuator Control System - Stuck Open", HIGH, ""),
+    ("P2112", "Throttle Actuator Control System - Stuck Closed", HIGH, ""),
+    ("P2118", "Throttle Actuator Control Motor Current Range/Performance", HIGH, ""),
+    ("P2119", "Throttle Actuator Control Throttle Body Range/Performance", HIGH, ""),
+    ("P2135", "Throttle/Pedal Position Sensor/Switch A/B Voltage Correlation", HIGH, ""),
+    ("P2138", "Throttle/Pedal Position Sensor/Switch D/E Voltage Correlation", HIGH, ""),
+    ("P2195", "O2 Sensor Signal Stuck Lean (Bank 1 Sensor 1)", LOW, ""),
+    ("P2196", "O2 Sensor Signal Stuck Rich (Bank 1 Sensor 1)", LOW, ""),
+    ("P2197", "O2 Sensor Signal Stuck Lean (Bank 2 Sensor 1)", LOW, ""),
+    ("P2198", "O2 Sensor Signal Stuck Rich (Bank 2 Sensor 1)", LOW, ""),
+    ("P2440", "Secondary Air Injection System Switching Valve Stuck Open (Bank 1)", LOW, ""),
+    ("P2441", "Secondary Air Injection System Switching Valve Stuck Closed (Bank 1)", LOW, ""),
+    ("P2610", "ECM/PCM Internal Engine Off Timer Performance", LOW, ""),
+    ("P0068", "MAP/MAF - Throttle Position Correlation", MEDIUM, ""),
+    ("P0089", "Fuel Pressure Regulator 1 Performance", HIGH, ""),
+    ("P0219", "Engine Overspeed Condition", HIGH, ""),
+    ("P0234", "Turbocharger/Supercharger Overboost Condition", HIGH, ""),
+    ("P0299", "Turbocharger/Supercharger Underboost", MEDIUM, ""),
+    ("P0313", "Misfire Detected with Low Fuel", MEDIUM, "Refuel and clear the code."),
+    ("P0314", "Single Cylinder Misfire (Cylinder not Specified)", HIGH, ""),
+    ("P0315", "Crankshaft Position System Variation Not Learned", LOW, ""),
+    ("P0316", "Engine Misfire Detected on Startup (First 1000 Revolutions)", HIGH, ""),
+    ("P0324", "Knock Control System Error", MEDIUM, ""),
+    ("P0409", "Exhaust Gas Recirculation Sensor A Circuit", MEDIUM, ""),
+    ("P0449", "Evaporative Emission Control System Vent Valve/Solenoid Circuit Malfunction",
+     LOW, ""),
+    ("P0457", "Evaporative Emission Control System Leak Detected (Fuel Cap Loose/Off)", LOW,
+     "Refit the fuel cap until it clicks."),
+    ("P0504", "Brake Switch A/B Correlation", MEDIUM, ""),
+    ("P0510", "Closed Throttle Position Switch Malfunction", LOW, ""),
+    ("P0534", "Air Conditioner Refrigerant Charge Loss", LOW, ""),
+    ("P0607", "Control Module Performance", HIGH, ""),
+    ("P0630", "VIN Not Programmed or Incompatible - ECM/PCM", MEDIUM, ""),
+    ("P0703", "Brake Switch B Circuit Malfunction", MEDIUM, ""),
+]
+
+#  Network codes: (code, description, severity)
+_LOST         = "Lost Communication With "
+_INCOMPATIBLE = "Software Incompatibility With "
+_INVALID      = "Invalid Data Received From "
+NETWORK = [
+    ("U0073", "Control Module Communication Bus Off", HIGH),
+    ("U0100", _LOST + 'ECM/PCM "A"', HIGH),
+    ("U0101", _LOST + "TCM", HIGH),
+    ("U0102", _LOST + "Transfer Case Control Module", MEDIUM),
+    ("U0103", _LOST + "Gear Shift Module", MEDIUM),
+    ("U0104", _LOST + "Cruise Control Module", LOW),
+    ("U0107", _LOST + "Throttle Actuator Control Module", HIGH),
+    ("U0109", _LOST + "Fuel Pump Control Module", HIGH),
+    ("U0110", _LOST + 'Drive Motor Control Module "A"', HIGH),
+    ("U0111", _LOST + 'Battery Energy Control Module "A"', HIGH),
+    ("U0112", _LOST + 'Battery Energy Control Module "B"', HIGH),
+    ("U0115", _LOST + 'ECM/PCM "B"', HIGH),
+    ("U0121", _LOST + "Anti-Lock Brake System (ABS) Control Module", HIGH),
+    ("U0122", _LOST + "Vehicle Dynamics Control Module", MEDIUM),
+    ("U0123", _LOST + "Yaw Rate Sensor Module", MEDIUM),
+    ("U0124", _LOST + "Lateral Acceleration Sensor Module", MEDIUM),
+    ("U0126", _LOST + "Steering Angle Sensor Module", MEDIUM),
+    ("U0128", _LOST + "Park Brake Control Module", MEDIUM),
+    ("U0129", _LOST + "Brake System Control Module", HIGH),
+    ("U0131", _LOST + "Power Steering Control Module", HIGH),
+    ("U0140", _LOST + "Body Control Module", MEDIUM),
+    ("U0151", _LOST + "Restraints Control Module", HIGH),
+    ("U0155", _LOST + "Instrument Panel Cluster (IPC) Control Module", MEDIUM),
+    ("U0164", _LOST + "HVAC Control Module", LOW),
+    ("U0293", _LOST + "Hybrid Powertrain Control Module", CRITICAL),
+    ("U0105", _LOST + "Fuel Injector Control Module", HIGH),
+    ("U0106", _LOST + "Glow Plug Control Module", MEDIUM),
+    ("U0108", _LOST + "Alternative Fuel Control Module", MEDIUM),
+    ("U0113", _LOST + "Emissions Critical Control Information", HIGH),
+    ("U0114", _LOST + "Four-Wheel Drive Clutch Control Module", MEDIUM),
+    ("U0125", _LOST + "Multi-axis Acceleration Sensor Module", MEDIUM),
+    ("U0127", _LOST + "Tire Pressure Monitor Module", LOW),
+    ("U0130", _LOST + "Steering Effort Control Module", MEDIUM),
+    ("U0132", _LOST + "Ride Level Control Module", LOW),
+    ("U0141", _LOST + 'Body Control Module "A"', MEDIUM),
+    ("U0142", _LOST + 'Body Control Module "B"', MEDIUM),
+    ("U0143", _LOST + 'Body Control Module "C"', MEDIUM),
+    ("U0144", _LOST + 'Body Control Module "D"', MEDIUM),
+    ("U0145", _LOST + 'Body Control Module "E"', MEDIUM),
+    ("U0146", _LOST + 'Serial Data Gateway Module "A"', HIGH),
+    ("U0156", _LOST + 'Information Center "A"', LOW),
+    ("U0159", _LOST + "Parking Assist Control Module", LOW),
+    ("U0167", _LOST + "Vehicle Immobilizer Control Module", MEDIUM),
+    ("U0168", _LOST + "Vehicle Security Control Module", MEDIUM),
+    ("U0184", _LOST + "Radio", INFO),
+    ("U0198", _LOST + "Telematic Control Module", INFO),
+    ("U0300", "Internal Control Module Software Incompatibility", HIGH),
+    ("U0301", _INCOMPATIBLE + "ECM/PCM", HIGH),
+    ("U0302", _INCOMPATIBLE + "Transmission Control Module", HIGH),
+    ("U0315", _INCOMPATIBLE + "Anti-Lock Brake System Control Module", HIGH),
+    ("U0401", _INVALID + 'ECM/PCM "A"', HIGH),
+    ("U0402", _INVALID + "Transmission Control Module", HIGH),
+    ("U0415", _INVALID + "Anti-Lock Brake System Control Module", HIGH),
+    ("U0416", _INVALID + "Vehicle Dynamics Control Module", MEDIUM),
+    ("U0418", _INVALID + "Brake System Control Module", HIGH),
+    ("U0420", _INVALID + "Power Steering Control Module", HIGH),
+    ("U0422", _INVALID + "Body Control Module", MEDIUM),
+    ("U0423", _INVALID + "Instrument Panel Cluster Control Module", MEDIUM),
+    ("U0424", _INVALID + "HVAC Control Module", LOW),
+    ("U0428", _INVALID + "Steering Angle Sensor Module", MEDIUM),
+]
+
+
+#  Toyota hybrid, brake and body codes
+HV, BATTERY, INVERTER, BRAKE, AIRBAG = ("HV ECU", "Battery ECU", "Inverter ECU",
+                                        "Brake ECU", "Airbag ECU")
+
+TOYOTA = [
+    ("P0A08", "DC/DC Converter Status Circuit", HV, HIGH,
+     "12 V system is not being charged; check the DC/DC converter output."),
+    ("P0A09", "DC/DC Converter Status Circuit Low Input", HV, HIGH, ""),
+    ("P0A0D", "High Voltage System Interlock Circuit High", HV, CRITICAL,
+     "Service plug or inverter cover interlock open."),
+    ("P0A0F", "Engine Failed to Start", HV, HIGH, ""),
+    ("P0A1A", "Generator Control Module", INVERTER, HIGH, ""),
+    ("P0A1B", 'Drive Motor "A" Control Module', INVERTER, HIGH, ""),
+    ("P0A1D", "Hybrid Powertrain Control Module", HV, CRITICAL, ""),
+    ("P0A2B", 'Drive Motor "A" Temperature Sensor Circuit Range/Performance', HV, MEDIUM, ""),
+    ("P0A37", "Generator Temperature Sensor Circuit Range/Performance", HV, MEDIUM, ""),
+    ("P0A3F", 'Drive Motor "A" Position Sensor Circuit', HV, HIGH, ""),
+    ("P0A4B", "Generator Position Sensor Circuit", HV, HIGH, ""),
+    ("P0A51", 'Drive Motor "A" Current Sensor Circuit', INVERTER, HIGH, ""),
+    ("P0A60", 'Drive Motor "A" Phase V Current', INVERTER, HIGH, ""),
+    ("P0A63", 'Drive Motor "A" Phase W Current', INVERTER, HIGH, ""),
+    ("P0A72", "Generator Phase V Current", INVERTER, HIGH, ""),
+    ("P0A75", "Generator Phase W Current", INVERTER, HIGH, ""),
+    ("P0A78", 'Drive Motor "A" Inverter Performance', INVERTER, CRITICAL,
+     "MG2 inverter output abnormal; check inverter coolant pump and level."),
+    ("P0A7A", "Generator Inverter Performance", INVERTER, CRITICAL,
+     "MG1 inverter output abnormal; check inverter coolant pump and level."),
+    ("P0A7F", "Hybrid Battery Pack Deterioration", BATTERY, HIGH,
+     "Capacity degraded. Compare module voltages under load to find weak blocks."),
+    ("P0A80", "Replace Hybrid Battery Pack", BATTERY, CRITICAL,
+     "State of health below serviceable threshold. Check the module voltage spread."),
+    ("P0A81", "Hybrid Battery Pack Cooling Fan 1 Control Circuit", BATTERY, MEDIUM, ""),
+    ("P0A82", "Hybrid Battery Pack Cooling Fan 1 Performance/Stuck Off", BATTERY, MEDIUM,
+     "Clean the battery intake filter and fan."),
+    ("P0A84", "Hybrid Battery Pack Cooling Fan 1 Control Circuit Low", BATTERY, MEDIUM, ""),
+    ("P0A85", "Hybrid Battery Pack Cooling Fan 1 Control Circuit High", BATTERY, MEDIUM, ""),
+    ("P0A90", 'Drive Motor "A" Performance', HV, HIGH, ""),
+    ("P0A92", "Hybrid Generator Performance", HV, HIGH, ""),
+    ("P0A93", "Inverter Cooling System Performance", HV, HIGH,
+     "Check the inverter coolant level and the electric water pump."),
+    ("P0A94", "DC/DC Converter Performance", HV, HIGH,
+     "Boost converter not meeting output; often paired with inverter codes."),
+    ("P0A95", "High Voltage Fuse", HV, CRITICAL, ""),
+    ("P0A9B", 'Hybrid Battery Temperature Sensor "A" Circuit', BATTERY, MEDIUM, ""),
+    ("P0AA1", "Hybrid Battery Positive Contactor Circuit Stuck Closed", BATTERY, CRITICAL, ""),
+    ("P0AA4", "Hybrid Battery Negative Contactor Circuit Stuck Closed", BATTERY, CRITICAL, ""),
+    ("P0AA6", "Hybrid Battery Voltage System Isolation Fault", BATTERY, CRITICAL,
+     "High voltage leak to chassis. Do not touch HV components; isolate and test insulation."),
+    ("P0AC0", 'Hybrid Battery Pack Current Sensor "A" Circuit', BATTERY, HIGH, ""),
+    ("P0ADB", "Hybrid Battery Positive Contactor Control Circuit Low", BATTERY, HIGH, ""),
+    ("P0ADC", "Hybrid Battery Positive Contactor Control Circuit High", BATTERY, HIGH, ""),
+    ("P0ADF", "Hybrid Battery Negative Contactor Control Circuit Low", BATTERY, HIGH, ""),
+    ("P0AE0", "Hybrid Battery Negative Contactor Control Circuit High", BATTERY, HIGH, ""),
+    ("P0AE6", "Hybrid Battery Precharge Contactor Control Circuit Low", BATTERY, HIGH, ""),
+    ("P0AE7", "Hybrid Battery Precharge Contactor Control Circuit High", BATTERY, HIGH, ""),
+    ("P0B40", "Generator Inverter Performance", INVERTER, CRITICAL,
+     "MG1 inverter output abnormal; check inverter coolant pump and level."),
+    ("P0B41", "Drive Motor Inverter Performance", INVERTER, CRITICAL,
+     "MG2 inverter output abnormal; check inverter coolant pump and level."),
+    ("P3000", "HV Battery Malfunction", HV, CRITICAL,
+     "General HV battery fault; read the INF code and check module voltages and cooling."),
+    ("P3004", "Power Cable Malfunction", HV, CRITICAL, "Inspect the HV cables and connectors."),
+    ("P3006", "Battery SOC Uneven", BATTERY, HIGH, "Modules out of balance; check the voltage spread."),
+    ("P3009", "High Voltage Leak Detected", HV, CRITICAL,
+     "Insulation resistance too low. Inspect all HV wiring, the A/C compressor and the inverter."),
+    ("P3030", "Battery Voltage Sensor Disconnection", BATTERY, HIGH, ""),
+    ("P3056", "Battery Current Sensor Malfunction", BATTERY, HIGH, ""),
+    ("P3100", "HV Control ECU Malfunction", HV, CRITICAL, ""),
+    ("P3101", "Engine Control System Malfunction", HV, HIGH, ""),
+    ("P3102", "Transmission Control ECU Malfunction", HV, HIGH, ""),
+    ("P3115", "System Main Relay Malfunction", HV, CRITICAL, ""),
+    ("P3120", "HV Transaxle Malfunction", HV, CRITICAL, ""),
+    ("P3125", "Converter & Inverter Malfunction", INVERTER, CRITICAL, ""),
+    ("P3130", "Inverter Cooling System Malfunction", INVERTER, HIGH, ""),
+    ("P3190", "Poor Engine Power", HV, MEDIUM, "Low fuel, clogged air filter or misfire."),
+    ("P3191", "Engine Does Not Start", HV, HIGH, ""),
+    ("P3193", "Fuel Run Out", HV, MEDIUM, "Refuel, then clear the code."),
+    ("C1201", "Engine Control System Malfunction", BRAKE, MEDIUM,
+     "Set by the brake ECU when the powertrain has a fault; fix the P code first."),
+    ("C1203", "ECM Communication Circuit Malfunction", BRAKE, MEDIUM, ""),
+    ("C1210", "Zero Point Calibration of Yaw Rate Sensor Undone", BRAKE, LOW, ""),
+    ("C1241", "Low Battery Positive Voltage", BRAKE, MEDIUM, "Test the 12 V auxiliary battery."),
+    ("C1252", "Brake Booster Pump Motor On Time Abnormally Long", BRAKE, HIGH, ""),
+    ("C1253", "Pump Motor Relay Malfunction", BRAKE, HIGH, ""),
+    ("C1256", "Accumulator Low Pressure", BRAKE, HIGH, ""),
+    ("C1259", "HV System Regenerative Malfunction", BRAKE, MEDIUM, ""),
+    ("C1310", "Malfunction in HV System", BRAKE, MEDIUM, ""),
+    ("C1336", "Zero Point Calibration of Deceleration Sensor Undone", BRAKE, LOW, ""),
+    ("B0100", "Short in Driver Side Squib Circuit", AIRBAG, CRITICAL, ""),
+    ("B0101", "Open in Driver Side Squib Circuit", AIRBAG, CRITICAL, ""),
+    ("B0105", "Short in Front Passenger Side Squib Circuit", AIRBAG, CRITICAL, ""),
+    ("B0106", "Open in Front Passenger Side Squib Circuit", AIRBAG, CRITICAL, ""),
+]
+
+# Gen 2 Prius: weak battery blocks 1-14
+TOYOTA += [(f"P{_dec(0x3011, b - 1):04X}", f"Battery Block {b} Becomes Weak", BATTERY, HIGH,
+            "Replace or recondition the modules of this block; check the neighbours too.")
+           for b in range(1, 15)]
+
+
+def entries():
+    """Every catalog entry; Toyota entries override generic ones."""
+    out = {code: (code, desc, ecu, sev, hint)
+           for code, desc, ecu, sev, hint in generic()}
+    for code, desc, ecu, sev, hint in TOYOTA:
+        out[code] = (code, desc, ecu, sev, hint)
+    return [out[c] for c in sorted(out)]
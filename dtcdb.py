@@ -0,0 +1,227 @@
+"""
+ToyotaScan — on-device DTC database
+Read-only, memory-mapped catalog of trouble code descriptions built from
+dtc_catalog.py. Nothing is read until the first lookup, and then only
+the pages a lookup touches are faulted in.
+
+File layout (little-endian):
+    header   "DTC1" u16 version, u16 ecu table length, u32 n
+    ecus     ECU names, UTF-8, newline separated, padded to 4 bytes
+    keys     n x u32, sorted: category << 16 | the four hex digits
+    records  n x (u32 text offset, u16 text length, u8 severity, u8 ecu)
+    text     "description\\x1fhint" per code, UTF-8
+P0A80 is (0 << 16) | 0x0A80, U0100 is (3 << 16) | 0x0100, so codes sort
+P, C, B, U and a code prefix maps to one contiguous key range.
+
+    python dtcdb.py build [-o dtc.bin]
+    python dtcdb.py search P0A8
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+VERSION    = 1
+CATEGORIES = "PCBU"
+SEVERITIES = ("info", "low", "medium", "high", "critical")
+
+_HEADER = struct.Struct("<4sHHI")
+_RECORD = struct.Struct("<IHBB")
+_SEP    = "\x1f"
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dtc.bin")
+
+DtcInfo = namedtuple("DtcInfo", "code description ecu severity hint")
+
+# Descriptions for codes missing from the catalog, by SAE J2012 structure
+SYSTEMS = {"P": "Powertrain", "C": "Chassis", "B": "Body", "U": "Network"}
+P_GROUPS = {"0": "Fuel and Air Metering / Emission Controls",
+            "1": "Fuel and Air Metering", "2": "Fuel and Air Metering (Injector Circuit)",
+            "3": "Ignition System or Misfire", "4": "Auxiliary Emission Controls",
+            "5": "Vehicle Speed, Idle Control and Auxiliary Inputs",
+            "6": "Computer and Output Circuits", "7": "Transmission",
+            "8": "Transmission", "9": "Transmission", "A": "Hybrid Propulsion",
+            "B": "Hybrid Propulsion", "C": "Hybrid Propulsion"}
+
+
+def code_key(code):
+    """Sort key of a five-character code, or None if it is malformed."""
+    code = code.strip().upper()
+    if len(code) != 5 or code[0] not in CATEGORIES:
+        return None
+    try:
+        return CATEGORIES.index(code[0]) << 16 | int(code[1:], 16)
+    except ValueError:
+        return None
+
+
+def _key_range(prefix):
+    """(low, high) keys covered by a code prefix, or None."""
+    prefix = prefix.strip().upper()
+    if not prefix:
+        return 0, (len(CATEGORIES) << 16) - 1
+    if len(prefix) > 5:
+        return None
+    low, high = code_key(prefix.ljust(5, "0")), code_key(prefix.ljust(5, "F"))
+    return None if low is None or high is None else (low, high)
+
+
+def generic_description(code):
+    """Category-level description for a code missing from the catalog."""
+    code = code.upper()
+    system = SYSTEMS.get(code[:1], "Unknown")
+    if len(code) != 5:
+        return f"{system} code"
+    owner = "manufacturer-specific" if code[1] in "13" else "generic"
+    group = P_GROUPS.get(code[2]) if code[0] == "P" and code[1] in "02" else None
+    return f"{system} {owner} code" + (f" ({group})" if group else "")
+
+
+class DtcDatabase:
+    """Exact and prefix lookups over a dtc.bin file.
+
+    The file is opened and mapped on the first call, so constructing one
+    at import time costs nothing. lookup() is a binary search over the
+    key array; search() is two of them plus one record decode per hit.
+    """
+
+    def __init__(self, path=None):
+        self.path  = path or DEFAULT_PATH
+        self._mm   = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._mm is not None:
+                return
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, ecu_len, n = _HEADER.unpack_from(mm, 0)
+            if magic != b"DTC1" or version > VERSION:
+                mm.close()
+                raise ValueError(f"{self.path}: not a ToyotaScan DTC database")
+            pos = _HEADER.size
+            self._ecus = bytes(mm[pos:pos + ecu_len]).decode("utf-8").split("\n")
+            pos += (ecu_len + 3) & ~3
+            if sys.byteorder == "little":
+                self._keys = memoryview(mm)[pos:pos + 4 * n].cast("I")   # no copy
+            else:
+                self._keys = array("I", mm[pos:pos + 4 * n])
+                self._keys.byteswap()
+            self._records = pos + 4 * n
+            self._text    = self._records + n * _RECORD.size
+            self._n       = n
+            self._mm      = mm
+
+    def _info(self, i):
+        offset, length, severity, ecu = _RECORD.unpack_from(
+            self._mm, self._records + i * _RECORD.size)
+        start = self._text + offset
+        desc, _, hint = self._mm[start:start + length].decode("utf-8").partition(_SEP)
+        key  = self._keys[i]
+        code = f"{CATEGORIES[key >> 16]}{key & 0xFFFF:04X}"
+        return DtcInfo(code, desc, self._ecus[ecu], SEVERITIES[severity], hint)
+
+    def lookup(self, code):
+        """DtcInfo for code, or None if it is not in the catalog."""
+        if self._mm is None:
+            self._open()
+        key = code_key(code)
+        if key is None:
+            return None
+        i = bisect_left(self._keys, key)
+        if i < self._n and self._keys[i] == key:
+            return self._info(i)
+        return None
+
+    def search(self, prefix, limit=50):
+        """Catalog entries whose code starts with prefix, in code order."""
+        if self._mm is None:
+            self._open()
+        span = _key_range(prefix)
+        if span is None:
+            return []
+        lo = bisect_left(self._keys, span[0])
+        hi = min(bisect_right(self._keys, span[1]), lo + limit)
+        return [self._info(i) for i in range(lo, hi)]
+
+    def describe(self, code):
+        """Like lookup(), but unknown codes get a category description."""
+        code = code.strip().upper()
+        return self.lookup(code) or DtcInfo(code, generic_description(code),
+                                            "", SEVERITIES[2], "")
+
+    def __len__(self):
+        if self._mm is None:
+            self._open()
+        return self._n
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                if isinstance(self._keys, memoryview):
+                    self._keys.release()
+                self._mm.close()
+                self._mm = None
+
+
+def build(entries, path=DEFAULT_PATH):
+    """Write entries [(code, description, ecu, severity, hint)] to path;
+    returns the number of codes written."""
+    rows = {}
+    for code, desc, ecu, severity, hint in entries:
+        key = code_key(code)
+        if key is None:
+            raise ValueError(f"malformed code {code!r}")
+        rows[key] = (desc, ecu, severity, hint)
+    keys = sorted(rows)
+    ecus = sorted({r[1] for r in rows.values()})
+    ecu_index = {name: i for i, name in enumerate(ecus)}
+
+    text, records = bytearray(), bytearray()
+    for key in keys:
+        desc, ecu, severity, hint = rows[key]
+        blob = (desc + _SEP + hint if hint else desc).encode("utf-8")
+        records += _RECORD.pack(len(text), len(blob), severity, ecu_index[ecu])
+        text += blob
+
+    ecu_blob = "\n".join(ecus).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(b"DTC1", VERSION, len(ecu_blob), len(keys)))
+        f.write(ecu_blob + b"\0" * (-len(ecu_blob) % 4))
+        f.write(struct.pack(f"<{len(keys)}I", *keys))
+        f.write(records)
+        f.write(text)
+    os.replace(tmp, path)
+    return len(keys)
+
+
+def main(argv=None):
+    import argparse
+    ap  = argparse.ArgumentParser(description="Build or query the DTC database.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="compile dtc_catalog.py into dtc.bin")
+    b.add_argument("-o", "--output", default=DEFAULT_PATH)
+    s = sub.add_parser("search", help="list codes starting with a prefix")
+    s.add_argument("prefix")
+    s.add_argument("-n", "--limit", type=int, default=50)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        import dtc_catalog
+        n = build(dtc_catalog.entries(), args.output)
+        print(f"{args.output}: {n} codes, {os.path.getsize(args.output)} bytes")
+        return
+    for info in DtcDatabase().search(args.prefix, args.limit):
+        ecu = f" [{info.ecu}]" if info.ecu else ""
+        print(f"{info.code}  {info.severity:8s} {info.description}{ecu}")
+
+
+if __name__ == "__main__":
+    main()
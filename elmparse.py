@@ -0,0 +1,129 @@
+"""
+ToyotaScan — ELM327 response parser
+Works directly on the bytes read from the adapter: strips spaces and
+prompts in one pass, recognises CAN headers (11- and 29-bit) and
+reassembles ISO-TP multi-frame replies per ECU address.
+"""
+
+from binascii import Error as HexError, unhexlify
+
+_STRIP = b" \t\n>\x00"
+_HEX   = b"0123456789ABCDEFabcdef"
+
+
+class ElmReply:
+    """Parsed adapter reply.
+
+    messages is a list of (ecu, payload) in arrival order, where ecu is
+    the CAN header as text ("7E8", "18DAF110") or "" with headers off,
+    and payload is the reassembled ISO-TP data starting at the service
+    byte. status holds the last non-data line (NO DATA, ERROR, ...).
+    """
+    __slots__ = ("messages", "status")
+
+    def __init__(self):
+        self.messages = []
+        self.status   = None
+
+    def data(self, expect=None, echo=b""):
+        """First payload, or the first whose service byte is expect and
+        whose next bytes echo the requested PID (echo)."""
+        for _, payload in self.messages:
+            if expect is None or _answers(payload, expect, echo):
+                return payload
+        return None
+
+    def ecu(self, expect=None, echo=b""):
+        for ecu, payload in self.messages:
+            if expect is None or _answers(payload, expect, echo):
+                return ecu
+        return None
+
+
+def _answers(payload, expect, echo):
+    return (bool(payload) and payload[0] == expect
+            and payload[1:1 + len(echo)] == echo)
+
+
+def parse(raw, can=True):
+    """Parse one reply (bytes, bytearray or str) into an ElmReply."""
+    if isinstance(raw, str):
+        raw = raw.encode("ascii", "ignore")
+    reply   = ElmReply()
+    msgs    = reply.messages
+    append  = msgs.append
+    pending = {}            # ecu -> [slot, total, next_seq]
+    dropped = False
+    for line in raw.translate(None, _STRIP).split(b"\r"):
+        n = len(line)
+        if not n:
+            continue
+        if can and n & 1 and n > 3:
+            ecu, body = line[:3], line[3:]
+        elif can and n >= 10 and line[:4] == b"18DA":
+            ecu, body = line[:8], line[8:]
+        else:
+            ecu, body = None, line
+        try:
+            data = unhexlify(body)
+        except HexError:
+            # Headers off, multi-frame: "00E" length line then "0:" "1:" ...
+            if n == 3 and not line.translate(None, _HEX):
+                pending[""] = [len(msgs), int(line, 16), 0]
+                append(("", bytearray()))
+            elif line[1:2] == b":" and "" in pending:
+                try:
+                    msgs[pending[""][0]][1].extend(unhexlify(line[2:]))
+                except HexError:
+                    reply.status = "PARSE ERROR"
+            else:
+                reply.status = line.decode("ascii", "ignore")
+            continue
+        if ecu is None:
+            append(("", data))
+            continue
+        if not data:
+            continue
+        ecu  = ecu.decode("ascii")
+        kind = data[0] >> 4
+        if kind == 0:                                   # single frame
+            append((ecu, data[1:1 + (data[0] & 0x0F)]))
+        elif kind == 1 and len(data) > 1:               # first frame
+            total = ((data[0] & 0x0F) << 8) | data[1]
+            pending[ecu] = [len(msgs), total, 1]
+            append((ecu, bytearray(data[2:])))
+        elif kind == 2 and ecu in pending:              # consecutive
+            state = pending[ecu]
+            if data[0] & 0x0F != state[2]:
+                reply.status = "ISO-TP SEQUENCE"
+                msgs[state[0]] = (ecu, None)
+                del pending[ecu]
+                dropped = True
+                continue
+            state[2] = (state[2] + 1) & 0x0F
+            msgs[state[0]][1].extend(data[1:])
+        # flow control (3x) and stray frames are ignored
+    for slot, total, _ in pending.values():
+        ecu, buf = msgs[slot]
+        if len(buf) < total:
+            reply.status = "INCOMPLETE"
+        msgs[slot] = (ecu, bytes(buf[:total]))
+    if dropped:
+        reply.messages = [m for m in msgs if m[1] is not None]
+    return reply
+
+
+def decode_dtcs(reply, service=0x43):
+    """DTC strings from every message of a Mode 03/07/0A reply."""
+    dtcs = []
+    for _, p in reply.messages:
+        if not p or p[0] != service:
+            continue
+        # CAN replies carry a DTC count byte after the service byte
+        start = 2 if len(p) >= 2 and len(p) == 2 + 2 * p[1] else 1
+        for i in range(start, len(p) - 1, 2):
+            b1, b2 = p[i], p[i + 1]
+            if b1 == 0 and b2 == 0:
+                continue
+            dtcs.append("PCBU"[b1 >> 6] + f"{((b1 & 0x3F) << 8) | b2:04X}")
+    return dtcs
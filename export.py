@@ -0,0 +1,268 @@
+"""
+ToyotaScan — session export
+Streams a recorded session (see session.py) into CSV or a columnar
+binary file in fixed-size row blocks, optionally resampled onto a
+common clock. Runs on a desktop without Kivy:
+
+    python export.py drive.tss -o drive.csv
+    python export.py drive.tss -o drive.tsc --format columnar --resample 0.1
+"""
+
+import argparse
+import json
+import math
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+from session import KIND_DTCS, KIND_VALUE, SessionReader
+
+CHUNK_ROWS = 8192
+
+_MAGIC = b"TSC1"
+_GROUP = struct.Struct("<4sI")          # "RGRP", rows
+_COL   = struct.Struct("<BI")           # zlib flag, stored bytes
+_TAIL  = struct.Struct("<I4s")          # footer JSON length, magic
+
+
+# 
+#  ROW BLOCK GENERATORS
+# 
+def value_blocks(reader, rows=CHUNK_ROWS):
+    """Yield (t, pid index, value) column arrays of up to rows samples."""
+    ts, idx, vals = array("d"), array("H"), array("f")
+    for kind, t, i, v in reader.records():
+        if kind != KIND_VALUE:
+            continue
+        ts.append(t)
+        idx.append(i)
+        vals.append(v)
+        if len(ts) >= rows:
+            yield ts, idx, vals
+            ts, idx, vals = array("d"), array("H"), array("f")
+    if ts:
+        yield ts, idx, vals
+
+
+def resampled_blocks(reader, period, rows=CHUNK_ROWS):
+    """Yield (t, [column per PID]) arrays on a common clock.
+
+    Every PID holds its last value until the next sample (NaN before its
+    first one); the row at tick T holds the samples taken before T.
+    Columns are filled one at a time: a sample only marks where its
+    PID's value changes, and the ticks since the previous change are
+    written with one slice assignment, so the work grows with the
+    samples, not with ticks x PIDs. Memory stays at one block whatever
+    the session length.
+    """
+    n_pids = len(reader.pids)
+    nan    = float("nan")
+    row    = [nan] * n_pids             # current value per PID
+    done   = [0] * n_pids               # rows of the block filled, per PID
+    cols   = [array("f", bytes(4 * rows)) for _ in range(n_pids)]
+    base   = None                       # tick k is at base + k * period
+    first  = 1                          # tick of the block's first row
+    last   = None                       # tick that follows the last sample
+
+    def fill(c, upto):
+        if upto > done[c]:
+            cols[c][done[c]:upto] = array("f", [row[c]]) * (upto - done[c])
+            done[c] = upto
+
+    def block(n):
+        for c in range(n_pids):
+            fill(c, n)
+        ts = array("d", [base + k * period for k in range(first, first + n)])
+        return ts, [col[:n] if n < rows else col for col in cols]
+
+    for ts, idx, vals in value_blocks(reader, rows):
+        if base is None:
+            base = ts[0] - ts[0] % period
+        for t, c, v in zip(ts, idx, vals):
+            k = int((t - base) // period) + 1
+            while k - first >= rows:
+                yield block(rows)
+                first += rows
+                done = [0] * n_pids
+                cols = [array("f", bytes(4 * rows)) for _ in range(n_pids)]
+            fill(c, k - first)
+            row[c] = v
+            last = k
+    if last is not None:
+        yield block(last - first + 1)
+
+
+def dtc_events(reader):
+    return [(t, codes) for kind, t, codes, _ in reader.records()
+            if kind == KIND_DTCS]
+
+
+def _fmt(v):
+    return "" if math.isnan(v) else f"{v:.6g}"
+
+
+# 
+#  CSV
+# 
+def export_csv(reader, out, resample=None, rows=CHUNK_ROWS):
+    """Write CSV to the text stream out; returns rows written.
+
+    Long format (time, name, unit, value) by default; DTC reads are
+    appended as name "DTC" rows. With resample set, one column per PID
+    at that period in seconds, plus a last "DTC" column holding the
+    codes of each read on the first row after it (reads after the last
+    sample get a row of their own).
+    """
+    names = [p["name"] for p in reader.pids]
+    units = [p["unit"] for p in reader.pids]
+    count = 0
+    if resample:
+        events = dtc_events(reader)
+        e      = 0
+        out.write("time," + ",".join(f"{n} [{u}]" for n, u in zip(names, units))
+                  + ",DTC\n")
+        empty = "," * len(names)
+        for ts, cols in resampled_blocks(reader, resample, rows):
+            lines = []
+            for r, t in enumerate(ts):
+                codes = []
+                while e < len(events) and events[e][0] < t:
+                    codes += events[e][1]
+                    e += 1
+                lines.append(f"{t:.3f}," + ",".join(_fmt(c[r]) for c in cols)
+                             + "," + " ".join(codes))
+            out.write("\n".join(lines) + "\n")
+            count += len(lines)
+        for t, codes in events[e:]:
+            out.write(f"{t:.3f}{empty},{' '.join(codes)}\n")
+            count += 1
+        return count
+    out.write("time,name,unit,value\n")
+    for ts, idx, vals in value_blocks(reader, rows):
+        out.write("".join(f"{t:.3f},{names[i]},{units[i]},{v:.6g}\n"
+                          for t, i, v in zip(ts, idx, vals)))
+        count += len(ts)
+    for t, codes in dtc_events(reader):
+        out.write(f"{t:.3f},DTC,,{' '.join(codes)}\n")
+        count += 1
+    return count
+
+
+# 
+#  COLUMNAR
+# 
+def export_columnar(reader, path, resample=None, rows=CHUNK_ROWS, compress=True):
+    """Write a columnar file; returns rows written.
+
+    Layout: "TSC1", row groups ("RGRP" u32 rows, then per column u8 zlib
+    flag, u32 length, raw little-endian array bytes), then a JSON footer
+    with the schema, row group offsets and DTC events (raw and
+    resampled alike), u32 footer length and "TSC1".
+    """
+    if resample:
+        schema = [{"name": "time", "type": "d", "unit": "s"}] + [
+            {"name": p["name"], "type": "f", "unit": p["unit"]} for p in reader.pids]
+        blocks = ((ts, *cols) for ts, cols in resampled_blocks(reader, resample, rows))
+    else:
+        schema = [{"name": "time", "type": "d", "unit": "s"},
+                  {"name": "pid", "type": "H", "unit": ""},
+                  {"name": "value", "type": "f", "unit": ""}]
+        blocks = value_blocks(reader, rows)
+    groups, count = [], 0
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        for columns in blocks:
+            n = len(columns[0])
+            groups.append({"offset": f.tell(), "rows": n})
+            f.write(_GROUP.pack(b"RGRP", n))
+            for col in columns:
+                if sys.byteorder != "little":
+                    col = array(col.typecode, col)
+                    col.byteswap()
+                raw  = col.tobytes()
+                body = zlib.compress(raw, 1) if compress else raw
+                f.write(_COL.pack(1 if compress else 0, len(body)))
+                f.write(body)
+            count += n
+        footer = json.dumps({
+            "schema":     schema,
+            "row_groups": groups,
+            "rows":       count,
+            "pids":       reader.pids,
+            "session":    {k: v for k, v in reader.meta.items() if k != "pids"},
+            "dtc_events": dtc_events(reader),
+            "resample":   resample,
+        }).encode("utf-8")
+        f.write(footer)
+        f.write(_TAIL.pack(len(footer), _MAGIC))
+    return count
+
+
+def read_columnar(path):
+    """(footer, generator of {column name: array}) for a columnar file."""
+    f = open(path, "rb")
+    f.seek(-_TAIL.size, 2)
+    size, magic = _TAIL.unpack(f.read(_TAIL.size))
+    if magic != _MAGIC:
+        f.close()
+        raise ValueError(f"{path}: not a ToyotaScan columnar file")
+    f.seek(-_TAIL.size - size, 2)
+    footer = json.loads(f.read(size).decode("utf-8"))
+
+    def groups():
+        with f:
+            for g in footer["row_groups"]:
+                f.seek(g["offset"] + _GROUP.size)
+                out = {}
+                for col in footer["schema"]:
+                    flag, n = _COL.unpack(f.read(_COL.size))
+                    body = f.read(n)
+                    a = array(col["type"], zlib.decompress(body) if flag else body)
+                    if sys.byteorder != "little":
+                        a.byteswap()
+                    out[col["name"]] = a
+                yield out
+    return footer, groups()
+
+
+# 
+#  CLI
+# 
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export a ToyotaScan session.")
+    ap.add_argument("session", help="recorded .tss session file")
+    ap.add_argument("-o", "--output", help="output file (default: stdout, csv only)")
+    ap.add_argument("-f", "--format", choices=("csv", "columnar"), default=None,
+                    help="default: from the output extension (.tsc = columnar)")
+    ap.add_argument("-r", "--resample", type=float, metavar="SECONDS",
+                    help="align every PID onto a common clock at this period")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--no-compress", action="store_true")
+    args = ap.parse_args(argv)
+
+    fmt = args.format or ("columnar" if (args.output or "").endswith(".tsc") else "csv")
+    if fmt == "columnar" and not args.output:
+        ap.error("columnar export needs --output")
+    reader = SessionReader(args.session)
+    start  = time.perf_counter()
+    try:
+        if fmt == "columnar":
+            rows = export_columnar(reader, args.output, args.resample,
+                                   args.chunk_rows, not args.no_compress)
+        elif args.output:
+            with open(args.output, "w", newline="") as out:
+                rows = export_csv(reader, out, args.resample, args.chunk_rows)
+        else:
+            rows = export_csv(reader, sys.stdout, args.resample, args.chunk_rows)
+    finally:
+        reader.close()
+    elapsed = time.perf_counter() - start
+    print(f"{rows} rows in {elapsed:.2f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+ToyotaScan — headless fleet logger
+Logs several cars at once on the shop floor. Each adapter gets its own
+VeepeakManager (its own link, lock and reconnect), polled by its own
+PollScheduler on a thread of its own, and writes a session log per
+vehicle. The PID tables and decoders are shared. Fleet.stats() sums
+health and throughput over all of them.
+
+    python fleet.py --logs logs tcp:192.168.0.10:35000 /dev/rfcomm0
+    python fleet.py --logs /tmp/fleet --simulate 24 --duration 60
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+
+from capabilities import CapabilityCache
+from core import DECODERS, PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from scheduler import PollScheduler
+from transport import FdTransport, SocketTransport
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+# First-connect retry delay: first retry, doubling up to the cap (s).
+# Once attached, the manager reconnects dropped links itself.
+CONNECT_BACKOFF = (1.0, 30.0)
+
+# A polling vehicle with no value for this long counts as offline (s)
+STALE_AFTER = 10.0
+
+CONNECTING, POLLING, OFFLINE, STOPPED = "connecting", "polling", "offline", "stopped"
+
+
+def opener(spec):
+    """Transport factory for an adapter spec: tcp:HOST:PORT, or the
+    path of a serial tty or pty."""
+    if spec.startswith("tcp:"):
+        host, _, port = spec[4:].rpartition(":")
+        return lambda: SocketTransport.connect(host, int(port))
+    return lambda: FdTransport.open(spec)
+
+
+class Vehicle:
+    """One adapter: connect, discover the car's PIDs, start its session
+    log, then poll on its own schedule until stopped."""
+
+    def __init__(self, name, open_transport, logs, pids=PIDS, rates=None,
+                 cache=None):
+        self.name      = name
+        self.open      = open_transport
+        self.logs      = logs
+        self.pids      = pids
+        self.rates     = rates           # {name: (tier, hz)} over PID_RATES
+        self.mgr       = VeepeakManager()
+        self.mgr.cache = cache
+        self.scheduler = None
+        self.state     = CONNECTING
+        self.log_path  = None
+        self.error     = None            # last connect failure
+        self.sweeps    = 0               # scheduler cycles with replies
+        self.values    = 0               # decoded values logged
+        self.missing   = 0               # polled PIDs that got no value
+        self.last_values = None          # time.monotonic() of the last value
+        self.polling_since = None
+        self._stop     = threading.Event()
+        self._thread   = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"fleet-{self.name}",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        delay, cap = CONNECT_BACKOFF
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._connect()
+                    break
+                except Exception as e:
+                    self.error = repr(e)
+                    self.state = OFFLINE
+                    self.mgr.disconnect()
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, cap)
+            if self.scheduler is not None:
+                self.scheduler.run(self.mgr.query_batch, self._on_values, self._stop)
+        finally:
+            self.mgr.stop_recording()
+            self.mgr.disconnect()
+            self.state = STOPPED
+
+    def _connect(self):
+        self.state = CONNECTING
+        self.mgr.attach_transport(self.open(), self.name, self.open)
+        if not self.mgr.elm_version:
+            raise ConnectionError("no answer from the adapter")
+        supported = self.mgr.discover_capabilities(self.pids, self.mgr.cache)
+        pids = [p for p in self.pids if (p[1], p[2]) in supported]
+        if not pids:
+            raise ConnectionError("the car answered none of the PIDs")
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.name).strip("_")
+        self.log_path = os.path.join(
+            self.logs, f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}.tss")
+        self.mgr.start_recording(self.log_path)
+        self.scheduler = PollScheduler(pids, self.rates)
+        self.polling_since = time.monotonic()
+        self.state = POLLING
+
+    def _on_values(self, replies):
+        decode = DECODERS.decode
+        values = {name: decode(name, data) for name, data in replies.items()}
+        self.mgr.feed_values(values)
+        got = sum(1 for v in values.values() if v is not None)
+        self.sweeps  += 1
+        self.values  += got
+        self.missing += len(values) - got
+        if got:
+            self.last_values = time.monotonic()
+
+    def stats(self):
+        now   = time.monotonic()
+        up    = now - self.polling_since if self.polling_since else 0.0
+        tel   = self.mgr.telemetry.outcomes()
+        idle  = now - (self.last_values or self.polling_since or now)
+        state = self.state
+        if state == POLLING and (not self.mgr.connected or idle > STALE_AFTER):
+            state = OFFLINE
+        return {"state": state, "vehicle": self.mgr.vehicle_id,
+                "log": self.log_path, "error": self.error,
+                "sweeps": self.sweeps, "values": self.values,
+                "missing": self.missing,
+                "values_per_s": self.values / up if up else 0.0,
+                "commands": sum(tel.values()),
+                "timeouts": tel["timeout"],
+                "errors": tel["adapter_error"] + tel["exception"],
+                "reconnects": self.mgr.reconnects,
+                "connect_s": self.mgr.connect_time,
+                "idle_s": idle}
+
+
+class Fleet:
+    """Vehicles polled concurrently, one thread each (the links spend
+    nearly all their time waiting on the adapters)."""
+
+    def __init__(self, logs, pids=PIDS, rates=None, cache=None):
+        os.makedirs(logs, exist_ok=True)
+        self.logs     = logs
+        self.pids     = pids
+        self.rates    = rates
+        self.cache    = cache or CapabilityCache(os.path.join(logs, "capabilities.json"))
+        self.vehicles = []
+        self._started = None
+        self._cpu     = None
+
+    def add(self, name, open_transport, rates=None):
+        """Add an adapter by name and a callable returning an open
+        Transport; rates overrides the fleet's for this vehicle."""
+        v = Vehicle(name, open_transport, self.logs, self.pids,
+                    rates or self.rates, self.cache)
+        self.vehicles.append(v)
+        if self._started is not None:
+            v.start()
+        return v
+
+    def start(self):
+        self._started = time.monotonic()
+        self._cpu     = time.process_time()
+        for v in self.vehicles:
+            v.start()
+
+    def stop(self, timeout=10.0):
+        """Stop polling and close every log."""
+        for v in self.vehicles:
+            v.stop()
+        end = time.monotonic() + timeout
+        for v in self.vehicles:
+            v.join(max(0.0, end - time.monotonic()))
+
+    def stats(self):
+        """Fleet totals plus per-vehicle stats under "vehicles"."""
+        wall = time.monotonic() - self._started if self._started else 0.0
+        cpu  = time.process_time() - self._cpu if self._started else 0.0
+        per  = {v.name: v.stats() for v in self.vehicles}
+        n    = len(per) or 1
+        out  = {"vehicles": per, "count": len(per), "seconds": wall,
+                "cpu_percent": cpu / wall * 100 if wall else 0.0,
+                "cpu_ms_per_vehicle_s": cpu / (wall * n) * 1000 if wall else 0.0}
+        for state in (CONNECTING, POLLING, OFFLINE, STOPPED):
+            out[state] = sum(1 for s in per.values() if s["state"] == state)
+        for key in ("sweeps", "values", "missing", "commands", "timeouts",
+                    "errors", "reconnects", "values_per_s"):
+            out[key] = sum(s[key] for s in per.values())
+        return out
+
+    def report(self):
+        s = self.stats()
+        lines = [f"{s['count']} vehicles: {s[POLLING]} polling, {s[OFFLINE]} offline, "
+                 f"{s[CONNECTING]} connecting  |  {s['values_per_s']:.0f} values/s  "
+                 f"{s['timeouts']} timeouts  {s['errors']} errors  "
+                 f"{s['reconnects']} reconnects  |  CPU {s['cpu_percent']:.1f} % "
+                 f"({s['cpu_ms_per_vehicle_s']:.2f} ms per vehicle-second)"]
+        for name, v in s["vehicles"].items():
+            if v["state"] != POLLING:
+                lines.append(f"  {name}: {v['state']} {v['error'] or ''}".rstrip())
+        return "\n".join(lines)
+
+
+def simulated(count, latency, jitter, pty=False):
+    """Start count simulated adapters in-process; returns [(spec,
+    FakeElm327)]."""
+    from simulator import PriusSimulator
+    from transport import FakeElm327
+    out = []
+    for i in range(count):
+        fake = FakeElm327(PriusSimulator(seed=i, latency=latency, jitter=jitter).serve)
+        if pty:
+            spec = fake.serve_pty()
+        else:
+            host, port = fake.serve_tcp()
+            spec = f"tcp:{host}:{port}"
+        out.append((spec, fake))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Log several OBD adapters at once.")
+    ap.add_argument("adapters", nargs="*", help="tcp:HOST:PORT or a tty/pty path")
+    ap.add_argument("--logs", default="fleet-logs", help="session log directory")
+    ap.add_argument("--simulate", type=int, default=0, metavar="N",
+                    help="also start N simulated adapters in-process")
+    ap.add_argument("--pty", action="store_true", help="simulated adapters on ptys, not TCP")
+    ap.add_argument("--latency", type=float, default=0.03, help="simulated seconds per command")
+    ap.add_argument("--jitter", type=float, default=0.01)
+    ap.add_argument("--duration", type=float, default=0.0, help="seconds (default: until stopped)")
+    ap.add_argument("--interval", type=float, default=5.0, help="seconds between reports")
+    ap.add_argument("--stats", help="write the final stats here as JSON")
+    args = ap.parse_args(argv)
+
+    sims  = simulated(args.simulate, args.latency, args.jitter, args.pty)
+    fleet = Fleet(args.logs)
+    for spec in args.adapters:
+        fleet.add(spec, opener(spec))
+    for i, (spec, _) in enumerate(sims):
+        fleet.add(f"sim{i + 1:02d}", opener(spec))
+    if not fleet.vehicles:
+        ap.error("no adapters given")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    end = time.monotonic() + args.duration if args.duration else None
+    fleet.start()
+    try:
+        while not stop.wait(min(args.interval, end - time.monotonic())
+                            if end else args.interval):
+            print(fleet.report(), flush=True)
+            if end and time.monotonic() >= end:
+                break
+    except KeyboardInterrupt:
+        pass
+    fleet.stop()
+    stats = fleet.stats()
+    print(fleet.report())
+    if args.stats:
+        with open(args.stats, "w") as f:
+            json.dump(stats, f, indent=1)
+    for _, fake in sims:
+        fake.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
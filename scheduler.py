@@ -0,0 +1,182 @@
+"""
+ToyotaScan — adaptive PID polling scheduler
+Earliest-deadline-first schedule over the single ELM327 link, with a
+target rate per PID and priority tiers that are degraded low-first
+when the adapter cannot keep up.
+"""
+
+import time
+
+#  Priority tiers
+TIER_HIGH   = 0     # changes every ~100 ms (speeds, torques, current)
+TIER_NORMAL = 1
+TIER_LOW    = 2     # slow-moving (temperatures, levels, health)
+
+# name: (tier, target Hz)
+PID_RATES = {
+    "Engine RPM":         (TIER_HIGH,   10.0),
+    "Vehicle Speed":      (TIER_HIGH,    5.0),
+    "Throttle Position":  (TIER_HIGH,   10.0),
+    "HV Battery Current": (TIER_HIGH,   10.0),
+    "MG1 Speed":          (TIER_HIGH,   10.0),
+    "MG2 Speed":          (TIER_HIGH,   10.0),
+    "MG1 Torque":         (TIER_HIGH,   10.0),
+    "MG2 Torque":         (TIER_HIGH,   10.0),
+    "Engine Load":        (TIER_NORMAL,  5.0),
+    "MAF Air Flow":       (TIER_NORMAL,  5.0),
+    "Ignition Timing":    (TIER_NORMAL,  5.0),
+    "HV Battery Voltage": (TIER_NORMAL,  5.0),
+    "Short Fuel Trim B1": (TIER_NORMAL,  2.0),
+    "O2 Sensor B1S1":     (TIER_NORMAL,  2.0),
+    "VVT Advance B1":     (TIER_NORMAL,  2.0),
+    "HV Battery SOC":     (TIER_NORMAL,  1.0),
+    "Long Fuel Trim B1":  (TIER_LOW,     0.5),
+    "Coolant Temp":       (TIER_LOW,     0.5),
+    "Intake Air Temp":    (TIER_LOW,     0.5),
+    "HV Battery Temp":    (TIER_LOW,     0.5),
+    "Inverter Temp":      (TIER_LOW,     0.5),
+    "DC-DC Output":       (TIER_LOW,     0.5),
+    "Battery Fan Speed":  (TIER_LOW,     0.5),
+    "Oil Temp":           (TIER_LOW,     0.2),
+    "Fuel Level":         (TIER_LOW,     0.1),
+    "HV SOH":             (TIER_LOW,     0.05),
+}
+DEFAULT_RATE = (TIER_NORMAL, 1.0)
+
+MIN_SCALE = 0.02    # degraded PIDs still get polled occasionally
+HEADROOM  = 0.9     # plan for 90% of the measured link capacity
+
+
+class _Entry:
+    __slots__ = ("name", "mode", "pid", "tier", "rate", "effective",
+                 "cost", "next_due", "last_done", "interval", "polls")
+
+    def __init__(self, name, mode, pid, tier, rate, cost, now):
+        self.name      = name
+        self.mode      = mode
+        self.pid       = pid
+        self.tier      = tier
+        self.rate      = rate
+        self.effective = rate
+        self.cost      = cost        # round-trips per poll
+        self.next_due  = now
+        self.last_done = None
+        self.interval  = None        # EWMA of time between polls
+        self.polls     = 0
+
+
+class PollScheduler:
+    """Decides which PIDs to query next.
+
+    pids are STANDARD_PIDS / PRIUS_PIDS tuples; rates optionally
+    overrides PID_RATES by name with (tier, hz). step() runs one cycle
+    through a query_batch(keys) -> {(mode, pid): bytes} callable such as
+    VeepeakManager.query_batch.
+    """
+
+    def __init__(self, pids, rates=None, clock=time.monotonic,
+                 batch_modes=("01",), batch_size=6, max_round_trips=4):
+        self.clock           = clock
+        self.max_round_trips = max_round_trips
+        self._batch_size     = batch_size
+        self._rt             = None  # EWMA seconds per round-trip
+        now   = clock()
+        rates = {**PID_RATES, **(rates or {})}
+        self._entries = []
+        for p in pids:
+            name, mode, pid = p[0], p[1], p[2]
+            tier, hz = rates.get(name, DEFAULT_RATE)
+            cost = 1.0 / batch_size if mode in batch_modes else 1.0
+            self._entries.append(_Entry(name, mode, pid, tier, hz, cost, now))
+
+    #  Scheduling
+    def due(self, now=None):
+        """Entries whose deadline has passed, earliest deadline first."""
+        now = self.clock() if now is None else now
+        due = [e for e in self._entries if e.next_due <= now]
+        due.sort(key=lambda e: (e.next_due, e.tier))
+        return due
+
+    def next_cycle(self, now=None):
+        """Pick the due entries that fit in one cycle's round-trip budget."""
+        picked = []
+        for e in self.due(now):
+            if self._round_trips(picked + [e]) > self.max_round_trips:
+                break
+            picked.append(e)
+        return picked
+
+    def _round_trips(self, entries):
+        batched = sum(1 for e in entries if e.cost < 1.0)
+        return (len(entries) - batched) + -(-batched // self._batch_size)
+
+    def step(self, query_batch):
+        """Poll one cycle; return {name: byte list or None}."""
+        start  = self.clock()
+        picked = self.next_cycle(start)
+        if not picked:
+            return {}
+        replies = query_batch([(e.mode, e.pid) for e in picked])
+        done    = self.clock()
+        self._record(picked, start, done)
+        return {e.name: replies.get((e.mode, e.pid)) for e in picked}
+
+    def run(self, query_batch, on_values, stop, idle=0.005):
+        """Poll until stop (a threading.Event) is set."""
+        while not stop.is_set():
+            values = self.step(query_batch)
+            if values:
+                on_values(values)
+            else:
+                wait = self.next_deadline() - self.clock()
+                stop.wait(min(max(wait, 0.0), 0.25) or idle)
+
+    def next_deadline(self):
+        return min((e.next_due for e in self._entries), default=self.clock())
+
+    def _record(self, picked, start, done):
+        per = (done - start) / self._round_trips(picked)
+        self._rt = per if self._rt is None else self._rt * 0.8 + per * 0.2
+        for e in picked:
+            if e.last_done is not None:
+                gap = done - e.last_done
+                e.interval = gap if e.interval is None else e.interval * 0.8 + gap * 0.2
+            e.last_done = done
+            e.polls    += 1
+            e.next_due  = max(e.next_due + 1.0 / e.effective, done)
+        self._rebalance()
+
+    def _rebalance(self):
+        """Scale effective rates so demand fits the measured capacity,
+        giving whatever is left to each tier from high to low."""
+        if not self._rt:
+            return
+        remaining = HEADROOM / self._rt          # round-trips per second
+        for tier in sorted({e.tier for e in self._entries}):
+            members = [e for e in self._entries if e.tier == tier]
+            demand  = sum(e.rate * e.cost for e in members)
+            scale   = 1.0 if demand <= remaining else max(MIN_SCALE, remaining / demand)
+            for e in members:
+                e.effective = e.rate * scale
+            remaining = max(0.0, remaining - demand * scale)
+
+    #  Stats
+    def achieved_hz(self):
+        """{name: measured polls per second} for PIDs polled twice or more."""
+        return {e.name: 1.0 / e.interval for e in self._entries if e.interval}
+
+    def stats(self):
+        """Per-PID target, effective and achieved rates."""
+        return {e.name: {"tier": e.tier, "target_hz": e.rate,
+                         "effective_hz": e.effective,
+                         "achieved_hz": 1.0 / e.interval if e.interval else 0.0,
+                         "polls": e.polls}
+                for e in self._entries}
+
+    def set_rate(self, name, hz, tier=None):
+        for e in self._entries:
+            if e.name == name:
+                e.rate = hz
+                if tier is not None:
+                    e.tier = tier
+        self._rebalance()
@@ -0,0 +1,371 @@
+"""
+ToyotaScan — drive session recording and replay
+Append-only binary log of every ELM327 exchange, decoded value and DTC
+read, written from a background thread, and a memory-mapped replay
+transport that plays a log back into VeepeakManager.
+
+File layout (little-endian):
+    header   "TSS1" u16 version, u16 flags, f64 start, u32 n + n bytes JSON
+    chunk    "CHNK" u8 zlib, 3 pad, u32 raw_len, u32 stored_len,
+             u32 records, f64 t_first, f64 t_last, then stored_len bytes
+    index    "INDX" u32 n, then n x (u64 chunk offset, f64 t_first)
+    footer   "TEND" u64 offset of the index covering every chunk
+Chunk bodies are 16-byte records, exchanges and DTC reads followed by
+their variable-length bytes:
+    value    u8 1, u8 0, u16 pid index, f64 t, f32 value
+    exchange u8 2, u8 0, u16 0,         f64 t, u16 cmd len, u16 reply len
+    dtcs     u8 3, u8 0, u16 count,     f64 t, u16 text len, u16 0
+"""
+
+import json
+import mmap
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+from telemetry import command_key
+from transport import Transport
+
+VERSION   = 1
+FLAG_ZLIB = 0x01
+
+_HEADER = struct.Struct("<4sHHdI")
+_CHUNK  = struct.Struct("<4sBxxxIIIdd")
+_INDEX  = struct.Struct("<4sI")
+_ENTRY  = struct.Struct("<Qd")
+_FOOTER = struct.Struct("<4sQ")
+_VALUE  = struct.Struct("<BBHdf")
+_BLOB   = struct.Struct("<BBHdHH")
+
+KIND_VALUE, KIND_EXCHANGE, KIND_DTCS = 1, 2, 3
+
+
+# 
+#  RECORDER
+# 
+class SessionRecorder:
+    """Writes a session file from a background thread.
+
+    The record_* calls only enqueue a tuple, so the polling thread never
+    waits on storage. Records are packed into chunks of about
+    chunk_bytes (zlib level 1 when compress is set), flushed at least
+    every flush_interval seconds, with an index block every
+    index_every chunks.
+    """
+
+    def __init__(self, path, pids, meta=None, compress=True,
+                 chunk_bytes=64 * 1024, flush_interval=1.0, index_every=16):
+        self.path           = path
+        self.compress       = compress
+        self.chunk_bytes    = chunk_bytes
+        self.flush_interval = flush_interval
+        self.index_every    = index_every
+        self._pid_index     = {p[0]: i for i, p in enumerate(pids)}
+        self._queue         = queue.SimpleQueue()
+        self._index         = []        # (offset, t_first) of every chunk
+        self._indexed       = 0
+        self.records        = 0
+
+        meta = dict(meta or {})
+        meta["pids"] = [{"name": p[0], "mode": p[1], "pid": p[2],
+                         "unit": p[3], "min": p[5], "max": p[6]} for p in pids]
+        blob = json.dumps(meta).encode("utf-8")
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(b"TSS1", VERSION,
+                                      FLAG_ZLIB if compress else 0,
+                                      time.time(), len(blob)))
+        self._file.write(blob)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    #  Producer side (any thread)
+    def record_exchange(self, t, cmd, reply):
+        self._queue.put((KIND_EXCHANGE, t, cmd, reply))
+
+    def record_values(self, t, values):
+        """values is a {name: value} sweep; unknown names are skipped."""
+        self._queue.put((KIND_VALUE, t, values))
+
+    def record_dtcs(self, t, codes):
+        self._queue.put((KIND_DTCS, t, codes))
+
+    def close(self):
+        """Flush everything, write the final index and footer."""
+        self._queue.put(None)
+        self._thread.join()
+
+    #  Writer thread
+    def _writer(self):
+        buf, count, first, last = bytearray(), 0, None, None
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = False
+            if item:
+                kind, t = item[0], item[1]
+                if kind == KIND_VALUE:
+                    index = self._pid_index
+                    for name, v in item[2].items():
+                        i = index.get(name)
+                        if i is not None and v is not None:
+                            buf += _VALUE.pack(KIND_VALUE, 0, i, t, v)
+                            count += 1
+                elif kind == KIND_EXCHANGE:
+                    cmd = item[2].encode("ascii", "ignore")
+                    buf += _BLOB.pack(KIND_EXCHANGE, 0, 0, t, len(cmd), len(item[3]))
+                    buf += cmd
+                    buf += item[3]
+                    count += 1
+                else:
+                    text = ",".join(item[2]).encode("ascii", "ignore")
+                    buf += _BLOB.pack(KIND_DTCS, 0, len(item[2]), t, len(text), 0)
+                    buf += text
+                    count += 1
+                first = t if first is None else first
+                last  = t
+            done = item is None
+            if buf and (done or len(buf) >= self.chunk_bytes
+                        or time.monotonic() >= deadline):
+                self._write_chunk(buf, count, first, last)
+                buf, count, first, last = bytearray(), 0, None, None
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if done:
+                break
+        self._write_index(self._index)
+        self._file.close()
+
+    def _write_chunk(self, buf, count, first, last):
+        body = zlib.compress(bytes(buf), 1) if self.compress else buf
+        self._index.append((self._file.tell(), first))
+        self._file.write(_CHUNK.pack(b"CHNK", 1 if self.compress else 0,
+                                     len(buf), len(body), count, first, last))
+        self._file.write(body)
+        self._file.flush()
+        self.records += count
+        if len(self._index) - self._indexed >= self.index_every:
+            self._write_index(self._index[self._indexed:], final=False)
+            self._indexed = len(self._index)
+
+    def _write_index(self, entries, final=True):
+        offset = self._file.tell()
+        self._file.write(_INDEX.pack(b"INDX", len(entries)))
+        for e in entries:
+            self._file.write(_ENTRY.pack(*e))
+        if final:
+            self._file.write(_FOOTER.pack(b"TEND", offset))
+        self._file.flush()
+
+
+# 
+#  READER
+# 
+class SessionReader:
+    """Memory-mapped view of a session file.
+
+    Chunks are decompressed one at a time as they are iterated, so
+    reading a multi-hour log needs memory for one chunk only. Files cut
+    short by a crash are read up to the last complete chunk.
+    """
+
+    def __init__(self, path):
+        self._f  = open(path, "rb")
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.flags, self.start, n = _HEADER.unpack_from(self._mm, 0)
+        if magic != b"TSS1" or version > VERSION:
+            raise ValueError(f"{path}: not a ToyotaScan session")
+        end = _HEADER.size + n
+        self.meta  = json.loads(bytes(self._mm[_HEADER.size:end]).decode("utf-8"))
+        self.pids  = self.meta["pids"]
+        self._data = end
+
+    def close(self):
+        self._mm.close()
+        self._f.close()
+
+    def chunk_index(self):
+        """[(offset, t_first)] from the footer index, or by scanning."""
+        mm = self._mm
+        if len(mm) >= _FOOTER.size:
+            magic, offset = _FOOTER.unpack_from(mm, len(mm) - _FOOTER.size)
+            if magic == b"TEND":
+                _, n = _INDEX.unpack_from(mm, offset)
+                base = offset + _INDEX.size
+                return [_ENTRY.unpack_from(mm, base + i * _ENTRY.size)
+                        for i in range(n)]
+        return [(off, hdr[5]) for off, hdr in self._scan()]
+
+    def _scan(self):
+        mm, pos, size = self._mm, self._data, len(self._mm)
+        while pos + 4 <= size:
+            magic = mm[pos:pos + 4]
+            if magic == b"CHNK":
+                if pos + _CHUNK.size > size:
+                    return
+                hdr = _CHUNK.unpack_from(mm, pos)
+                if pos + _CHUNK.size + hdr[3] > size:
+                    return                          # truncated chunk
+                yield pos, hdr
+                pos += _CHUNK.size + hdr[3]
+            elif magic == b"INDX":
+                _, n = _INDEX.unpack_from(mm, pos)
+                pos += _INDEX.size + n * _ENTRY.size
+            else:
+                return
+
+    def _body(self, offset):
+        hdr   = _CHUNK.unpack_from(self._mm, offset)
+        start = offset + _CHUNK.size
+        if hdr[1]:
+            return zlib.decompress(memoryview(self._mm)[start:start + hdr[3]])
+        return self._mm[start:start + hdr[3]]
+
+    def records(self, since=None):
+        """Yield (kind, t, a, b) in file order.
+
+        value:    (KIND_VALUE, t, pid index, value)
+        exchange: (KIND_EXCHANGE, t, cmd str, reply bytes)
+        dtcs:     (KIND_DTCS, t, [codes], None)
+        """
+        index = self.chunk_index()
+        if since is not None:
+            while len(index) > 1 and index[1][1] <= since:
+                index = index[1:]
+        for offset, _ in index:
+            body = self._body(offset)
+            pos, size = 0, len(body)
+            while pos < size:
+                kind = body[pos]
+                if kind == KIND_VALUE:
+                    _, _, i, t, v = _VALUE.unpack_from(body, pos)
+                    pos += _VALUE.size
+                    if since is None or t >= since:
+                        yield KIND_VALUE, t, i, v
+                    continue
+                _, _, n, t, la, lb = _BLOB.unpack_from(body, pos)
+                pos += _BLOB.size
+                a = bytes(body[pos:pos + la])
+                pos += la
+                b = bytes(body[pos:pos + lb])
+                pos += lb
+                if since is not None and t < since:
+                    continue
+                if kind == KIND_EXCHANGE:
+                    yield KIND_EXCHANGE, t, a.decode("ascii", "ignore"), b
+                else:
+                    yield KIND_DTCS, t, a.decode("ascii").split(",") if n else [], None
+
+    def exchanges(self):
+        for kind, t, cmd, reply in self.records():
+            if kind == KIND_EXCHANGE:
+                yield t, cmd, reply
+
+
+# 
+#  REPLAY TRANSPORT
+# 
+class ReplayTransport(Transport):
+    """Plays a recorded session back as if it were the adapter.
+
+    The discovery exchanges stored in the meta are answered first, in
+    order, so a manager that runs discover_capabilities() before
+    polling, as the recording one did, does not eat the recorded
+    sweeps. Other OBD commands get the next recorded reply to the same
+    request (looking ahead up to lookahead exchanges, so polling order
+    may drift), compared without the response-count digit and
+    preferring replies recorded under the same ATSH header. AT commands
+    are answered here: ATDPN and ATI from the session meta, so the
+    manager picks the recorded protocol and header pinning, and the
+    rest with OK. speed 1.0 replays in real time, N for N x, 0 as fast
+    as possible. Commands with no recorded reply get NO DATA.
+    """
+
+    def __init__(self, path, speed=1.0, lookahead=256):
+        super().__init__()
+        self.reader    = SessionReader(path)
+        self.speed     = speed
+        self.lookahead = lookahead
+        self.finished  = False
+        self._source   = self.reader.exchanges()
+        self._window   = deque()       # (t, header, command_key, reply)
+        self._header   = "7DF"         # ATSH of the replaying manager
+        # ATSH in force while recording, from the header at the start
+        self._rec_header = self.reader.meta.get("header") or "7DF"
+        self._t0       = None          # (wall, recorded) at first reply
+        # Discovery exchanges made before recording started
+        self._prologue = deque((command_key(cmd.strip().upper()), reply.encode("latin-1"))
+                               for cmd, reply in self.reader.meta.get("discovery", ())
+                               if not cmd.strip().upper().startswith("AT"))
+
+    def _fill(self):
+        while len(self._window) < self.lookahead and not self.finished:
+            try:
+                t, cmd, reply = next(self._source)
+            except StopIteration:
+                self.finished = True
+                return
+            c = cmd.strip().upper()
+            if c.startswith("AT"):
+                if c.startswith("ATSH"):
+                    self._rec_header = c[4:].strip()
+                elif c[2:4] in ("Z", "WS", "D"):
+                    self._rec_header = "7DF"
+                continue
+            self._window.append((t, self._rec_header, command_key(c), reply))
+
+    def exchange(self, cmd, timeout=4.0):
+        self.complete = True
+        c = cmd.strip().upper()
+        if c.startswith("AT"):
+            return self._at(c)
+        key = command_key(c)
+        if self._prologue and self._prologue[0][0] == key:
+            return self._prologue.popleft()[1]
+        self._fill()
+        found = None
+        for i, (t, header, rec_key, reply) in enumerate(self._window):
+            if rec_key == key:
+                if header == self._header:
+                    found = i
+                    break
+                if found is None:
+                    found = i
+        if found is None:
+            return b"NO DATA\r\r>"
+        for _ in range(found):
+            self._window.popleft()
+        t, _, _, reply = self._window.popleft()
+        self._pace(t)
+        return reply
+
+    def _at(self, c):
+        meta = self.reader.meta
+        if c.startswith("ATSH"):
+            self._header = c[4:].strip()
+        elif c in ("ATZ", "ATWS", "ATD"):
+            self._header = "7DF"
+        if c == "ATDPN":
+            text = meta.get("protocol") or "NO DATA"
+        elif c in ("ATI", "ATZ", "ATWS"):
+            text = meta.get("elm") or "ELM327"
+        else:
+            text = "OK"
+        return (text + "\r\r>").encode("ascii")
+
+    def _pace(self, t):
+        if not self.speed:
+            return
+        if self._t0 is None:
+            self._t0 = (time.monotonic(), t)
+            return
+        wait = self._t0[0] + (t - self._t0[1]) / self.speed - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def close(self):
+        self.reader.close()
@@ -0,0 +1,570 @@
+"""
+ToyotaScan — Prius simulator
+A state-based Prius model (power-split drivetrain, SOC integration,
+regen braking, thermal lag) stepped on a clock, behind an ELM327
+command interpreter with configurable latency, jitter and error rate.
+Answers demo mode in-process and serves a fake adapter on a pty or a
+TCP port for load tests:
+
+    python simulator.py --tcp 35000 --latency 0.03 --jitter 0.01
+    python simulator.py --pty --profile gen2 --time-scale 10
+    python simulator.py --tcp 35000 --count 8    # ports 35000-35007
+"""
+
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+
+from battery import MODULE_CMD, MODULES, encode_modules
+from decoders import encode_value
+from transport import FakeElm327, Transport
+
+DT = 0.05                       # model step (s)
+
+# Simulated vehicles: (VIN, commands the car ignores)
+PROFILES = {
+    "gen3":    ("JTDKN3DU5A0000001", ()),
+    "gen2":    ("JTDKB20U093000002", ("012F", "22E3", "22E4", "22E5", "22E6",
+                                      "22F405", "22F406", "22F407", "22F408")),
+    "prius_c": ("JTDKDTB39C1000003", ("22E5", "22E6", "22F405", "22F407",
+                                      "22F408", "2125", "2161", MODULE_CMD)),
+}
+
+# command -> (model attribute, decoders.FORMULAS key, ECU request
+# address, bytes after the value). ECUs answer on request + 8.
+ENGINE, HV, BATTERY = "7E0", "7E2", "7E3"
+SIGNALS = {
+    "0104":   ("load",      "pct",       ENGINE,  b""),
+    "0105":   ("coolant",   "temp",      ENGINE,  b""),
+    "0106":   ("stft",      "fuel_trim", ENGINE,  b""),
+    "0107":   ("ltft",      "fuel_trim", ENGINE,  b""),
+    "010C":   ("rpm",       "rpm",       ENGINE,  b""),
+    "010D":   ("speed",     "speed",     ENGINE,  b""),
+    "010E":   ("timing",    "timing",    ENGINE,  b""),
+    "010F":   ("iat",       "temp",      ENGINE,  b""),
+    "0110":   ("maf",       "maf",       ENGINE,  b""),
+    "0111":   ("throttle",  "pct",       ENGINE,  b""),
+    "0114":   ("o2",        "o2",        ENGINE,  b"\xff"),
+    "012F":   ("fuel",      "pct",       ENGINE,  b""),
+    "2110":   ("soc",       "soc",       HV,      b""),
+    "2125":   ("vvt",       "vvt",       ENGINE,  b""),
+    "2161":   ("oil",       "temp",      ENGINE,  b""),
+    "22E3":   ("mg1_rpm",   "mg_speed",  HV,      b""),
+    "22E4":   ("mg2_rpm",   "mg_speed",  HV,      b""),
+    "22E5":   ("mg1_nm",    "torque",    HV,      b""),
+    "22E6":   ("mg2_nm",    "torque",    HV,      b""),
+    "22F401": ("pack_v",    "pack_v",    BATTERY, b""),
+    "22F402": ("pack_a",    "pack_a",    BATTERY, b""),
+    "22F403": ("batt_temp", "temp",      BATTERY, b""),
+    "22F405": ("inv_temp",  "inv_temp",  HV,      b""),
+    "22F406": ("dcdc",      "dcdc",      HV,      b""),
+    "22F407": ("fan",       "fan",       BATTERY, b""),
+    "22F408": ("soh",       "soh",       BATTERY, b""),
+}
+
+# Adapter timing (s)
+RESET_DELAY  = 1.0              # ATZ
+WARM_DELAY   = 0.3              # ATWS
+SEARCH_DELAY = 1.8              # first OBD request after ATSP0
+ELM_VERSION  = "ELM327 v1.5"
+PROTOCOL     = (6, "ISO 15765-4 (CAN 11/500)")
+BUS_ERRORS   = ("NO DATA", "CAN ERROR", "BUFFER FULL")
+
+
+#
+#  VEHICLE MODEL
+#
+MASS      = 1450.0              # kg with driver
+CRR       = 0.009
+CDA       = 0.58                # drag area (m^2)
+RHO       = 1.2
+WHEEL_R   = 0.317               # m
+FINAL     = 3.267               # ring gear : wheel
+MG2_RATIO = 2.636               # MG2 : ring gear
+SUN, RING = 30, 78              # power-split planetary teeth
+ENGINE_KW = 73.0
+REGEN_KW  = 27.0
+PACK_AH   = 6.5
+PACK_R    = 0.35                # ohm
+AUX_KW    = 0.35
+TANK_L    = 45.0
+BSFC      = 230.0               # g/kWh
+RPM_PER_RAD_S = 60 / (2 * math.pi)
+
+
+def _lag(x, target, tau, dt):
+    """First-order lag of x towards target with time constant tau."""
+    return x + (target - x) * min(1.0, dt / tau)
+
+
+class PriusModel:
+    """Vehicle state advanced by step(dt).
+
+    A random drive cycle (stops, town, motorway) sets the target speed.
+    Wheel power comes from the road load; the engine runs for high
+    demand, speed, low SOC or warm-up and charges the pack; braking
+    regenerates up to REGEN_KW. Positive pack current discharges.
+    The pack is MODULES modules with a spread of resistance and charge;
+    module weak ages faster than the rest.
+    """
+
+    def __init__(self, seed=0, soh=91.0, ambient=22.0, weak=17):
+        self.rng       = random.Random(seed)
+        self.ambient   = ambient
+        self.t         = 0.0
+        self.v         = 0.0            # m/s
+        self.accel     = 0.0
+        self.target    = 0.0
+        self._leg_end  = 5.0
+        self.engine_on = False
+        self.engine_kw = 0.0
+        self.wheel_kw  = 0.0
+        self.rpm       = 0.0
+        self.mg1_rpm   = self.mg2_rpm = 0.0
+        self.mg1_nm    = self.mg2_nm  = 0.0
+        self.soc       = 60.0
+        self.soh       = soh
+        self.pack_a    = 0.0
+        self.pack_v    = self._ocv()
+        self.batt_temp = ambient + 4
+        self.coolant   = ambient
+        self.oil       = ambient
+        self.inv_temp  = ambient + 5
+        self.iat       = ambient + 3
+        self.fan       = 0.0
+        self.fuel      = 70.0
+        self.stft      = 0.0
+        self.ltft      = 1.6
+        self.load      = self.throttle = self.maf = 0.0
+        self.timing    = self.vvt = self.o2 = 0.0
+        self.dcdc      = 14.1
+        cells = random.Random(seed + 2)
+        r = [cells.uniform(0.92, 1.08) * (1.8 if i == weak else 1.0)
+             for i in range(MODULES)]
+        self.module_r   = [x * PACK_R / sum(r) for x in r]         # ohm
+        self.module_ocv = [cells.gauss(0, 0.004) - (0.05 if i == weak else 0.0)
+                           for i in range(MODULES)]             # V from pack mean
+        self._noise     = cells
+
+    @property
+    def speed(self):
+        return self.v * 3.6
+
+    @property
+    def module_v(self):
+        """Module voltages as the battery ECU reads them (ADC noise)."""
+        ocv, amps, gauss = self._ocv() / MODULES, self.pack_a, self._noise.gauss
+        return [ocv + d - amps * r + gauss(0, 0.002)
+                for d, r in zip(self.module_ocv, self.module_r)]
+
+    def _ocv(self):
+        return 190.0 + 0.3 * self.soc
+
+    def _drive(self):
+        if self.t >= self._leg_end:
+            r = self.rng.random()
+            if self.target and r < 0.3:
+                self.target, span = 0.0, (8, 25)
+            elif r < 0.75:
+                self.target, span = self.rng.uniform(25, 55), (20, 60)
+            else:
+                self.target, span = self.rng.uniform(80, 115), (40, 120)
+            self._leg_end = self.t + self.rng.uniform(*span)
+        self.accel = max(-2.5, min(1.8, 0.6 * (self.target / 3.6 - self.v)))
+
+    def step(self, dt=DT):
+        self.t += dt
+        self._drive()
+        v = max(0.0, self.v + self.accel * dt)
+        a = (v - self.v) / dt
+        self.v = v
+        force = MASS * a + ((CRR * MASS * 9.81 + 0.5 * RHO * CDA * v * v) if v else 0.0)
+        demand = self.wheel_kw = force * v / 1000
+
+        #  Engine on/off with hysteresis, charging towards 60 % SOC
+        if self.engine_on:
+            self.engine_on = (demand > 4 or v > 17 or self.soc < 50
+                              or self.coolant < 40)
+        else:
+            self.engine_on = (demand > 12 or v > 19.5 or self.soc < 45
+                              or (self.coolant < 40 and self.t > 5))
+        if self.engine_on:
+            charge = max(0.0, min(6.0, (60 - self.soc) * 0.8))
+            self.engine_kw = max(4.0, min(ENGINE_KW, max(demand, 0) + charge + 2))
+        else:
+            self.engine_kw = 0.0
+
+        #  Battery power (+ discharge) through ~90 % efficient MG/inverter
+        if demand >= 0:
+            elec = demand - self.engine_kw
+        else:
+            elec = max(demand, -REGEN_KW) * 0.85 - self.engine_kw
+        batt_kw = (elec / 0.9 if elec > 0 else elec * 0.9) + AUX_KW
+        ocv  = self._ocv()
+        disc = ocv * ocv - 4 * PACK_R * batt_kw * 1000
+        self.pack_a = (ocv - math.sqrt(max(disc, 0.0))) / (2 * PACK_R)
+        self.pack_v = ocv - self.pack_a * PACK_R
+        self.soc   -= self.pack_a * dt / (36 * PACK_AH * self.soh / 100)
+        self.soc    = max(20.0, min(85.0, self.soc))
+
+        #  Power split: MG2 on the ring gear, MG1 on the sun
+        ring = v / WHEEL_R * RPM_PER_RAD_S * FINAL
+        self.mg2_rpm = ring * MG2_RATIO
+        target_rpm   = min(5200.0, 1000 + 50 * self.engine_kw) if self.engine_on else 0.0
+        self.rpm     = _lag(self.rpm, target_rpm, 0.5, dt)
+        self.mg1_rpm = ((SUN + RING) * self.rpm - RING * ring) / SUN
+        eng_nm  = (self.engine_kw * 1000 / (self.rpm / RPM_PER_RAD_S)
+                   if self.rpm > 300 else 0.0)
+        ring_nm = force * WHEEL_R / FINAL
+        self.mg1_nm = -eng_nm * SUN / (SUN + RING)
+        self.mg2_nm = max(-207.0, min(207.0, (ring_nm - eng_nm * RING / (SUN + RING))
+                                      / MG2_RATIO))
+
+        #  Thermal lag
+        amb = self.ambient
+        self.fan = _lag(self.fan, 0.0 if self.batt_temp < 34
+                        else min(4000.0, (self.batt_temp - 34) * 600), 3.0, dt)
+        heat = self.pack_a * self.pack_a * PACK_R                 # W
+        cool = (self.batt_temp - (amb + 2)) * (10 + self.fan / 100)
+        self.batt_temp += dt * (heat - cool) / 2e4                # J/K
+        if self.engine_on:
+            self.coolant += dt * self.engine_kw * 0.03
+        self.coolant += dt * (amb - self.coolant) * 0.002
+        self.coolant  = min(self.coolant, 90.0 + self.engine_kw * 0.05)
+        self.oil      = _lag(self.oil, self.coolant + (5 if self.engine_on else 0), 60, dt)
+        self.inv_temp = _lag(self.inv_temp, amb + 10 + abs(elec) * 0.8, 30, dt)
+        self.iat      = _lag(self.iat, amb + 3 + (6 if v < 2 else 0), 120, dt)
+
+        #  Engine sensors
+        on = self.engine_on
+        self.load     = self.engine_kw / ENGINE_KW * 100
+        self.throttle = 12 + self.load * 0.7 if on else 0.0
+        fuel_gs       = self.engine_kw * BSFC / 3600
+        self.maf      = fuel_gs * 14.7
+        self.fuel     = max(0.0, self.fuel - fuel_gs * dt / 745 / TANK_L * 100)
+        self.timing   = 10 + 15 * (1 - self.load / 100) if on else 0.0
+        self.vvt      = _lag(self.vvt, 5 + 25 * self.load / 100 if on else 0.0, 1.0, dt)
+        self.o2       = 0.45 + 0.4 * math.sin(2 * math.pi * 1.2 * self.t) if on else 0.05
+        self.stft     = (max(-10.0, min(10.0, self.stft + self.rng.gauss(0, 0.3)))
+                         if on else 0.0)
+        self.dcdc     = 14.1 + 0.05 * math.sin(self.t * 7)
+
+
+#
+#  ELM327 INTERPRETER
+#
+class PriusSimulator:
+    """ELM327 in front of a PriusModel.
+
+    Before each command the model is advanced to the clock's elapsed
+    time times time_scale (0 freezes it; advance() steps it by hand, so
+    an hour of driving takes a couple of seconds). handle() returns the
+    reply with the modelled adapter delay: latency plus up to jitter,
+    resets, the protocol search after ATSP0 and the wait for further
+    ECUs set by ATST/ATAT. respond() returns the reply only; serve()
+    and SimulatorTransport sleep the delay. error_rate replaces that
+    fraction of OBD replies with bus errors. ready starts the adapter
+    as after the app's init sequence (echo off, headers on, protocol
+    found), as in-process demo mode never sends it.
+    """
+
+    def __init__(self, profile="gen3", seed=0, time_scale=1.0, latency=0.0,
+                 jitter=0.0, error_rate=0.0, ready=False, clock=time.monotonic):
+        self.profile    = profile
+        vin, missing    = PROFILES.get(profile, PROFILES["gen3"])
+        self.vin        = vin[:11] + f"{int(vin[11:]) + seed:06d}"    # serial per car
+        self.signals    = {c: s for c, s in SIGNALS.items() if c not in missing}
+        self.modules    = MODULE_CMD not in missing
+        self.model      = PriusModel(seed)
+        self.time_scale = time_scale
+        self.latency    = latency
+        self.jitter     = jitter
+        self.error_rate = error_rate
+        self.dtcs       = ["P0A7F", "P3000"]
+        self.clock      = clock
+        self._rng       = random.Random(seed + 1)
+        self._lock      = threading.Lock()
+        self._t0        = clock()
+        self.commands   = 0
+        self.errors     = 0
+        self.adapter_time = 0.0         # sum of modelled delays
+        self._bitmaps   = self._supported_bitmaps()
+        self._reset()
+        if ready:
+            self.echo, self.spaces, self.headers, self.found = False, False, True, True
+
+    def _reset(self):
+        self.echo      = True
+        self.linefeeds = False
+        self.spaces    = True
+        self.headers   = False
+        self.protocol  = 0              # 0 = automatic
+        self.found     = False
+        self.header    = None           # ATSH; None = functional 7DF
+        self.adaptive  = 1
+        self.st        = 0x32           # x 4 ms
+
+    def _supported_bitmaps(self):
+        pids = {c[2:] for c in self.signals if c.startswith("01")}
+        maps = {}
+        for base in (0x00, 0x20, 0x40):
+            bits = 0
+            for i in range(32):
+                if f"{base + i + 1:02X}" in pids:
+                    bits |= 1 << (31 - i)
+            if any(int(p, 16) > base + 32 for p in pids):
+                bits |= 1                      # next bitmap supported
+            if not bits:
+                break
+            maps[f"{base:02X}"] = bits.to_bytes(4, "big")
+        return maps
+
+    #  Clock
+    def advance(self, seconds):
+        """Step the model by seconds of simulated time."""
+        with self._lock:
+            self._step_to(self.model.t + seconds)
+
+    def _step_to(self, t):
+        model = self.model
+        while model.t + DT <= t:
+            model.step(DT)
+
+    def _sync(self):
+        if self.time_scale:
+            self._step_to((self.clock() - self._t0) * self.time_scale)
+
+    #  Commands
+    def respond(self, cmd):
+        return self.handle(cmd)[0]
+
+    def serve(self, cmd):
+        """Reply after the modelled delay (responder for FakeElm327)."""
+        text, delay = self.handle(cmd)
+        if delay:
+            time.sleep(delay)
+        return text
+
+    def handle(self, cmd):
+        """(reply text ending in '>', modelled adapter delay in s)."""
+        c = cmd.upper().replace(" ", "").strip()
+        with self._lock:
+            self._sync()
+            self.commands += 1
+            echo = self.echo
+            if c.startswith("AT"):
+                lines, delay = self._at(c[2:])
+            else:
+                lines, delay = self._obd(c)
+            delay += self.latency
+            if self.jitter:
+                delay += self._rng.uniform(0, self.jitter)
+            self.adapter_time += delay
+            sep = "\r\n" if self.linefeeds else "\r"
+            if echo:
+                lines = [cmd.strip()] + lines
+        return sep.join(lines) + sep + sep + ">", delay
+
+    def _at(self, c):
+        if c == "Z":
+            self._reset()
+            return ["", ELM_VERSION], RESET_DELAY
+        if c == "WS":
+            self._reset()
+            return ["", ELM_VERSION], WARM_DELAY
+        if c == "I":
+            return [ELM_VERSION], 0.0
+        if c == "RV":
+            return [f"{12.4 + 1.7 * (self.model.t > 1):.1f}V"], 0.0
+        if c == "DP":
+            name = PROTOCOL[1] if self.found else "AUTOMATIC"
+            return [("AUTO, " if self.protocol == 0 else "") + name], 0.0
+        if c == "DPN":
+            num = str(PROTOCOL[0]) if self.found or self.protocol else "0"
+            return [("A" if self.protocol == 0 else "") + num], 0.0
+        flag = c[-1:]
+        if c[:-1] in ("E", "L", "S", "H") and flag in "01":
+            attr = {"E": "echo", "L": "linefeeds", "S": "spaces", "H": "headers"}[c[:-1]]
+            setattr(self, attr, flag == "1")
+        elif c.startswith(("SP", "TP")) and len(c) >= 3:
+            p = c[-1]
+            if p not in "0123456789ABC":
+                return ["?"], 0.0
+            self.protocol = int(p, 16)
+            self.found    = self.protocol == PROTOCOL[0]
+        elif c.startswith("SH"):
+            self.header = None if c[2:] == "7DF" else c[2:]
+        elif c.startswith("AT") and c[2:] in ("0", "1", "2"):
+            self.adaptive = int(c[2:])
+        elif c.startswith("ST") and len(c) == 4:
+            self.st = int(c[2:], 16) or 0x32
+        elif c.startswith("D") and len(c) == 1:
+            self._reset()
+        return ["OK"], 0.0
+
+    def _obd(self, c):
+        try:
+            int(c, 16)
+        except ValueError:
+            return ["?"], 0.0
+        responses = None
+        if len(c) % 2:                  # trailing response count digit
+            c, responses = c[:-1], int(c[-1], 16)
+        lines, delay = [], 0.0
+        if not self.found:
+            if self.protocol not in (0, PROTOCOL[0]):
+                return ["UNABLE TO CONNECT"], SEARCH_DELAY
+            lines.append("SEARCHING...")
+            self.found, delay = True, SEARCH_DELAY
+        # No answer costs the full ATST timeout; after an answer the
+        # adapter waits for more ECUs unless told how many to expect
+        st = self.st * 0.004
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            return lines + [self._rng.choice(BUS_ERRORS)], delay + st
+        ecu, payload = self._payload(c)
+        if payload is None or (self.header and self.header != ecu):
+            return lines + ["NO DATA"], delay + st
+        if not responses:
+            delay += st if self.adaptive == 0 else min(st, 0.03 / self.adaptive)
+        return lines + self._frames(ecu, payload), delay
+
+    def _payload(self, c):
+        """(ECU request address, reply payload) or (None, None)."""
+        mode, model = c[:2], self.model
+        if mode == "01" and len(c) >= 4:
+            out = bytearray([0x41])
+            for i in range(2, len(c), 2):
+                pid = c[i:i + 2]
+                sig = self.signals.get("01" + pid)
+                if pid in self._bitmaps:
+                    out += bytes.fromhex(pid) + self._bitmaps[pid]
+                elif sig:
+                    attr, formula, _, tail = sig
+                    out += bytes.fromhex(pid) + encode_value(formula, getattr(model, attr)) + tail
+            return (ENGINE, bytes(out)) if len(out) > 1 else (None, None)
+        if c == "03":
+            out = bytearray([0x43, len(self.dtcs)])
+            for code in self.dtcs:
+                n = int(code[1:], 16)
+                out += bytes([("PCBU".index(code[0]) << 6) | (n >> 8), n & 0xFF])
+            return ENGINE, bytes(out)
+        if c == "04":
+            self.dtcs = []
+            return ENGINE, b"\x44"
+        if c == "0902":
+            return ENGINE, b"\x49\x02\x01" + self.vin.encode("ascii")
+        if c == MODULE_CMD and self.modules:
+            return BATTERY, b"\x61\xce" + encode_modules(model.module_v)
+        sig = self.signals.get(c)
+        if sig is None:
+            return None, None
+        attr, formula, ecu, tail = sig
+        service = int(mode, 16) + 0x40
+        return ecu, bytes([service]) + bytes.fromhex(c[2:]) + encode_value(
+            formula, getattr(model, attr)) + tail
+
+    def _frames(self, ecu, payload):
+        """Reply lines for one ECU, as ISO-TP frames when over 7 bytes."""
+        sp  = " " if self.spaces else ""
+        hx  = (lambda b: sp.join(f"{x:02X}" for x in b))
+        rx  = f"{int(ecu, 16) + 8:03X}"
+        n   = len(payload)
+        if n <= 7:
+            if not self.headers:
+                return [hx(payload)]
+            return [rx + sp + hx(bytes([n]) + payload.ljust(7, b"\x00"))]
+        chunks = [payload[:6]] + [payload[i:i + 7] for i in range(6, n, 7)]
+        if not self.headers:
+            return [f"{n:03X}"] + [f"{i & 0xF:X}:{sp}{hx(ch)}"
+                                   for i, ch in enumerate(chunks)]
+        lines = [rx + sp + hx(bytes([0x10 | n >> 8, n & 0xFF]) + chunks[0])]
+        for i, ch in enumerate(chunks[1:], 1):
+            lines.append(rx + sp + hx(bytes([0x20 | i & 0xF]) + ch.ljust(7, b"\x00")))
+        return lines
+
+    def stats(self):
+        return {"commands": self.commands, "errors": self.errors,
+                "adapter_time": self.adapter_time, "sim_time": self.model.t}
+
+
+class SimulatorTransport(Transport):
+    """In-process Transport onto a PriusSimulator. With realtime off
+    the modelled delays are only accounted (sim.adapter_time), not
+    slept, for faster-than-real-time load tests. After close() every
+    exchange raises, like a dropped Bluetooth link."""
+
+    def __init__(self, sim, realtime=True):
+        super().__init__()
+        self.sim      = sim
+        self.realtime = realtime
+        self.closed   = False
+
+    def close(self):
+        self.closed = True
+
+    def exchange(self, cmd, timeout=4.0):
+        if self.closed:
+            raise ConnectionError("simulated link closed")
+        text, delay = self.sim.handle(cmd)
+        self.first_byte = None
+        self.complete   = delay <= timeout
+        if not self.complete:
+            if self.realtime:
+                time.sleep(timeout)
+            return b""
+        if self.realtime:
+            if delay:
+                time.sleep(delay)
+            self.first_byte = delay         # the reply arrives in one piece
+        return text.encode("ascii")
+
+
+#
+#  CLI
+#
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve a simulated Prius ELM327.")
+    where = ap.add_mutually_exclusive_group(required=True)
+    where.add_argument("--tcp", type=int, metavar="PORT", help="listen on localhost:PORT")
+    where.add_argument("--pty", action="store_true", help="open a pseudo-terminal")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--profile", choices=sorted(PROFILES), default="gen3")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per command")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random seconds, up to")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--time-scale", type=float, default=1.0,
+                    help="simulated seconds per wall second")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--count", type=int, default=1,
+                    help="adapters to serve, each its own car (seed + i) on "
+                         "its own pty or port (PORT + i; 0 picks free ports)")
+    args = ap.parse_args(argv)
+
+    fakes = []
+    for i in range(args.count):
+        sim  = PriusSimulator(args.profile, args.seed + i, args.time_scale,
+                              args.latency, args.jitter, args.error_rate)
+        fake = FakeElm327(sim.serve)
+        fakes.append(fake)
+        if args.pty:
+            print(f"simulated {args.profile} on {fake.serve_pty()}", flush=True)
+        else:
+            host, port = fake.serve_tcp(args.host, args.tcp + i if args.tcp else 0)
+            print(f"simulated {args.profile} on {host}:{port}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for fake in fakes:
+            fake.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
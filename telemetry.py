@@ -0,0 +1,262 @@
+"""
+ToyotaScan — command-path telemetry
+Per-command latency histograms (time to first byte and total), bytes
+each way, outcome counters (NO DATA, timeouts, adapter errors, link
+exceptions), lock wait and achieved sweep rate, in fixed buckets so
+recording is a bisect and a few integer adds. Off with enabled = False.
+
+    mgr.telemetry.report()            # text for the console tab
+    mgr.telemetry.dump("tel.json")    # snapshot for offline analysis
+"""
+
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Bucket upper bounds (s): ten per decade (each ~26 % wide) from 0.1 ms
+# to 10 s, then overflow
+BOUNDS = tuple(10 ** (k / 10) for k in range(-40, 11))
+
+OK, NO_DATA, TIMEOUT, ADAPTER_ERROR, EXCEPTION = (
+    "ok", "no_data", "timeout", "adapter_error", "exception")
+OUTCOMES = (OK, NO_DATA, TIMEOUT, ADAPTER_ERROR, EXCEPTION)
+_ADAPTER_TEXT = re.compile(rb"NO DATA|CAN ERROR|BUFFER FULL|BUS ERROR|BUS BUSY|"
+                           rb"UNABLE TO CONNECT|STOPPED|DATA ERROR|FB ERROR|^\s*\?")
+_REPLY_CHARS  = b"0123456789ABCDEF :\r\n>"
+
+MAX_KEYS = 256                  # distinct commands tracked; the rest pool as "other"
+_HEX     = frozenset("0123456789ABCDEF")
+
+
+def command_key(cmd):
+    """Histogram key: OBD requests without the response-count digit,
+    AT commands by name (ATSH7E0 -> ATSH)."""
+    c = cmd.upper().replace(" ", "").strip()
+    if c.startswith("AT"):
+        return c[:4] if c[2:4] in ("SH", "SP", "TP", "ST", "AT") else c
+    if len(c) % 2 and _HEX.issuperset(c):
+        return c[:-1]
+    return c
+
+
+def classify(reply, complete=None):
+    """Outcome of one reply (bytes, possibly empty); complete is whether
+    it ended at the '>' prompt, when the transport can tell."""
+    if not reply or complete is False:
+        return TIMEOUT
+    if not reply.translate(None, _REPLY_CHARS):
+        return OK                       # only hex data, frame indices, prompt
+    m = _ADAPTER_TEXT.search(reply)
+    if m is None:
+        return OK
+    return NO_DATA if m.group() == b"NO DATA" else ADAPTER_ERROR
+
+
+class Histogram:
+    """Counts per BOUNDS bucket plus count, sum and max."""
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count  = 0
+        self.total  = 0.0
+        self.max    = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the max for
+        the overflow bucket), or None if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BOUNDS[i], self.max) if i < len(BOUNDS) else self.max
+        return self.max
+
+    def snapshot(self):
+        if not self.count:
+            return {"count": 0}
+        return {"count": self.count, "mean": self.total / self.count, "max": self.max,
+                "p50": self.percentile(0.5), "p90": self.percentile(0.9),
+                "p99": self.percentile(0.99), "buckets": list(self.counts)}
+
+
+class CommandStats:
+    __slots__ = ("total", "ttfb", "sent", "received", "outcomes")
+
+    def __init__(self):
+        self.total    = Histogram()
+        self.ttfb     = Histogram()
+        self.sent     = 0
+        self.received = 0
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+
+    def snapshot(self):
+        return {"total": self.total.snapshot(), "ttfb": self.ttfb.snapshot(),
+                "bytes_sent": self.sent, "bytes_received": self.received,
+                "outcomes": dict(self.outcomes)}
+
+
+class Telemetry:
+    """Command-path counters for one VeepeakManager.
+
+    record() is called once per exchange from whichever thread sent it;
+    sweep() once per read_values(). A batched Mode 01 request also adds
+    its latency to the histograms of each PID in it. The last few link
+    exceptions are kept with their command, since the manager otherwise
+    turns them into empty replies.
+    """
+
+    def __init__(self, enabled=True, sweep_window=32, keep_errors=20):
+        self.enabled  = enabled
+        self._lock    = threading.Lock()
+        self._sweep_window = sweep_window
+        self._keep_errors  = keep_errors
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.commands   = {}         # command_key -> CommandStats
+            self._by_cmd    = {}         # exact command text -> (CommandStats, per-PID)
+            self.lock_wait  = Histogram()
+            self.sweeps     = Histogram()
+            self._sweep_end = deque(maxlen=self._sweep_window)
+            self.errors     = deque(maxlen=self._keep_errors)
+            self.started    = time.time()
+
+    def record(self, cmd, total, sent, reply, ttfb=None, lock_wait=None, error=None,
+               complete=None):
+        """One exchange: seconds from send to prompt, bytes sent, reply
+        bytes, seconds to the first reply byte and waiting for the link
+        lock (when known), the exception that ended it, if any, and
+        whether the reply reached the prompt (None if unknown)."""
+        if not self.enabled:
+            return
+        outcome = EXCEPTION if error is not None else classify(reply, complete)
+        with self._lock:
+            entry = self._by_cmd.get(cmd)
+            if entry is None:
+                entry = self._stats_for(cmd)
+            stats, parts = entry
+            stats.total.add(total)
+            if ttfb is not None:
+                stats.ttfb.add(ttfb)
+            for part in parts:
+                part.total.add(total)
+                if ttfb is not None:
+                    part.ttfb.add(ttfb)
+            if lock_wait is not None:
+                self.lock_wait.add(lock_wait)
+            stats.sent     += sent
+            stats.received += len(reply)
+            stats.outcomes[outcome] += 1
+            if error is not None:
+                self.errors.append((time.time(), cmd, repr(error)))
+
+    def error(self, what, error):
+        """An exception outside any exchange (e.g. reopening the link)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.errors.append((time.time(), what, repr(error)))
+
+    def _stats_for(self, cmd):
+        key   = command_key(cmd)
+        parts = ()
+        if key[:2] == "01" and len(key) > 4 and not len(key) % 2 and _HEX.issuperset(key):
+            parts = tuple(self._key_stats("01" + key[i:i + 2])
+                          for i in range(2, len(key), 2))
+        entry = (self._key_stats(key), parts)
+        if len(self._by_cmd) < 4 * MAX_KEYS:
+            self._by_cmd[cmd] = entry
+        return entry
+
+    def _key_stats(self, key):
+        if key not in self.commands and len(self.commands) >= MAX_KEYS:
+            key = "other"
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = CommandStats()
+        return stats
+
+    def sweep(self, seconds, end=None):
+        """One read_values() sweep that took seconds, ending at end
+        (time.monotonic())."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.sweeps.add(seconds)
+            self._sweep_end.append(time.monotonic() if end is None else end)
+
+    def sweep_hz(self):
+        """Sweeps per second over the last sweep_window sweeps."""
+        with self._lock:
+            ends = self._sweep_end
+            if len(ends) < 2 or ends[-1] <= ends[0]:
+                return None
+            return (len(ends) - 1) / (ends[-1] - ends[0])
+
+    def outcomes(self):
+        """{outcome: count} over every command."""
+        with self._lock:
+            totals = dict.fromkeys(OUTCOMES, 0)
+            for s in self.commands.values():
+                for k, n in s.outcomes.items():
+                    totals[k] += n
+            return totals
+
+    def snapshot(self):
+        """Everything as plain data (JSON-serialisable)."""
+        hz, totals = self.sweep_hz(), self.outcomes()
+        with self._lock:
+            commands = {k: s.snapshot() for k, s in self.commands.items()}
+            return {"started": self.started, "time": time.time(),
+                    "enabled": self.enabled, "bounds": list(BOUNDS),
+                    "outcomes": totals,
+                    "bytes_sent": sum(s.sent for s in self.commands.values()),
+                    "bytes_received": sum(s.received for s in self.commands.values()),
+                    "lock_wait": self.lock_wait.snapshot(),
+                    "sweep": dict(self.sweeps.snapshot(), hz=hz),
+                    "commands": commands,
+                    "errors": [list(e) for e in self.errors]}
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=1)
+
+    def report(self, top=12):
+        """Console text: totals, then the slowest commands by p90."""
+        snap = self.snapshot()
+        ms = lambda s: "-" if s is None else f"{s * 1000:.1f}"
+        sw = snap["sweep"]
+        lines = [f"commands {sum(snap['outcomes'].values())}  "
+                 + "  ".join(f"{k} {n}" for k, n in snap["outcomes"].items() if n),
+                 f"bytes out {snap['bytes_sent']}  in {snap['bytes_received']}",
+                 f"sweeps {sw['count']}  {sw['hz'] or 0:.2f} Hz  "
+                 f"p50 {ms(sw.get('p50'))} ms  p90 {ms(sw.get('p90'))} ms",
+                 f"lock wait p50 {ms(snap['lock_wait'].get('p50'))} ms  "
+                 f"p99 {ms(snap['lock_wait'].get('p99'))} ms",
+                 "cmd           n    ttfb p50   total p50  p90    p99 ms  nodata  t/o  err"]
+        rows = sorted(snap["commands"].items(),
+                      key=lambda kv: kv[1]["total"].get("p90") or 0, reverse=True)
+        for key, c in rows[:top]:
+            t, f, o = c["total"], c["ttfb"], c["outcomes"]
+            lines.append(f"{key[:12]:12s} {t['count']:5d}  {ms(f.get('p50')):>8s}  "
+                         f"{ms(t.get('p50')):>8s} {ms(t.get('p90')):>6s} {ms(t.get('p99')):>6s}"
+                         f"  {o[NO_DATA]:6d} {o[TIMEOUT]:4d} "
+                         f"{o[ADAPTER_ERROR] + o[EXCEPTION]:4d}")
+        for t, cmd, err in snap["errors"][-3:]:
+            lines.append(f"! {time.strftime('%H:%M:%S', time.localtime(t))} {cmd}: {err}")
+        return "\n".join(lines)
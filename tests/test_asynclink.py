@@ -0,0 +1,76 @@
+"""AsyncLink over a blocking transport that fails the way a dropped
+Bluetooth socket does."""
+
+import threading
+import time
+
+import pytest
+
+from asynclink import LinkBridge, TransportLink
+from core import VeepeakManager
+from simulator import PriusSimulator, SimulatorTransport
+
+
+class DroppingTransport(SimulatorTransport):
+    """Simulated adapter whose socket can be made to fail with OSError."""
+
+    def __init__(self):
+        super().__init__(PriusSimulator(), realtime=False)
+        self.dropped = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def exchange(self, cmd, timeout=4.0):
+        self.release.wait()
+        if self.dropped:
+            raise OSError("Bluetooth socket closed")
+        return super().exchange(cmd, timeout)
+
+
+@pytest.fixture
+def link():
+    transport = DroppingTransport()
+
+    async def opener():
+        return TransportLink(transport)
+    bridge = LinkBridge(opener)
+    yield bridge, transport
+    bridge.close()
+
+
+def test_transport_error_fails_current_and_queued_commands(link):
+    bridge, transport = link
+    assert b"ELM327" in bridge.request_sync("ATI")
+    transport.release.clear()
+    transport.dropped = True
+    current = bridge.submit("010C")
+    time.sleep(0.05)                    # 010C is on the wire
+    queued  = [bridge.submit("010D"), bridge.submit("0105")]
+    transport.release.set()
+    for fut in [current] + queued:
+        with pytest.raises(ConnectionError):
+            fut.result(1.0)
+    assert bridge.link.closed
+    with pytest.raises(ConnectionError):
+        bridge.request_sync("010C", timeout=0.5)
+
+
+def test_request_sync_gives_up_after_timeout_and_margin(link, monkeypatch):
+    bridge, transport = link
+    monkeypatch.setattr("asynclink.SYNC_MARGIN", 0.1)
+    transport.release.clear()           # the adapter never answers
+    start = time.monotonic()
+    assert bridge.request_sync("010C", timeout=0.1) == b""
+    assert time.monotonic() - start < 1.0
+    transport.release.set()
+
+
+def test_manager_marks_link_lost(link):
+    bridge, transport = link
+    mgr = VeepeakManager()
+    mgr.attach_link(bridge)
+    assert mgr.connected and mgr.query("01", "0C") is not None
+    transport.dropped = True
+    assert mgr.query("01", "0C") is None
+    assert not mgr.connected
+    assert mgr.query("01", "0D") is None
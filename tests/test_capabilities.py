@@ -0,0 +1,50 @@
+"""Capability discovery on the simulated Prius profiles, sharing one
+CapabilityCache the way the fleet logger does."""
+
+import pytest
+
+from capabilities import CapabilityCache
+from core import PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from simulator import PriusSimulator, SimulatorTransport
+
+PIDS     = STANDARD_PIDS + PRIUS_PIDS
+PROFILES = ["gen3", "gen2", "prius_c"]
+
+
+def discover(profile, cache, adapter_id=None, vin=True):
+    sim = PriusSimulator(profile, time_scale=0, ready=True)
+    if not vin:
+        sim.vin = ""                    # car answers 0902 without a VIN
+    mgr = VeepeakManager()
+    mgr.attach_transport(SimulatorTransport(sim, realtime=False), adapter_id)
+    return mgr, mgr.discover_capabilities(PIDS, cache)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CapabilityCache(str(tmp_path / "capabilities.json"))
+
+
+def test_profiles_are_told_apart(cache):
+    found = {p: discover(p, cache)[1] for p in PROFILES}
+    assert len({frozenset(s) for s in found.values()}) == len(PROFILES)
+    for p in PROFILES:
+        mgr, again = discover(p, cache)
+        assert again == found[p]
+        assert cache.get(mgr.vehicle_id) == found[p]
+
+
+def test_cars_without_vin_are_keyed_by_adapter(cache):
+    found = {}
+    for i, p in enumerate(PROFILES):
+        mgr, found[p] = discover(p, cache, f"adapter{i}", vin=False)
+        assert mgr.vehicle_id == f"adapter{i}/7E8"
+    assert len({frozenset(s) for s in found.values()}) == len(PROFILES)
+    for i, p in enumerate(PROFILES):
+        assert discover(p, cache, f"adapter{i}", vin=False)[1] == found[p]
+
+
+def test_cars_without_vin_or_adapter_are_not_cached(cache):
+    mgr, gen2 = discover("gen2", cache, vin=False)
+    assert cache.get(mgr.vehicle_id) is None
+    assert discover("gen3", cache, vin=False)[1] != gen2
@@ -0,0 +1,37 @@
+"""The shipped dtc.bin against dtc_catalog.py and the codes the app
+explained before the database existed."""
+
+import pytest
+
+import dtc_catalog
+from dtcdb import DEFAULT_PATH, DtcDatabase, build
+
+# HYBRID_DTCS of the original main.py: code -> ECU
+HYBRID_DTCS = {"P3000": "HV ECU", "P3009": "HV ECU", "P3004": "HV ECU",
+               "P0A80": "Battery ECU", "P0A7F": "Battery ECU",
+               "P0AC0": "Battery ECU", "P0A94": "Battery ECU",
+               "P0B40": "Inverter ECU", "P0B41": "Inverter ECU"}
+
+
+@pytest.fixture(scope="module")
+def db():
+    db = DtcDatabase()
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("code", sorted(HYBRID_DTCS))
+def test_baseline_hybrid_codes_are_in_the_catalog(db, code):
+    assert db.lookup(code) is not None
+
+
+def test_inverter_codes_keep_their_ecu(db):
+    for code in ("P0B40", "P0B41"):
+        assert db.lookup(code).ecu == HYBRID_DTCS[code]
+
+
+def test_shipped_database_is_built_from_the_catalog(tmp_path):
+    path = str(tmp_path / "dtc.bin")
+    build(dtc_catalog.entries(), path)
+    with open(path, "rb") as built, open(DEFAULT_PATH, "rb") as shipped:
+        assert built.read() == shipped.read()
@@ -0,0 +1,86 @@
+"""PollScheduler against the simulated Prius, on a simulated clock that
+advances by the adapter delays the simulator models."""
+
+import pytest
+
+from core import PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from scheduler import MIN_SCALE, TIER_HIGH, TIER_LOW, TIER_NORMAL, PollScheduler
+from simulator import PriusSimulator, SimulatorTransport
+
+PIDS = STANDARD_PIDS + PRIUS_PIDS
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def drive(latency, seconds):
+    """Poll every PID for seconds of simulated time through an adapter
+    taking latency per command; returns the scheduler."""
+    clock = Clock()
+    sim   = PriusSimulator(latency=latency, clock=clock)
+    link  = SimulatorTransport(sim, realtime=False)
+    exchange = link.exchange
+
+    def timed(cmd, timeout=4.0):
+        spent = sim.adapter_time
+        reply = exchange(cmd, timeout)
+        clock.t += sim.adapter_time - spent
+        return reply
+    link.exchange = timed
+
+    mgr = VeepeakManager()
+    mgr.attach_transport(link)
+    mgr.discover_capabilities(PIDS)
+    sched = PollScheduler(PIDS, clock=clock)
+    end   = clock.t + seconds
+    while clock.t < end:
+        if not sched.step(mgr.query_batch):
+            clock.t = max(clock.t, sched.next_deadline())
+    return sched
+
+
+def tier_ratios(sched, key):
+    """{tier: (lowest, highest) key / target_hz over the tier's PIDs}."""
+    ratios = {}
+    for s in sched.stats().values():
+        ratios.setdefault(s["tier"], []).append(s[key] / s["target_hz"])
+    return {t: (min(r), max(r)) for t, r in ratios.items()}
+
+
+def test_fast_adapter_meets_every_rate():
+    sched = drive(0.002, 120)
+    for name, s in sched.stats().items():
+        assert s["effective_hz"] == s["target_hz"], name
+        assert s["achieved_hz"] == pytest.approx(s["target_hz"], rel=0.05), name
+
+
+@pytest.mark.parametrize("latency", [0.008, 0.009, 0.012])
+def test_slow_adapter_degrades_lowest_tiers_first(latency):
+    sched    = drive(latency, 120)
+    scale    = tier_ratios(sched, "effective_hz")
+    achieved = tier_ratios(sched, "achieved_hz")
+    # One scale per tier, never higher for a lower tier
+    for lo, hi in scale.values():
+        assert lo == pytest.approx(hi)
+    assert scale[TIER_HIGH][0] >= scale[TIER_NORMAL][0] >= scale[TIER_LOW][0]
+    assert scale[TIER_LOW][0] < 1.0
+    # What each tier actually got follows the same order
+    assert achieved[TIER_HIGH][0] > achieved[TIER_NORMAL][1] * 0.9
+    assert achieved[TIER_LOW][1] < achieved[TIER_HIGH][0]
+    if scale[TIER_HIGH][0] == 1.0:
+        assert achieved[TIER_HIGH][0] == pytest.approx(1.0, rel=0.1)
+
+
+def test_overloaded_adapter_keeps_every_pid_at_min_scale():
+    sched = drive(0.2, 600)
+    for name, s in sched.stats().items():
+        floor = s["target_hz"] * MIN_SCALE
+        assert s["effective_hz"] >= floor * 0.999, name
+        assert s["polls"] >= 1, name
+        if s["polls"] >= 3:
+            assert s["achieved_hz"] >= floor * 0.9, name
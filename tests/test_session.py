@@ -0,0 +1,54 @@
+"""Record a simulated drive, then replay it into a fresh manager that
+connects and discovers capabilities the way the app and fleet do."""
+
+import pytest
+
+from capabilities import CapabilityCache
+from core import PRIUS_PIDS, STANDARD_PIDS, VeepeakManager
+from session import ReplayTransport
+from simulator import PriusSimulator, SimulatorTransport
+
+PIDS   = STANDARD_PIDS + PRIUS_PIDS
+SWEEPS = 10
+
+
+def record(path, profile, cache=None):
+    sim = PriusSimulator(profile, seed=1, time_scale=0, ready=True)
+    mgr = VeepeakManager()
+    mgr.attach_transport(SimulatorTransport(sim, realtime=False))
+    mgr.discover_capabilities(PIDS, cache)
+    mgr.start_recording(str(path))
+    sweeps = []
+    for _ in range(SWEEPS):
+        sim.advance(3.0)
+        sweeps.append(mgr.read_values(PIDS))
+    mgr.stop_recording()
+    return mgr, sweeps
+
+
+def replay(path, cache=None):
+    mgr = VeepeakManager()
+    mgr.attach_transport(ReplayTransport(str(path), speed=0))
+    mgr.discover_capabilities(PIDS, cache)
+    return mgr, [mgr.read_values(PIDS) for _ in range(SWEEPS)]
+
+
+@pytest.mark.parametrize("profile", ["gen3", "gen2", "prius_c"])
+def test_replay_with_discovery_matches_recording(tmp_path, profile):
+    path = tmp_path / "drive.tss"
+    recorded, expected = record(path, profile)
+    replayed, got = replay(path)
+    assert replayed.supported == recorded.supported
+    assert replayed.vehicle_id == recorded.vehicle_id
+    assert got == expected
+
+
+def test_replay_with_cached_capabilities(tmp_path):
+    # Fleet flow: the cache already knows the car, so discovery is the
+    # VIN read alone, on both sides or only on the replaying one
+    path  = tmp_path / "drive.tss"
+    cache = CapabilityCache(str(tmp_path / "capabilities.json"))
+    record(tmp_path / "first.tss", "gen3", cache)
+    recorded, expected = record(path, "gen3", cache)
+    _, got = replay(path, cache)
+    assert got == expected
@@ -0,0 +1,88 @@
+"""BluetoothTransport deadlines, over a stand-in for the pyjnius
+BluetoothSocket streams."""
+
+import threading
+import time
+
+from telemetry import TIMEOUT, classify
+from transport import BluetoothTransport
+
+
+class InputStream:
+    """java.io.InputStream whose read() blocks like the RFCOMM one."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.cond = threading.Condition()
+
+    def feed(self, data):
+        with self.cond:
+            self.data += data
+            self.cond.notify_all()
+
+    def available(self):
+        return len(self.data)
+
+    def read(self, buf, off, length):
+        with self.cond:
+            while not self.data:
+                self.cond.wait()
+            n = min(length, len(self.data))
+            buf[off:off + n] = self.data[:n]
+            del self.data[:n]
+            return n
+
+    def skip(self, n):
+        with self.cond:
+            del self.data[:n]
+            return n
+
+
+class Adapter:
+    """Socket whose adapter answers each command with replies[cmd] and
+    a bare CR (the interrupt) with STOPPED."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.input   = InputStream()
+
+    def getInputStream(self):
+        return self.input
+
+    def getOutputStream(self):
+        return self
+
+    def write(self, data, off, length):
+        cmd = bytes(data[off:off + length]).strip().decode("ascii")
+        self.input.feed(self.replies.get(cmd, b"") if cmd else b"STOPPED\r\r>")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_complete_reply():
+    link  = BluetoothTransport(Adapter({"010C": b"41 0C 1A F8\r\r>"}))
+    reply = link.exchange("010C", timeout=1.0)
+    assert reply == b"41 0C 1A F8\r\r>"
+    assert link.complete
+
+
+def test_cut_off_reply_returns_at_the_deadline():
+    link  = BluetoothTransport(Adapter({"0902": b"014\r0: 49 02 01 4A 54 44\r"}))
+    start = time.monotonic()
+    reply = link.exchange("0902", timeout=0.2)
+    assert time.monotonic() - start < 0.5
+    assert reply.startswith(b"014\r0: 49 02")
+    assert link.complete is False
+    assert classify(reply, link.complete) == TIMEOUT
+
+
+def test_silent_adapter_times_out():
+    link  = BluetoothTransport(Adapter({}))
+    start = time.monotonic()
+    assert link.exchange("010C", timeout=0.1) == b""
+    assert time.monotonic() - start < 0.5
+    assert classify(b"", link.complete) == TIMEOUT
@@ -0,0 +1,167 @@
+"""
+ToyotaScan — live PID history
+Fixed-capacity ring buffers per PID (float64 timestamp + float32 value)
+with 1 s and 1 min min/max/mean tiers, so an hour of 20 Hz data on
+every PID stays within a few MB.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left
+
+RAW, SECOND, MINUTE = "raw", "1s", "1m"
+
+
+class RingSeries:
+    """Raw samples, oldest overwritten first."""
+    __slots__ = ("cap", "ts", "val", "head", "count")
+
+    def __init__(self, cap):
+        self.cap   = cap
+        self.ts    = array("d", bytes(8 * cap))
+        self.val   = array("f", bytes(4 * cap))
+        self.head  = 0                  # next write position
+        self.count = 0
+
+    def append(self, t, v):
+        h = self.head
+        self.ts[h]  = t
+        self.val[h] = v
+        self.head   = h + 1 if h + 1 < self.cap else 0
+        if self.count < self.cap:
+            self.count += 1
+
+    def _ordered(self, a):
+        if self.count < self.cap:
+            return a[:self.count]
+        return a[self.head:] + a[:self.head]
+
+    def snapshot(self):
+        """(timestamps, values) arrays, oldest first."""
+        return self._ordered(self.ts), self._ordered(self.val)
+
+    def last(self):
+        if not self.count:
+            return None
+        return self.val[self.head - 1]
+
+    def nbytes(self):
+        return self.cap * (8 + 4)
+
+
+class BucketSeries(RingSeries):
+    """Fixed-width time buckets holding min, max and mean."""
+    __slots__ = ("width", "lo", "hi", "_start", "_min", "_max", "_sum", "_n")
+
+    def __init__(self, cap, width):
+        super().__init__(cap)           # ts = bucket start, val = mean
+        self.width = width
+        self.lo    = array("f", bytes(4 * cap))
+        self.hi    = array("f", bytes(4 * cap))
+        self._start = None
+        self._n     = 0
+
+    def add(self, t, v):
+        start = t - t % self.width
+        if start != self._start:
+            self.flush()
+            self._start, self._min, self._max, self._sum, self._n = start, v, v, v, 1
+            return
+        if v < self._min: self._min = v
+        if v > self._max: self._max = v
+        self._sum += v
+        self._n   += 1
+
+    def flush(self):
+        """Close the open bucket (called automatically on the next one)."""
+        if not self._n:
+            return
+        h = self.head
+        self.lo[h] = self._min
+        self.hi[h] = self._max
+        self.append(self._start, self._sum / self._n)
+        self._n = 0
+
+    def snapshot(self):
+        """(starts, mins, maxes, means) arrays, oldest first."""
+        return (self._ordered(self.ts), self._ordered(self.lo),
+                self._ordered(self.hi), self._ordered(self.val))
+
+    def nbytes(self):
+        return self.cap * (8 + 4 * 3)
+
+
+class TimeSeriesStore:
+    """History for a fixed set of PID names.
+
+    append() is O(1) and safe to call from the polling thread; snapshot()
+    copies the requested tier under the same lock for the UI.
+    """
+
+    def __init__(self, names, raw_capacity=6000, second_capacity=3600,
+                 minute_capacity=1440):
+        self._lock = threading.Lock()
+        self._raw  = {n: RingSeries(raw_capacity) for n in names}
+        self._sec  = {n: BucketSeries(second_capacity, 1.0) for n in names}
+        self._min  = {n: BucketSeries(minute_capacity, 60.0) for n in names}
+
+    def append(self, name, t, v):
+        if v is None or name not in self._raw:
+            return
+        with self._lock:
+            self._raw[name].append(t, v)
+            self._sec[name].add(t, v)
+            self._min[name].add(t, v)
+
+    def append_many(self, t, values):
+        """Store a {name: value} sweep taken at time t."""
+        raw, sec, mnt = self._raw, self._sec, self._min
+        with self._lock:
+            for name, v in values.items():
+                if v is None or name not in raw:
+                    continue
+                raw[name].append(t, v)
+                sec[name].add(t, v)
+                mnt[name].add(t, v)
+
+    def snapshot(self, name, resolution=RAW, since=None):
+        """Copy of one PID's history at resolution RAW, SECOND or MINUTE.
+
+        RAW gives (timestamps, values); the bucket tiers give
+        (starts, mins, maxes, means). since drops older samples.
+        """
+        tier = {RAW: self._raw, SECOND: self._sec, MINUTE: self._min}[resolution]
+        with self._lock:
+            cols = tier[name].snapshot()
+        if since is not None:
+            i = bisect_left(cols[0], since)
+            cols = tuple(c[i:] for c in cols)
+        return cols
+
+    def summary(self, name):
+        """min/max/mean/last over the raw window, or None if empty."""
+        with self._lock:
+            s = self._raw[name]
+            if not s.count:
+                return None
+            vals = s._ordered(s.val)
+            last = s.last()
+        return {"min": min(vals), "max": max(vals),
+                "mean": sum(vals) / len(vals), "last": last,
+                "count": len(vals)}
+
+    def last(self, name):
+        with self._lock:
+            return self._raw[name].last()
+
+    def flush(self):
+        """Close open 1 s / 1 min buckets (e.g. at the end of a drive)."""
+        with self._lock:
+            for tier in (self._sec, self._min):
+                for s in tier.values():
+                    s.flush()
+
+    def nbytes(self):
+        """Bytes held by the sample arrays (fixed at construction)."""
+        return sum(s.nbytes() for tier in (self._raw, self._sec, self._min)
+                   for s in tier.values())
@@ -0,0 +1,301 @@
+"""
+ToyotaScan — ELM327 transports
+Byte links to the adapter: Android Bluetooth SPP, sockets and ptys,
+plus a local fake ELM327 for latency benchmarks on Linux.
+"""
+
+import os
+import select
+import socket
+import threading
+import time
+import tty
+
+PROMPT = b">"
+
+DRAIN_TIMEOUT = 0.5     # wait for the '>' after an interrupted command
+BT_POLL       = 0.002   # Bluetooth: available() polling interval
+
+
+# 
+#  TRANSPORT INTERFACE
+# 
+class Transport:
+    """Byte link to an ELM327.
+
+    Subclasses implement _write(data) and _read_into(view, timeout),
+    which returns the number of bytes read (0 on timeout, and at once
+    when timeout is 0 and nothing is waiting). first_byte
+    is the seconds the last exchange waited for its first reply byte
+    (None if nothing arrived or the transport cannot tell); complete is
+    whether its reply ended at the '>' prompt rather than the deadline.
+    """
+
+    first_byte = None
+    complete   = None
+
+    def __init__(self, bufsize=1024):
+        self._buf   = bytearray()            # reply being assembled
+        self._chunk = bytearray(bufsize)     # reused for every read
+        self._view  = memoryview(self._chunk)
+
+    def exchange(self, cmd, timeout=4.0):
+        """Send one command, return the reply bytes up to the '>' prompt.
+
+        Bytes left over from an earlier command are discarded first. A
+        reply still running at the deadline is interrupted, and what
+        arrived of it is returned.
+        """
+        buf = self._buf
+        buf.clear()
+        self._discard()
+        self._write((cmd + "\r").encode("ascii"))
+        sent     = time.monotonic()
+        deadline = sent + timeout
+        scanned  = 0
+        self.first_byte = None
+        self.complete   = False
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # Any byte interrupts the ELM327, which then prints
+                # STOPPED and a fresh prompt that must not reach the
+                # next command
+                self._write(b"\r")
+                self._drain(DRAIN_TIMEOUT)
+                break
+            n = self._read_into(self._view, remaining)
+            if not n:
+                continue
+            if not buf:
+                self.first_byte = time.monotonic() - sent
+            buf += self._view[:n]
+            if buf.find(PROMPT, scanned) >= 0:
+                self.complete = True
+                break
+            scanned = len(buf)
+        return bytes(buf)
+
+    def _discard(self):
+        """Drop whatever input is already waiting."""
+        while self._read_into(self._view, 0):
+            pass
+
+    def _drain(self, timeout):
+        """Read and drop input up to the next '>' prompt."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            n = self._read_into(self._view, remaining)
+            if n and self._chunk.find(PROMPT, 0, n) >= 0:
+                return
+
+    def close(self):
+        pass
+
+    def _write(self, data):
+        raise NotImplementedError
+
+    def _read_into(self, view, timeout):
+        raise NotImplementedError
+
+
+# 
+#  CONCRETE TRANSPORTS
+# 
+class BluetoothTransport(Transport):
+    """RFCOMM socket from pyjnius (android.bluetooth.BluetoothSocket)."""
+
+    def __init__(self, sock, bufsize=1024):
+        super().__init__(bufsize)
+        self.sock  = sock
+        self._in   = sock.getInputStream()
+        self._out  = sock.getOutputStream()
+        self._jbuf = bytearray(bufsize)      # pyjnius copies byte[] back
+
+    def _write(self, data):
+        self._out.write(data, 0, len(data))
+        self._out.flush()
+
+    def _read_into(self, view, timeout):
+        # Bluetooth streams have no read timeout and read() blocks until
+        # a byte arrives, so wait for available() bytes up to the
+        # deadline and then read only those. A dropped link raises from
+        # available() or makes read() return -1.
+        deadline = time.monotonic() + timeout
+        n = self._in.available()
+        while n <= 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return 0
+            time.sleep(min(BT_POLL, remaining))
+            n = self._in.available()
+        n = self._in.read(self._jbuf, 0, min(n, len(self._jbuf)))
+        if n < 0:
+            raise ConnectionError("Bluetooth link closed")
+        view[:n] = self._jbuf[:n]
+        return n
+
+    def _discard(self):
+        # read() would block, so only skip what is already buffered
+        n = self._in.available()
+        if n > 0:
+            self._in.skip(n)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class SocketTransport(Transport):
+    """TCP/Unix socket link (WiFi adapters, fake ELM327)."""
+
+    def __init__(self, sock, bufsize=1024):
+        super().__init__(bufsize)
+        self.sock = sock
+
+    @classmethod
+    def connect(cls, host, port, timeout=5.0):
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return cls(sock)
+
+    def _write(self, data):
+        self.sock.sendall(data)
+
+    def _read_into(self, view, timeout):
+        self.sock.settimeout(timeout)
+        try:
+            n = self.sock.recv_into(view)
+        except (socket.timeout, BlockingIOError):
+            return 0
+        if n == 0:
+            raise ConnectionError("adapter closed the link")
+        return n
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FdTransport(Transport):
+    """Serial tty or pty file descriptor (USB adapters, fake ELM327)."""
+
+    def __init__(self, fd, bufsize=1024):
+        super().__init__(bufsize)
+        self.fd = fd
+
+    @classmethod
+    def open(cls, path):
+        fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        tty.setraw(fd)
+        return cls(fd)
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def _read_into(self, view, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return 0
+        n = os.readv(self.fd, [view])
+        if n == 0:
+            raise ConnectionError("tty closed")
+        return n
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+# 
+#  FAKE ELM327 (local pty / TCP)
+# 
+class FakeElm327:
+    """Answers CR-terminated commands with responder(cmd) -> str.
+
+    Serves either a TCP port on localhost or a pty, one thread per
+    link, with an optional fixed adapter latency per command.
+    """
+
+    def __init__(self, responder, latency=0.0):
+        self.responder = responder
+        self.latency   = latency
+        self._closing  = False
+        self._fds      = []
+        self._server   = None
+
+    def serve_tcp(self, host="127.0.0.1", port=0):
+        """Start listening, return (host, port)."""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self._server.getsockname()
+
+    def serve_pty(self):
+        """Open a pty pair, return the slave device path."""
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        self._fds += [master, slave]
+        threading.Thread(target=self._serve,
+                         args=(lambda: os.read(master, 4096),
+                               lambda b: os.write(master, b)),
+                         daemon=True).start()
+        return os.ttyname(slave)
+
+    def close(self):
+        self._closing = True
+        if self._server:
+            self._server.close()
+        for fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = []
+
+    def _accept_loop(self):
+        while not self._closing:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve,
+                             args=(lambda c=conn: c.recv(4096), conn.sendall),
+                             daemon=True).start()
+
+    def _serve(self, recv, send):
+        pending = bytearray()
+        while not self._closing:
+            try:
+                data = recv()
+            except OSError:
+                return
+            if not data:
+                return
+            pending += data
+            while b"\r" in pending:
+                line, _, rest = pending.partition(b"\r")
+                pending[:] = rest
+                cmd = line.decode("ascii", errors="ignore").strip()
+                if not cmd:
+                    continue
+                if self.latency:
+                    time.sleep(self.latency)
+                try:
+                    send(self.responder(cmd).encode("ascii"))
+                except OSError:
+                    return